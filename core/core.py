@@ -3,7 +3,6 @@ import sys
 import json
 import time
 import random
-import re
 import logging
 import traceback
 import threading
@@ -28,6 +27,7 @@ from core.modules.common.common import (
     load_cache,
     save_cache,
     extract_local_videos,
+    normalize_title,
     extract_local_folders,
     record_missing_videos,
     test_proxy_connection,
@@ -41,16 +41,13 @@ from core.modules.common.dup_cache_probe import probe_remote_signature, compute_
 
 
 
-# 导入配置验证模块
-from core.modules.common.config_validator import validate_config_file, print_validation_report
-
-# 导入ChromeDriver管理模块
-from core.modules.common.chrome_driver_manager import check_and_setup_chromedriver
-
-# 导入增强版代理检查模块
-from core.modules.common.enhanced_proxy_checker import EnhancedProxyTester, print_comprehensive_report
+# 配置验证、ChromeDriver 管理、代理检查、Selenium 与异步抓取引擎只在 main() / 对应路径中按需导入，
+# requests 模式启动时不加载 selenium / aiohttp 等重量级依赖
 
 from core.modules.common.smart_cache import SmartCache
+from core.modules.common.host_scheduler import configure_host_scheduler
+from core.modules.common.http_client import configure_http_client
+from core.modules.common.preflight_cache import PreflightCache, config_fingerprint, chromedriver_fingerprint, proxy_fingerprint
 
 from core.modules.porn.porn import (
     fetch_with_requests_porn,
@@ -110,12 +107,132 @@ class ModelProcessor:
         
         # 线程本地存储，每个线程有自己的 Selenium 实例
         self._thread_local = threading.local()
+        self.browser_pool = self._create_browser_pool()
+        
+        # 所有工作线程共享的按站点限速调度器
+        self.page_scheduler = configure_host_scheduler(config)
+        # 录制/回放模式（http_replay 段，默认直连）
+        configure_http_client(config)
+        
+        # requests 模式下由异步引擎预先完成的探测/列表抓取结果 {model_name: CrawlResult}
+        self.use_async_crawler = self._async_crawler_enabled()
+        self.prefetched: Dict[str, Any] = {}
         
         # 统计信息
         self.processed_count = 0
         self.error_count = 0
         self._stats_lock = threading.Lock()
     
+    def _create_browser_pool(self):
+        """创建每线程常驻的 Selenium 浏览器池（未使用 Selenium 或不可用时返回 None）"""
+        if not (self.config.get('use_selenium', False) or self.config.get('scraper', 'selenium') == 'selenium'):
+            return None
+        if not self.config.get('selenium', {}).get('browser_pool_enabled', True):
+            return None
+        try:
+            from core.modules.common.selenium_helper import SeleniumBrowserPool
+        except ImportError as e:
+            self.logger.warning(f"Selenium 不可用，不启用浏览器池: {e}")
+            return None
+        return SeleniumBrowserPool(self.config, self._thread_local)
+    
+    def close(self):
+        """释放处理器持有的资源（关闭所有工作线程的浏览器）"""
+        if self.browser_pool:
+            self.browser_pool.shutdown()
+        
+        if self.smart_cache:
+            self.smart_cache.flush()
+        
+        for host, stats in self.page_scheduler.get_stats().items():
+            self.logger.info(f"🌐 {host}: 请求 {stats['requests']} 次，限速等待 {stats['waited']:.1f} 秒")
+    
+    def _async_crawler_enabled(self) -> bool:
+        """是否启用异步抓取引擎（配置未开启时不导入 aiohttp）"""
+        if not self.config.get('async_crawler', {}).get('enabled', False):
+            return False
+        from core.modules.common.async_crawler import is_async_crawler_enabled
+        return is_async_crawler_enabled(self.config)
+    
+    def _module_name_for(self, original_dir: str, url: str) -> str:
+        """计算模块类型（用于缓存键和选择抓取函数）"""
+        if self.module_type == 1 or (self.module_type == 3 and '[Channel]' in original_dir):
+            return "PORN"
+        if self.module_type == 2:
+            return "JAVDB"
+        return "JAVDB" if 'javdb' in url.lower() else "PORN"
+    
+    def _dup_cache_hit(self, model_name: str, module_name: str, url: str, remote_signature: str) -> bool:
+        """查重缓存是否有效且远端签名未变化（只读判断，供异步预抓取决定是否翻页）"""
+        if not remote_signature:
+            return False
+        cache_ctrl = self.config.get('cache', {})
+        if (cache_ctrl.get('dup_cache_force_refresh', False)
+                or model_name in (cache_ctrl.get('dup_cache_force_refresh_models', []) or [])
+                or model_name in (cache_ctrl.get('dup_cache_clear_models', []) or [])):
+            return False
+        
+        cache_store = DupCacheStore(cache_ctrl.get('dup_cache_path', 'output/dup_cache.db'))
+        cache_entry = cache_store.get(cache_store.build_cache_key(model_name, module_name, url))
+        if not cache_entry or cache_entry.remote_signature != remote_signature:
+            return False
+        
+        expire_hours = cache_ctrl.get('dup_cache_expire_hours', None)
+        if expire_hours is None:
+            expire_days = cache_ctrl.get('expiration_days', 7)
+            expire_hours = expire_days * 24 if isinstance(expire_days, (int, float)) else 0
+        if expire_hours and expire_hours > 0 and cache_entry.checked_at:
+            try:
+                checked_at = datetime.fromisoformat(cache_entry.checked_at)
+                if (datetime.now() - checked_at).total_seconds() > expire_hours * 3600:
+                    return False
+            except Exception:
+                pass
+        return True
+    
+    def prefetch_remote(self, local_matches: List[Tuple]):
+        """
+        requests 模式下用异步引擎预先完成所有模特的远端探测与列表抓取
+        
+        所有请求在一个事件循环中并发进行（进行中请求数受 async_crawler.max_in_flight 限制），
+        查重缓存命中且远端未变化的模特只探测不翻页。工作线程随后直接使用预抓取结果。
+        
+        Args:
+            local_matches: 本地模特匹配列表
+        """
+        if not self.use_async_crawler or not local_matches:
+            return
+        
+        from core.modules.common.async_crawler import CrawlJob, crawl_models
+        
+        models = load_models()
+        max_pages = self.config.get('max_pages', -1)
+        jobs = []
+        for model_name, folder, original_dir, country in local_matches:
+            url = models.get(model_name)
+            if url:
+                jobs.append(CrawlJob(model_name, url, self._module_name_for(original_dir, url), max_pages))
+        if not jobs:
+            return
+        
+        self.logger.info(f"⚡ 异步抓取引擎: {len(jobs)} 个模特，"
+                         f"最多 {self.config.get('async_crawler', {}).get('max_in_flight', 16)} 个并发请求")
+        start = time.time()
+        try:
+            self.prefetched = crawl_models(
+                jobs, self.config, self.smart_cache, self.logger,
+                listing_needed=lambda job, sig: not self._dup_cache_hit(job.model_name, job.module_name, job.url, sig),
+                should_stop=self._should_stop
+            )
+        except Exception as e:
+            self.logger.warning(f"异步抓取引擎失败，回退到逐个模特抓取: {e}")
+            self.prefetched = {}
+            return
+        
+        fetched = sum(1 for r in self.prefetched.values() if r.listing_fetched)
+        self.logger.info(f"⚡ 异步抓取完成: 探测 {len(self.prefetched)} 个，翻页抓取 {fetched} 个，"
+                         f"耗时 {time.time() - start:.1f} 秒")
+    
     def _should_stop(self) -> bool:
         """检查是否应该停止处理"""
         if self.running_flag is None:
@@ -189,19 +306,8 @@ class ModelProcessor:
 
             # 统一标题归一化（降低误判）
             comparison_cfg = self.config.get('comparison', {})
-            def _normalize_title(title: str) -> str:
-                t = (title or '').strip()
-                if not t:
-                    return ''
-                if not comparison_cfg.get('case_sensitive', False):
-                    t = t.lower()
-                if comparison_cfg.get('strip_punctuation', True):
-                    t = re.sub(r'[\W_]+', '', t, flags=re.UNICODE)
-                t = re.sub(r'\s+', '', t)
-                return t
-
             def _normalize_set(titles):
-                return {n for n in (_normalize_title(t) for t in titles) if n}
+                return {n for n in (normalize_title(t, comparison_cfg) for t in titles) if n}
             
             # 获取模特URL
 
@@ -223,12 +329,8 @@ class ModelProcessor:
                 )
 
             # 计算模块类型（用于缓存键）
-            if self.module_type == 1 or (self.module_type == 3 and '[Channel]' in original_dir):
-                module_name = "PORN"
-            elif self.module_type == 2:
-                module_name = "JAVDB"
-            else:
-                module_name = "JAVDB" if 'javdb' in url.lower() else "PORN"
+            module_name = self._module_name_for(original_dir, url)
+            prefetched = self.prefetched.pop(model_name, None)
 
             # 读取该模特的专属黑名单URL
             blacklisted_urls = set()
@@ -290,7 +392,10 @@ class ModelProcessor:
                         proxies = {"http": proxy_url, "https": proxy_url}
 
                 headers = self.config.get('network', {}).get('headers', None)
-                remote_signature, probe_titles = probe_remote_signature(url, headers=headers, proxies=proxies)
+                if prefetched and prefetched.probed:
+                    remote_signature, probe_titles = prefetched.remote_signature, prefetched.probe_titles
+                else:
+                    remote_signature, probe_titles = probe_remote_signature(url, headers=headers, proxies=proxies)
             except Exception as e:
                 self.logger.warning(f"[线程-{thread_id}] {model_name}: 远端轻量探测失败，将回退完整抓取 ({e})")
 
@@ -299,11 +404,7 @@ class ModelProcessor:
                 # 获取已下载的视频（用于判定补齐）
                 downloaded_videos = set()
                 if self.smart_cache and self.smart_cache.enabled:
-                    cache_data = self.smart_cache.load(model_name)
-                    missing_data = cache_data.get('missing_videos', {})
-                    for title, info in missing_data.items():
-                        if info.get('status') == 'downloaded':
-                            downloaded_videos.add(title)
+                    downloaded_videos = self.smart_cache.get_downloaded_titles(model_name)
 
                 local_set_with_downloaded = local_set | downloaded_videos
 
@@ -321,8 +422,8 @@ class ModelProcessor:
                 cached_missing_with_urls = [(t, u) for t, u in cached_missing_with_urls_raw if _is_valid_url(u)]
 
                 local_norm = _normalize_set(local_set_with_downloaded)
-                cached_missing_norm = {_normalize_title(t) for t in cached_missing_titles if _normalize_title(t)}
-                cached_missing_with_urls_norm = {_normalize_title(t) for t, _ in cached_missing_with_urls if _normalize_title(t)}
+                cached_missing_norm = _normalize_set(cached_missing_titles)
+                cached_missing_with_urls_norm = _normalize_set(t for t, _ in cached_missing_with_urls)
                 invalid_or_no_url_norm = cached_missing_norm - cached_missing_with_urls_norm
 
                 remaining_missing_norm = (cached_missing_with_urls_norm - local_norm) | invalid_or_no_url_norm
@@ -336,17 +437,24 @@ class ModelProcessor:
                     if isinstance(url_check_max, int) and url_check_max > 0:
                         to_check = cached_missing_with_urls[:url_check_max]
                     invalid_due_to_url = set()
-                    for title, video_url in to_check:
-                        if not check_url_available(video_url, headers=headers, proxies=proxies, timeout=url_check_timeout):
-                            invalid_due_to_url.add(_normalize_title(title))
+                    if self.use_async_crawler:
+                        # 同一模特的链接并发校验
+                        from core.modules.common.async_crawler import check_urls_available
+                        available = check_urls_available([u for _, u in to_check], self.config, headers, url_check_timeout)
+                    else:
+                        available = [check_url_available(video_url, headers=headers, proxies=proxies, timeout=url_check_timeout)
+                                     for _, video_url in to_check]
+                    for (title, video_url), ok in zip(to_check, available):
+                        if not ok:
+                            invalid_due_to_url.add(normalize_title(title, comparison_cfg))
                     if invalid_due_to_url:
                         remaining_missing_norm |= invalid_due_to_url
                         invalid_or_no_url_norm |= invalid_due_to_url
 
-                missing_with_urls = [(t, u) for t, u in cached_missing_with_urls if _normalize_title(t) in remaining_missing_norm]
+                missing_with_urls = [(t, u) for t, u in cached_missing_with_urls if normalize_title(t, comparison_cfg) in remaining_missing_norm]
 
                 effective_local_count = len(local_set_with_downloaded)
-                missing_titles_sorted = sorted([t for t in cached_missing_titles if _normalize_title(t) in remaining_missing_norm])
+                missing_titles_sorted = sorted([t for t in cached_missing_titles if normalize_title(t, comparison_cfg) in remaining_missing_norm])
 
 
                 # 更新缓存（本地签名/缺失结果）
@@ -358,7 +466,7 @@ class ModelProcessor:
                 cache_entry.online_count = cache_entry.online_count or len(cached_missing_titles)
                 cache_entry.missing_titles = missing_titles_sorted
                 cache_entry.missing_with_urls = missing_with_urls
-                invalid_titles_sorted = sorted([t for t in cached_missing_titles if _normalize_title(t) in invalid_or_no_url_norm])
+                invalid_titles_sorted = sorted([t for t in cached_missing_titles if normalize_title(t, comparison_cfg) in invalid_or_no_url_norm])
                 cache_entry.invalid_titles = invalid_titles_sorted
 
                 if remote_signature:
@@ -391,7 +499,11 @@ class ModelProcessor:
             online_set = set()
             title_to_url = {}
             
-            for attempt in range(max_retries + 1):
+            # 异步引擎已抓取到结果时直接使用，失败或为空时走下面的重试流程
+            if prefetched and prefetched.listing_fetched and prefetched.titles:
+                online_set, title_to_url = prefetched.titles, prefetched.title_to_url
+            
+            for attempt in range(0 if online_set else max_retries + 1):
                 if self._should_stop():
                     return ModelResult(
                         model_name=model_name,
@@ -405,12 +517,12 @@ class ModelProcessor:
                     if self.module_type == 1 or (self.module_type == 3 and '[Channel]' in original_dir):
                         online_set, title_to_url = fetch_with_requests_porn(
                             url, self.logger, max_pages, self.config,
-                            self.smart_cache, model_name
+                            self.smart_cache, model_name, self.browser_pool
                         )
                     else:
                         online_set, title_to_url = fetch_with_requests_javdb(
                             url, self.logger, max_pages, self.config,
-                            self.smart_cache, model_name
+                            self.smart_cache, model_name, self.browser_pool
                         )
                     
                     if online_set:
@@ -448,12 +560,7 @@ class ModelProcessor:
             # 这样后续运行时，已下载的视频不会再出现在缺失列表中
             downloaded_videos = set()
             if self.smart_cache and self.smart_cache.enabled:
-                # 直接读取缓存数据中的missing_videos，筛选status='downloaded'的
-                cache_data = self.smart_cache.load(model_name)
-                missing_data = cache_data.get('missing_videos', {})
-                for title, info in missing_data.items():
-                    if info.get('status') == 'downloaded':
-                        downloaded_videos.add(title)
+                downloaded_videos = self.smart_cache.get_downloaded_titles(model_name)
             
             # 合并本地视频和已下载视频
             local_set_with_downloaded = local_set | downloaded_videos
@@ -462,11 +569,12 @@ class ModelProcessor:
             # 补全缓存中的URL映射，避免增量模式下出现空链接
             resolved_title_to_url = dict(title_to_url)
             if self.smart_cache and self.smart_cache.enabled:
-                for title in online_set:
-                    if not resolved_title_to_url.get(title):
-                        cached_url = self.smart_cache.get_video_url(model_name, title)
-                        if cached_url:
-                            resolved_title_to_url[title] = cached_url
+                unresolved = [t for t in online_set if not resolved_title_to_url.get(t)]
+                if unresolved:
+                    cached_urls = self.smart_cache.get_video_urls(model_name)
+                    for title in unresolved:
+                        if cached_urls.get(title):
+                            resolved_title_to_url[title] = cached_urls[title]
 
             # 过滤专属黑名单URL
             if blacklisted_urls:
@@ -481,11 +589,11 @@ class ModelProcessor:
 
             # 重新计算新增视频（排除黑名单，使用归一化）
             new_norm = online_norm - cached_norm
-            new_videos = {t for t in online_set if _normalize_title(t) in new_norm}
+            new_videos = {t for t in online_set if normalize_title(t, comparison_cfg) in new_norm}
 
             # 对比找出缺失视频（使用归一化）
             missing_norm = online_norm - local_norm
-            missing_titles = [t for t in online_set if _normalize_title(t) in missing_norm]
+            missing_titles = [t for t in online_set if normalize_title(t, comparison_cfg) in missing_norm]
             missing = set(missing_titles)
             
             def _is_valid_url(url_value):
@@ -757,52 +865,58 @@ def process_models_multithreaded(
     completed = 0
     failed = 0
     
-    # 使用 ThreadPoolExecutor 并发处理
-    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ModelWorker") as executor:
-        # 提交所有任务
-        future_to_model = {
-            executor.submit(processor.process_single_model, model_info): model_info
-            for model_info in local_matches
-        }
+    # 使用 ThreadPoolExecutor 并发处理（退出后统一关闭各工作线程的浏览器）
+    try:
+        # requests 模式：网络抓取先在一个事件循环中统一完成
+        processor.prefetch_remote(local_matches)
         
-        # 处理完成的任务
-        for future in as_completed(future_to_model):
-            model_info = future_to_model[future]
-            model_name = model_info[0]
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ModelWorker") as executor:
+            # 提交所有任务
+            future_to_model = {
+                executor.submit(processor.process_single_model, model_info): model_info
+                for model_info in local_matches
+            }
+        
+            # 处理完成的任务
+            for future in as_completed(future_to_model):
+                model_info = future_to_model[future]
+                model_name = model_info[0]
             
-            try:
-                result = future.result()
-                results.append(result)
+                try:
+                    result = future.result()
+                    results.append(result)
                 
-                if result.success:
-                    completed += 1
-                    if result.missing_count > 0:
-                        logger.info(f"✅ [{completed}/{len(local_matches)}] {model_name}: 发现 {result.missing_count} 个缺失")
+                    if result.success:
+                        completed += 1
+                        if result.missing_count > 0:
+                            logger.info(f"✅ [{completed}/{len(local_matches)}] {model_name}: 发现 {result.missing_count} 个缺失")
+                        else:
+                            logger.info(f"✅ [{completed}/{len(local_matches)}] {model_name}: 无缺失")
                     else:
-                        logger.info(f"✅ [{completed}/{len(local_matches)}] {model_name}: 无缺失")
-                else:
-                    failed += 1
-                    logger.error(f"❌ [{completed + failed}/{len(local_matches)}] {model_name}: {result.error_message}")
+                        failed += 1
+                        logger.error(f"❌ [{completed + failed}/{len(local_matches)}] {model_name}: {result.error_message}")
                     
-            except Exception as e:
-                failed += 1
-                logger.error(f"❌ [{completed + failed}/{len(local_matches)}] {model_name}: 任务异常 - {e}")
-                results.append(ModelResult(
-                    model_name=model_name,
-                    success=False,
-                    error_message=str(e)
-                ))
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"❌ [{completed + failed}/{len(local_matches)}] {model_name}: 任务异常 - {e}")
+                    results.append(ModelResult(
+                        model_name=model_name,
+                        success=False,
+                        error_message=str(e)
+                    ))
             
-            # 检查是否需要停止
-            if running_flag is not None:
-                should_stop = not running_flag() if callable(running_flag) else not running_flag
-                if should_stop:
-                    logger.info("⚠ 用户请求停止，取消剩余任务...")
-                    # 取消未完成的任务
-                    for f in future_to_model:
-                        if not f.done():
-                            f.cancel()
-                    break
+                # 检查是否需要停止
+                if running_flag is not None:
+                    should_stop = not running_flag() if callable(running_flag) else not running_flag
+                    if should_stop:
+                        logger.info("⚠ 用户请求停止，取消剩余任务...")
+                        # 取消未完成的任务
+                        for f in future_to_model:
+                            if not f.done():
+                                f.cancel()
+                        break
+    finally:
+        processor.close()
     
     logger.info(f"\n📊 多线程处理完成: 成功 {completed} | 失败 {failed} | 总计 {len(local_matches)}")
     
@@ -939,31 +1053,50 @@ def main(module_arg="auto", local_dirs=None, scraper="selenium", running_flag=No
         config = load_config()
         models = load_models()
         
+        # 预检缓存：配置/Chrome/代理未变化且在有效期内时跳过对应检查
+        preflight = PreflightCache.from_config(config)
+        
         # 配置验证（新增）
-        logger.info("🔍 正在验证配置文件...")
-        validation_result = validate_config_file("config.yaml")
-        if not validation_result.valid:
-            logger.error("❌ 配置验证失败，程序无法继续运行")
-            print_validation_report(validation_result)
-            logger.error("\n请修复上述配置问题后重新运行程序")
-            logger.error("💡 提示：可以运行 'python -m core.modules.common.config_validator' 单独验证配置")
-            sys.exit(1)
-        elif validation_result.warnings:
-            logger.warning(f"⚠️  配置验证发现 {len(validation_result.warnings)} 个警告:")
-            for warning in validation_result.warnings:
+        config_fp = config_fingerprint("config.yaml")
+        cached_validation = preflight.get('config', config_fp)
+        if cached_validation is not None:
+            logger.info(f"✅ 配置验证通过（预检缓存，{cached_validation['age_minutes']} 分钟前验证，配置未变化）")
+            for warning in cached_validation.get('warnings', []):
                 logger.warning(f"  - {warning}")
         else:
-            logger.info("✅ 配置验证通过")
+            from core.modules.common.config_validator import validate_config_file, print_validation_report
+            logger.info("🔍 正在验证配置文件...")
+            validation_result = validate_config_file("config.yaml")
+            if not validation_result.valid:
+                logger.error("❌ 配置验证失败，程序无法继续运行")
+                print_validation_report(validation_result)
+                logger.error("\n请修复上述配置问题后重新运行程序")
+                logger.error("💡 提示：可以运行 'python -m core.modules.common.config_validator' 单独验证配置")
+                sys.exit(1)
+            elif validation_result.warnings:
+                logger.warning(f"⚠️  配置验证发现 {len(validation_result.warnings)} 个警告:")
+                for warning in validation_result.warnings:
+                    logger.warning(f"  - {warning}")
+            else:
+                logger.info("✅ 配置验证通过")
+            preflight.put('config', config_fp, {'warnings': list(validation_result.warnings)})
         
         # ChromeDriver检查（新增）
         if config.get('use_selenium', False) or config.get('scraper', '') == 'selenium':
-            logger.info("\n🔍 正在检查ChromeDriver...")
-            driver_success, driver_message = check_and_setup_chromedriver(config)
-            if driver_success:
-                logger.info(f"✅ {driver_message}")
+            cached_driver = preflight.get('chromedriver', chromedriver_fingerprint())
+            if cached_driver is not None:
+                logger.info(f"✅ {cached_driver.get('message', 'ChromeDriver 已就绪')}（预检缓存，{cached_driver['age_minutes']} 分钟前检查）")
             else:
-                logger.warning(f"⚠️  ChromeDriver检查失败: {driver_message}")
-                logger.warning("💡 程序将继续运行，但在使用Selenium时可能会出现问题")
+                from core.modules.common.chrome_driver_manager import check_and_setup_chromedriver
+                logger.info("\n🔍 正在检查ChromeDriver...")
+                driver_success, driver_message = check_and_setup_chromedriver(config)
+                if driver_success:
+                    logger.info(f"✅ {driver_message}")
+                    # 驱动可能刚被下载，按检查后的状态记录指纹
+                    preflight.put('chromedriver', chromedriver_fingerprint(), {'message': driver_message})
+                else:
+                    logger.warning(f"⚠️  ChromeDriver检查失败: {driver_message}")
+                    logger.warning("💡 程序将继续运行，但在使用Selenium时可能会出现问题")
         
         # 如果提供了本地目录，则覆盖配置
         if local_dirs:
@@ -1003,7 +1136,11 @@ def main(module_arg="auto", local_dirs=None, scraper="selenium", running_flag=No
         if not proxy_config:
             proxy_config = config.get('proxy', {})
         
-        if proxy_config.get('enabled', False):
+        proxy_fp = proxy_fingerprint(proxy_config)
+        cached_proxy = preflight.get('proxy', proxy_fp) if proxy_config.get('enabled', False) else None
+        if cached_proxy is not None:
+            logger.info(f"\n✅ 代理连接检查通过（预检缓存，{cached_proxy['age_minutes']} 分钟前检测，代理配置未变化）\n")
+        elif proxy_config.get('enabled', False):
             logger.info("\n🔍 检测到已启用代理，正在进行全面连接测试...")
             
             proxy_type = proxy_config.get('type', 'http')
@@ -1013,6 +1150,7 @@ def main(module_arg="auto", local_dirs=None, scraper="selenium", running_flag=No
             logger.info(f"   代理地址: {proxy_host}:{proxy_port}")
             
             # 使用增强版代理检查
+            from core.modules.common.enhanced_proxy_checker import EnhancedProxyTester, print_comprehensive_report
             tester = EnhancedProxyTester(proxy_config, timeout=15)
             check_result = tester.comprehensive_check()
             
@@ -1065,6 +1203,7 @@ def main(module_arg="auto", local_dirs=None, scraper="selenium", running_flag=No
                     logger.info("\n⚠️  代理检查未通过，程序将自动继续运行（如需询问请在config开启 network.proxy.ask_on_fail: true）")
                     logger.info("提示：代理检查失败时仍可继续，但可能出现网络/证书问题")
             else:
+                preflight.put('proxy', proxy_fp)
                 logger.info("✅ 代理连接检查通过，继续执行...\n")
         else:
             logger.info("\n📡 未启用代理，使用直接连接\n")
@@ -1183,10 +1322,14 @@ def main(module_arg="auto", local_dirs=None, scraper="selenium", running_flag=No
                 countries_dir, smart_cache, running_flag
             )
             results = []
-            for i, model_info in enumerate(local_matches, 1):
-                logger.info(f"\n[{i}/{len(local_matches)}] 处理模特: {model_info[0]}")
-                result = processor.process_single_model(model_info)
-                results.append(result)
+            try:
+                processor.prefetch_remote(local_matches)
+                for i, model_info in enumerate(local_matches, 1):
+                    logger.info(f"\n[{i}/{len(local_matches)}] 处理模特: {model_info[0]}")
+                    result = processor.process_single_model(model_info)
+                    results.append(result)
+            finally:
+                processor.close()
         
         # 统计结果
         processed_count = sum(1 for r in results if r.success)
@@ -0,0 +1,425 @@
+"""
+异步列表页抓取引擎
+requests 模式下，所有模特的远端探测、翻页抓取与链接校验在同一个事件循环中完成：
+进行中的请求数由信号量限制，站点限速复用 HostRateScheduler 的时间片预约（await 等待，不占用线程），
+每页的提取与翻页判断复用各站点模块的同一套逻辑（extract_*_listing_page / *_has_next_page）。
+
+配置（async_crawler 段）:
+    enabled: 是否启用（仅 requests 模式生效，Selenium 模式仍走多线程）
+    max_in_flight: 同时进行中的请求数上限
+    max_concurrent_models: 同时翻页抓取的模特数上限
+
+智能缓存、查重缓存与录制/回放文件的读写都是阻塞操作，放到默认线程池中执行（_in_thread），
+避免一个模特写缓存时卡住其他模特的请求。
+"""
+
+import asyncio
+import functools
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import aiohttp
+import requests
+
+from .html_parser import make_soup, select_texts
+from .host_scheduler import get_host_scheduler
+from .http_client import get_fixture_store, get_http_mode
+from .dup_cache_probe import PROBE_TITLE_SELECTOR, compute_remote_signature_from_titles
+from .smart_cache import IncrementalStopTracker
+
+try:
+    from aiohttp_socks import ProxyConnector
+    AIOHTTP_SOCKS_AVAILABLE = True
+except ImportError:
+    ProxyConnector = None
+    AIOHTTP_SOCKS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_IN_FLIGHT = 16
+DEFAULT_MAX_CONCURRENT_MODELS = 64
+
+LISTING_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate',
+    'DNT': '1',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+
+@dataclass
+class ListingSite:
+    """站点的列表页抓取规则（与同步的 fetch_with_requests_only_* 共用）"""
+    name: str
+    make_ownership: Callable          # (model_name, url, logger) -> 归属判定器
+    extract_page: Callable            # (soup, url, config, ownership, logger) -> (标题集合, [(标题, 链接)])
+    has_next_page: Callable           # (soup, page_num, logger) -> bool
+    prepare: Optional[Callable] = None  # (smart_cache, model_name, url, logger)，抓取前的缓存整理
+    timeout: int = 15
+
+
+@dataclass
+class CrawlJob:
+    """单个模特的抓取任务"""
+    model_name: str
+    url: str
+    module_name: str = "PORN"
+    max_pages: int = -1
+
+
+@dataclass
+class CrawlResult:
+    """单个模特的抓取结果"""
+    model_name: str
+    url: str
+    remote_signature: str = ""
+    probe_titles: List[str] = field(default_factory=list)
+    probed: bool = False
+    titles: Set[str] = field(default_factory=set)
+    title_to_url: Dict[str, str] = field(default_factory=dict)
+    listing_fetched: bool = False
+    error: str = ""
+
+
+def get_listing_site(module_name: str) -> ListingSite:
+    """按模块名获取站点规则（延迟导入站点模块，避免循环依赖）"""
+    if module_name.upper() == "JAVDB":
+        from ..javdb.javdb import JavdbOwnershipMatcher, extract_javdb_listing_page, javdb_has_next_page
+        return ListingSite('JAVDB', JavdbOwnershipMatcher, extract_javdb_listing_page, javdb_has_next_page,
+                           timeout=20)
+
+    from ..porn.porn import (ModelOwnershipMatcher, extract_porn_listing_page, porn_has_next_page,
+                             reconcile_model_page_cache)
+
+    def _prepare(smart_cache, model_name, url, log):
+        if model_name and '/model/' in url and smart_cache and smart_cache.enabled:
+            reconcile_model_page_cache(smart_cache, model_name, url, log)
+
+    return ListingSite('PORN', ModelOwnershipMatcher, extract_porn_listing_page, porn_has_next_page,
+                       prepare=_prepare)
+
+
+def resolve_proxy_url(config: dict = None) -> Optional[str]:
+    """从 network.proxy 配置得到代理URL（未启用时返回 None）"""
+    proxy_cfg = (config or {}).get('network', {}).get('proxy', {}) or {}
+    if not proxy_cfg.get('enabled'):
+        return None
+    if proxy_cfg.get('http'):
+        return proxy_cfg['http']
+    host, port = proxy_cfg.get('host', ''), proxy_cfg.get('port', '')
+    if host and port:
+        return f"{proxy_cfg.get('type', 'socks5')}://{host}:{port}"
+    return None
+
+
+def is_async_crawler_enabled(config: dict = None) -> bool:
+    """是否使用异步抓取引擎（需 requests 模式，SOCKS 代理需安装 aiohttp-socks）"""
+    config = config or {}
+    if not config.get('async_crawler', {}).get('enabled', False):
+        return False
+    if config.get('use_selenium', False) or config.get('scraper', 'selenium') == 'selenium':
+        return False
+    proxy_url = resolve_proxy_url(config)
+    if proxy_url and proxy_url.startswith('socks') and not AIOHTTP_SOCKS_AVAILABLE:
+        logger.warning("异步抓取引擎需要 aiohttp-socks 才能使用 SOCKS 代理，回退到多线程抓取")
+        return False
+    return True
+
+
+def _in_thread(func: Callable, *args, **kwargs):
+    """在默认线程池中执行阻塞调用（兼容 Python 3.8，asyncio.to_thread 需要 3.9）"""
+    return asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+def _page_url(url: str, page_num: int) -> str:
+    """构建分页URL（与同步抓取一致）"""
+    page_url = url
+    if page_num > 1:
+        page_url = f"{url}&page={page_num}" if '?' in url else f"{url}?page={page_num}"
+    return page_url.replace(' ', '%20')
+
+
+class AsyncListingCrawler:
+    """异步列表页抓取引擎（单事件循环，多模特并发）"""
+
+    def __init__(self, config: dict = None, smart_cache=None, log: logging.Logger = None,
+                 headers: Optional[Dict[str, str]] = None, should_stop: Optional[Callable[[], bool]] = None):
+        """
+        初始化抓取引擎
+
+        Args:
+            config: 配置字典
+            smart_cache: 智能缓存实例（增量抓取、页面哈希、提前停止）
+            log: 日志记录器（默认模块日志）
+            headers: 探测与链接校验使用的请求头（默认 network.headers）
+            should_stop: 返回 True 时停止发起新请求
+        """
+        self.config = config or {}
+        self.smart_cache = smart_cache
+        self.logger = log or logger
+        self.should_stop = should_stop or (lambda: False)
+
+        crawler_cfg = self.config.get('async_crawler', {}) or {}
+        self.max_in_flight = max(1, int(crawler_cfg.get('max_in_flight', DEFAULT_MAX_IN_FLIGHT)))
+        self.max_concurrent_models = max(1, int(crawler_cfg.get('max_concurrent_models', DEFAULT_MAX_CONCURRENT_MODELS)))
+
+        self.probe_headers = headers or self.config.get('network', {}).get('headers') or {
+            'User-Agent': LISTING_HEADERS['User-Agent']
+        }
+        self.proxy_url = resolve_proxy_url(self.config)
+        self.scheduler = get_host_scheduler(self.config)
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._request_proxy: Optional[str] = None
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._sites: Dict[str, ListingSite] = {}
+
+    async def __aenter__(self):
+        """创建会话（必须在事件循环内调用）"""
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        if self.proxy_url and self.proxy_url.startswith('socks'):
+            connector = ProxyConnector.from_url(self.proxy_url, limit=self.max_in_flight, ssl=False)
+            self._request_proxy = None
+        else:
+            connector = aiohttp.TCPConnector(limit=self.max_in_flight, ttl_dns_cache=300, ssl=False)
+            self._request_proxy = self.proxy_url
+        self.session = aiohttp.ClientSession(connector=connector)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def _site(self, module_name: str) -> ListingSite:
+        key = (module_name or "PORN").upper()
+        if key not in self._sites:
+            self._sites[key] = get_listing_site(key)
+        return self._sites[key]
+
+    async def fetch_text(self, url: str, headers: Dict[str, str], timeout: float) -> str:
+        """按站点限速后抓取页面文本（请求失败时抛出 aiohttp.ClientError，回放模式下为 requests.HTTPError）"""
+        # 预约时间片后在事件循环中等待，不占用进行中的请求名额
+        delay = self.scheduler.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        # 离线回放：直接读取录制内容（与同步 http_get 共用 fixture）
+        if get_http_mode() == 'replay':
+            resp = await _in_thread(get_fixture_store().replay, 'GET', url, headers)
+            resp.raise_for_status()
+            return resp.text
+
+        async with self._in_flight:
+            async with self.session.get(url, headers=headers, proxy=self._request_proxy,
+                                        timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                body = await resp.read()
+                if get_http_mode() == 'record':
+                    await _in_thread(get_fixture_store().record, url, resp.status, resp.headers, body)
+                resp.raise_for_status()
+                return body.decode('utf-8', errors='replace')
+
+    async def probe(self, url: str) -> Tuple[str, List[str]]:
+        """轻量探测远端：抓取首页标题并生成签名（同 probe_remote_signature）"""
+        text = await self.fetch_text(url, self.probe_headers, 15)
+        titles = select_texts(text, PROBE_TITLE_SELECTOR, min_length=3)
+        return compute_remote_signature_from_titles(titles), titles
+
+    async def check_url(self, url: str, timeout: float = 8) -> bool:
+        """校验链接是否可用（优先HEAD，403/405 时尝试GET，同 check_url_available）"""
+        if not url or not isinstance(url, str):
+            return False
+        if get_http_mode() == 'replay':
+            resp = await _in_thread(get_fixture_store().replay, 'HEAD', url, self.probe_headers)
+            return resp.status_code < 400
+
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        try:
+            async with self._in_flight:
+                async with self.session.head(url, headers=self.probe_headers, proxy=self._request_proxy,
+                                             timeout=client_timeout, allow_redirects=True) as resp:
+                    if resp.status < 400:
+                        return True
+                    if resp.status not in (403, 405):
+                        return False
+                async with self.session.get(url, headers=self.probe_headers, proxy=self._request_proxy,
+                                            timeout=client_timeout, allow_redirects=True) as resp:
+                    return resp.status < 400
+        except Exception:
+            return False
+
+    async def check_urls(self, urls: List[str], timeout: float = 8) -> List[bool]:
+        """并发校验一组链接，结果与输入顺序一致"""
+        return list(await asyncio.gather(*(self.check_url(u, timeout) for u in urls)))
+
+    async def crawl_listing(self, job: CrawlJob) -> Tuple[Set[str], Dict[str, str]]:
+        """
+        翻页抓取单个模特的列表页（流程与 fetch_with_requests_only_* 一致）
+
+        Args:
+            job: 抓取任务
+
+        Returns:
+            (标题集合, 标题->链接映射)
+        """
+        site = self._site(job.module_name)
+        tag, url, model_name, smart_cache = site.name, job.url, job.model_name, self.smart_cache
+        log = self.logger
+
+        if site.prepare:
+            await _in_thread(site.prepare, smart_cache, model_name, url, log)
+
+        all_titles = set()
+        title_to_url = {}
+
+        max_pages = job.max_pages
+        start_page = 1
+        if smart_cache and model_name:
+            start_page, max_pages = await _in_thread(smart_cache.get_incremental_fetch_range, model_name, max_pages)
+            if start_page > 1:
+                cached_titles = await _in_thread(smart_cache.get_cached_titles, model_name)
+                all_titles.update(cached_titles)
+                log.info(f"  {tag} - 增量模式，已加载 {len(cached_titles)} 个缓存标题")
+
+        early_stop = await _in_thread(IncrementalStopTracker, smart_cache, model_name, self.config)
+        ownership = site.make_ownership(model_name, url, log)
+
+        page_num = start_page
+        consecutive_empty_pages = 0
+
+        while not self.should_stop():
+            if smart_cache and model_name and page_num < start_page + 3:  # 只检查前3页
+                if not await _in_thread(smart_cache.should_update_page, model_name, page_num):
+                    log.debug(f"  {tag} - 第 {page_num} 页在缓存有效期内，跳过")
+                    page_num += 1
+                    continue
+
+            page_url = _page_url(url, page_num)
+            log.info(f"  {tag} - 抓取第 {page_num} 页: {page_url}")
+
+            try:
+                text = await self.fetch_text(page_url, LISTING_HEADERS, site.timeout)
+            except (aiohttp.ClientError, asyncio.TimeoutError, requests.RequestException) as e:
+                log.error(f"  {tag} - 第 {page_num} 页请求失败: {e}")
+                break
+
+            soup = make_soup(text, self.config)
+            page_titles, page_videos = site.extract_page(soup, url, self.config, ownership, log)
+            title_to_url.update(page_videos)
+
+            if page_titles:
+                prev_count = len(all_titles)
+                all_titles.update(page_titles)
+                log.info(f"  {tag} - 第 {page_num} 页提取到 {len(page_titles)} 个标题（新增 {len(all_titles) - prev_count} 个）")
+
+                if smart_cache and model_name:
+                    await _in_thread(smart_cache.save_page, model_name, page_num,
+                                     [(t, u, page_num) for t, u in page_videos])
+
+                consecutive_empty_pages = 0
+
+                if early_stop.observe_page(page_titles):
+                    log.info(f"  {tag} - 第 {page_num} 页内容均已缓存，提前停止翻页")
+                    await _in_thread(early_stop.merge_cached, all_titles, title_to_url)
+                    break
+            else:
+                log.warning(f"  {tag} - 第 {page_num} 页未找到视频标题")
+                consecutive_empty_pages += 1
+                if consecutive_empty_pages >= 2:
+                    log.info(f"  {tag} - 连续2页无数据，停止抓取")
+                    break
+
+            if not site.has_next_page(soup, page_num, log):
+                log.info(f"  {tag} - 没有下一页，停止抓取")
+                if smart_cache and model_name:
+                    await _in_thread(smart_cache.mark_full_fetch_completed, model_name, page_num)
+                break
+
+            if max_pages > 0 and page_num >= max_pages:
+                log.info(f"  {tag} - 达到最大页数限制 {max_pages}，停止抓取")
+                break
+
+            page_num += 1
+
+        # 写入只在内存中刷新的页面时间戳（未变化的页面不逐页重写缓存文件）
+        if smart_cache and model_name:
+            await _in_thread(smart_cache.flush, model_name)
+
+        log.info(f"  {tag} - 总共提取到 {len(all_titles)} 个视频标题")
+        return all_titles, title_to_url
+
+    async def crawl_model(self, job: CrawlJob, listing_needed: Optional[Callable] = None) -> CrawlResult:
+        """
+        探测 + 按需翻页抓取单个模特
+
+        Args:
+            job: 抓取任务
+            listing_needed: (job, 远端签名) -> bool，返回 False 时跳过翻页抓取（如查重缓存命中）
+        """
+        result = CrawlResult(model_name=job.model_name, url=job.url)
+        try:
+            result.remote_signature, result.probe_titles = await self.probe(job.url)
+            result.probed = True
+        except Exception as e:
+            self.logger.warning(f"{job.model_name}: 远端轻量探测失败，将回退完整抓取 ({e})")
+
+        if self.should_stop():
+            return result
+        if listing_needed and not await _in_thread(listing_needed, job, result.remote_signature):
+            return result
+
+        try:
+            result.titles, result.title_to_url = await self.crawl_listing(job)
+            result.listing_fetched = True
+        except Exception as e:
+            result.error = str(e)
+            self.logger.error(f"  {job.module_name} - {job.model_name}: 异步抓取失败: {e}")
+        return result
+
+    async def crawl_models(self, jobs: List[CrawlJob], listing_needed: Optional[Callable] = None) -> Dict[str, CrawlResult]:
+        """并发抓取多个模特（同时翻页的模特数受 max_concurrent_models 限制）"""
+        model_slots = asyncio.Semaphore(self.max_concurrent_models)
+
+        async def _run(job: CrawlJob) -> CrawlResult:
+            async with model_slots:
+                return await self.crawl_model(job, listing_needed)
+
+        results = await asyncio.gather(*(_run(job) for job in jobs))
+        return {r.model_name: r for r in results}
+
+
+def crawl_models(jobs: List[CrawlJob], config: dict = None, smart_cache=None, log: logging.Logger = None,
+                 listing_needed: Optional[Callable] = None,
+                 should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, CrawlResult]:
+    """
+    同步入口：在一个事件循环中完成所有模特的探测与列表抓取
+
+    Args:
+        jobs: 抓取任务列表
+        config: 配置字典
+        smart_cache: 智能缓存实例
+        log: 日志记录器
+        listing_needed: (job, 远端签名) -> bool，返回 False 时只探测不翻页
+        should_stop: 返回 True 时停止发起新请求
+
+    Returns:
+        {模特名: CrawlResult}
+    """
+    async def _main():
+        async with AsyncListingCrawler(config, smart_cache, log, should_stop=should_stop) as crawler:
+            return await crawler.crawl_models(jobs, listing_needed)
+
+    return asyncio.run(_main())
+
+
+def check_urls_available(urls: List[str], config: dict = None, headers: Optional[Dict[str, str]] = None,
+                         timeout: float = 8) -> List[bool]:
+    """同步入口：并发校验一组链接（用于查重缓存快速路径）"""
+    async def _main():
+        async with AsyncListingCrawler(config, headers=headers) as crawler:
+            return await crawler.check_urls(urls, timeout)
+
+    return asyncio.run(_main())
@@ -1,6 +1,21 @@
 """
 异步下载引擎模块
 基于asyncio和aiohttp实现高性能并发下载
+
+断点续传：下载中的文件保存为 <文件>.tmp，旁边的 <文件>.tmp.json 记录URL、ETag/Last-Modified、
+总大小与各区间已完成的字节数。失败或取消时保留两者，重试时用 Range + If-Range 从断点继续；
+远端内容变化（校验信息不符或服务器返回 200）时从头下载。
+服务器支持 Range 且文件不小于 range_split_min_mb 时，拆成 range_chunks 个区间并行下载。
+
+不单独发送 HEAD：文件大小与校验信息取自第一个 GET 的响应头。
+接收的数据攒到 write_buffer_mb 再写盘，进度每秒最多更新一次；
+preallocate 开启时用 posix_fallocate 预先分配完整大小。
+
+启用 download.queue 时，enqueue() 把任务写入持久化队列（SQLite），drain_queue() 依次执行；
+auto_resume 开启时 start() 会自动继续上次未完成的队列任务。
+
+任务登记表只在内存中保留进行中与最近 keep_finished_tasks 个已结束的任务，
+更早的任务归档到队列数据库的 download_history 表；get_statistics() 使用随状态变化维护的计数。
 """
 
 import asyncio
@@ -8,17 +23,33 @@ import aiohttp
 import aiofiles
 import os
 import re
+import json
 import logging
 import time
+import uuid
+import itertools
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import partial
 from typing import Dict, List, Optional, Tuple, Callable, Any
 from pathlib import Path
 from urllib.parse import urljoin, urlparse
 from dataclasses import dataclass, field
 from enum import Enum
 
+from .bandwidth_limiter import get_bandwidth_limiter
+from .download_feedback import record_download_success
+from .download_index import get_download_index
+from .download_queue import get_download_queue, queue_settings
+
 logger = logging.getLogger(__name__)
 
 
+class _RemoteChanged(Exception):
+    """续传时发现远端文件已变化"""
+
+
 class DownloadStatus(Enum):
     """下载状态枚举"""
     PENDING = "pending"
@@ -48,6 +79,120 @@ class DownloadTask:
     max_retries: int = 3
     headers: Dict[str, str] = field(default_factory=dict)
     callback: Optional[Callable] = None
+    model: str = ""     # 所属模特（完成后回写该模特的查重状态）
+
+
+_FINISHED_STATUSES = (DownloadStatus.COMPLETED, DownloadStatus.FAILED, DownloadStatus.CANCELLED)
+DEFAULT_KEEP_FINISHED_TASKS = 1000
+ARCHIVE_BATCH_SIZE = 100
+
+
+def _iso(timestamp: float) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+class DownloadTaskRegistry:
+    """
+    引擎的任务登记表（线程安全）
+    待下载/下载中的任务常驻内存；已结束的任务只保留最近 keep_finished 个，
+    并按批归档到持久化存储（download_history）。各状态计数随状态变化增减，统计为 O(1)。
+    """
+
+    def __init__(self, keep_finished: int = DEFAULT_KEEP_FINISHED_TASKS, store=None):
+        """
+        初始化登记表
+
+        Args:
+            keep_finished: 内存中保留的已结束任务数
+            store: 归档存储（DownloadQueueStore；None 时已结束任务只在内存中淘汰）
+        """
+        self.keep_finished = max(0, int(keep_finished))
+        self.store = store
+        self._lock = threading.Lock()
+        self._active: Dict[str, DownloadTask] = {}
+        self._finished: 'OrderedDict[str, DownloadTask]' = OrderedDict()
+        self._unarchived: List[DownloadTask] = []
+        self._counts: Dict[str, int] = {status.value: 0 for status in DownloadStatus}
+        self._total = 0
+        # 每个引擎实例不同的前缀 + 递增序号：同一微秒内连续添加、多次运行归档到同一张表都不会重复
+        self._prefix = f"task_{uuid.uuid4().hex[:8]}"
+        self._seq = itertools.count(1)
+
+    def new_id(self) -> str:
+        return f"{self._prefix}_{next(self._seq)}"
+
+    def add(self, task: DownloadTask):
+        with self._lock:
+            self._active[task.task_id] = task
+            self._counts[task.status.value] += 1
+            self._total += 1
+
+    def get(self, task_id: str) -> Optional[DownloadTask]:
+        with self._lock:
+            return self._active.get(task_id) or self._finished.get(task_id)
+
+    def __contains__(self, task_id: str) -> bool:
+        return self.get(task_id) is not None
+
+    def set_status(self, task: DownloadTask, status: DownloadStatus):
+        """更新任务状态与计数；结束的任务移入最近列表，超出上限时淘汰最早结束的任务"""
+        with self._lock:
+            if task.status is status:
+                return
+            self._counts[task.status.value] -= 1
+            self._counts[status.value] += 1
+            task.status = status
+            if status in _FINISHED_STATUSES:
+                if self._active.pop(task.task_id, None) is not None or task.task_id in self._finished:
+                    self._finished[task.task_id] = task
+                    self._finished.move_to_end(task.task_id)
+                    if self.store is not None:
+                        self._unarchived.append(task)
+                while len(self._finished) > self.keep_finished:
+                    self._finished.popitem(last=False)
+            elif task.task_id in self._finished:
+                # 重新下载已结束的任务
+                self._active[task.task_id] = self._finished.pop(task.task_id)
+
+    def tasks(self) -> List[DownloadTask]:
+        """内存中的任务（进行中与最近结束的）"""
+        with self._lock:
+            return list(self._active.values()) + list(self._finished.values())
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            stats = {'total': self._total}
+            stats.update(self._counts)
+            return stats
+
+    @property
+    def needs_flush(self) -> bool:
+        return len(self._unarchived) >= ARCHIVE_BATCH_SIZE
+
+    def flush(self) -> int:
+        """把待归档的已结束任务写入存储，返回写入数量"""
+        with self._lock:
+            batch, self._unarchived = self._unarchived, []
+        if not batch or self.store is None:
+            return 0
+        records = [{
+            'task_id': task.task_id,
+            'url': task.url,
+            'filename': task.filename,
+            'save_path': str(task.save_path),
+            'status': task.status.value,
+            'bytes_done': task.downloaded_bytes,
+            'total_bytes': task.total_bytes,
+            'retries': task.retries,
+            'last_error': task.error_message[:500],
+            'started_at': _iso(task.start_time),
+            'finished_at': _iso(task.end_time) or datetime.now().isoformat(),
+        } for task in batch]
+        try:
+            return self.store.archive_tasks(records)
+        except Exception as e:
+            logger.warning(f"归档下载任务失败: {e}")
+            return 0
 
 
 class AsyncDownloadEngine:
@@ -55,7 +200,6 @@ class AsyncDownloadEngine:
     
     def __init__(self, config: dict = None):
         self.config = config or {}
-        self.tasks: Dict[str, DownloadTask] = {}
         self.session: Optional[aiohttp.ClientSession] = None
         self.running = False
         self.semaphore = None
@@ -63,14 +207,35 @@ class AsyncDownloadEngine:
         # 下载配置
         self.max_concurrent = self.config.get('download', {}).get('max_workers', 4)
         self.timeout = self.config.get('download', {}).get('timeout', 300)
-        self.chunk_size = self.config.get('download', {}).get('chunk_size', 8192)
+        self.chunk_size = self.config.get('download', {}).get('chunk_size', 64 * 1024)
+        # 攒够多少数据写一次盘（0 表示收到即写）
+        self.write_buffer_bytes = int(self.config.get('download', {}).get('write_buffer_mb', 2) * 1024 * 1024)
+        self.preallocate = self.config.get('download', {}).get('preallocate', False)
         self.retry_delay = self.config.get('download', {}).get('retry_delay', 5)
         
+        # 断点续传与分段并行下载
+        self.resume_enabled = self.config.get('download', {}).get('resume', True)
+        self.range_chunks = max(1, int(self.config.get('download', {}).get('range_chunks', 4)))
+        self.range_split_min_bytes = int(self.config.get('download', {}).get('range_split_min_mb', 64) * 1024 * 1024)
+        
+        # 共享带宽限速（download.bandwidth）
+        self.bandwidth = get_bandwidth_limiter(self.config)
+        
         # 代理配置
         self.proxy_config = self.config.get('network', {}).get('proxy', {})
         self.proxy = None
         if self.proxy_config.get('enabled', False):
             self.proxy = self.proxy_config.get('http', 'socks5://127.0.0.1:10808')
+        
+        # 持久化下载队列（未启用时为 None）
+        self.queue = get_download_queue(self.config)
+        self._drain_task: Optional[asyncio.Future] = None
+        
+        # 任务登记表（已结束的任务只保留最近的，其余归档到队列数据库）
+        self.registry = DownloadTaskRegistry(
+            self.config.get('download', {}).get('keep_finished_tasks', DEFAULT_KEEP_FINISHED_TASKS),
+            store=self.queue,
+        )
     
     async def __aenter__(self):
         """异步上下文管理器进入"""
@@ -91,8 +256,9 @@ class AsyncDownloadEngine:
         
         # 创建HTTP会话
         connector = aiohttp.TCPConnector(
-            limit=self.max_concurrent * 2,
-            limit_per_host=5,
+            # 分段并行时每个任务占用 range_chunks 个连接
+            limit=self.max_concurrent * max(2, self.range_chunks),
+            limit_per_host=max(5, self.range_chunks),
             ttl_dns_cache=300,
             use_dns_cache=True
         )
@@ -113,6 +279,11 @@ class AsyncDownloadEngine:
         
         self.running = True
         logger.info(f"异步下载引擎已启动，最大并发数: {self.max_concurrent}")
+        
+        # 继续上次未完成的队列任务
+        if self.queue is not None and queue_settings(self.config)['auto_resume'] and self.queue.unfinished('file'):
+            logger.info("♻️ 发现未完成的下载队列，自动继续")
+            self._drain_task = asyncio.ensure_future(self.drain_queue())
     
     async def stop(self):
         """停止下载引擎"""
@@ -121,14 +292,21 @@ class AsyncDownloadEngine:
         
         self.running = False
         
+        # 停止队列执行：进行中的任务放回队列，下次启动时续传
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            await asyncio.gather(self._drain_task, return_exceptions=True)
+            self._drain_task = None
+        
         if self.session:
             await self.session.close()
             self.session = None
         
+        await asyncio.get_running_loop().run_in_executor(None, self.registry.flush)
         logger.info("异步下载引擎已停止")
     
     def add_task(self, url: str, filename: str, save_path: str, 
-                 headers: Dict[str, str] = None, callback: Callable = None) -> str:
+                 headers: Dict[str, str] = None, callback: Callable = None, model: str = "") -> str:
         """
         添加下载任务
         
@@ -138,11 +316,12 @@ class AsyncDownloadEngine:
             save_path: 保存路径
             headers: 请求头
             callback: 完成回调函数
+            model: 所属模特（可选）
             
         Returns:
             任务ID
         """
-        task_id = f"task_{int(time.time() * 1000000)}"
+        task_id = self.registry.new_id()
         
         task = DownloadTask(
             task_id=task_id,
@@ -150,10 +329,11 @@ class AsyncDownloadEngine:
             filename=filename,
             save_path=Path(save_path),
             headers=headers or {},
-            callback=callback
+            callback=callback,
+            model=model
         )
         
-        self.tasks[task_id] = task
+        self.registry.add(task)
         logger.info(f"添加下载任务: {filename} (ID: {task_id})")
         return task_id
     
@@ -167,11 +347,11 @@ class AsyncDownloadEngine:
         Returns:
             下载结果字典
         """
-        if task_id not in self.tasks:
+        task = self.registry.get(task_id)
+        if task is None:
             return {"success": False, "error": "任务不存在"}
         
-        task = self.tasks[task_id]
-        task.status = DownloadStatus.DOWNLOADING
+        self.registry.set_status(task, DownloadStatus.DOWNLOADING)
         task.start_time = time.time()
         
         try:
@@ -180,15 +360,20 @@ class AsyncDownloadEngine:
                 return result
                 
         except asyncio.CancelledError:
-            task.status = DownloadStatus.CANCELLED
             task.error_message = "任务被取消"
+            task.end_time = time.time()
+            self.registry.set_status(task, DownloadStatus.CANCELLED)
             logger.info(f"任务被取消: {task_id}")
             return {"success": False, "error": "任务被取消"}
         except Exception as e:
-            task.status = DownloadStatus.FAILED
             task.error_message = str(e)
+            task.end_time = time.time()
+            self.registry.set_status(task, DownloadStatus.FAILED)
             logger.error(f"下载任务失败: {task_id} - {e}")
             return {"success": False, "error": str(e)}
+        finally:
+            if self.registry.needs_flush:
+                await asyncio.get_running_loop().run_in_executor(None, self.registry.flush)
     
     async def _download_task(self, task: DownloadTask) -> Dict[str, Any]:
         """执行单个下载任务"""
@@ -196,12 +381,17 @@ class AsyncDownloadEngine:
         task.save_path.parent.mkdir(parents=True, exist_ok=True)
         file_path = task.save_path / task.filename
         
-        # 检查文件是否已存在
-        if file_path.exists():
-            task.status = DownloadStatus.COMPLETED
+        # 检查文件是否已存在（与完整目录下载共用目录索引，同名不同清理方式的文件也能识别）
+        index = get_download_index(task.save_path, self.config)
+        existing = file_path if file_path.exists() else index.find(task.filename)
+        if existing is not None:
+            file_path = existing
             task.progress = 100.0
             task.downloaded_bytes = file_path.stat().st_size
             task.total_bytes = task.downloaded_bytes
+            task.end_time = time.time()
+            self.registry.set_status(task, DownloadStatus.COMPLETED)
+            await self._record_success(task, file_path)
             
             result = {
                 "success": True,
@@ -219,7 +409,9 @@ class AsyncDownloadEngine:
         # 执行下载
         for attempt in range(task.max_retries + 1):
             try:
-                return await self._perform_download(task, file_path)
+                result = await self._perform_download(task, file_path)
+                await self._record_success(task, file_path)
+                return result
             except Exception as e:
                 task.retries += 1
                 if attempt < task.max_retries:
@@ -231,93 +423,419 @@ class AsyncDownloadEngine:
         # 如果所有重试都失败
         raise Exception(f"下载失败，已重试{task.max_retries}次")
     
+    async def _record_success(self, task: DownloadTask, file_path: Path):
+        """下载成功后回写目录索引与查重状态（SQLite 写入放到线程池执行）"""
+        await asyncio.get_running_loop().run_in_executor(None, partial(
+            record_download_success, self.config, task.model, task.url, file_path,
+            save_dir=task.save_path, title=file_path.stem))
+    
+    # ==================== 断点续传 ====================
+    
+    @staticmethod
+    def _resume_paths(file_path: Path) -> Tuple[Path, Path]:
+        """临时文件与续传状态文件（<文件>.tmp / <文件>.tmp.json）"""
+        temp_path = file_path.with_suffix(file_path.suffix + '.tmp')
+        return temp_path, temp_path.with_suffix(temp_path.suffix + '.json')
+    
+    @staticmethod
+    def _save_resume_state(state_path: Path, state: Dict[str, Any]):
+        tmp_path = state_path.with_suffix(state_path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+    
+    def _load_resume_state(self, state_path: Path, temp_path: Path, url: str) -> Optional[Dict[str, Any]]:
+        """
+        读取可续传的状态（远端是否变化由续传请求的 If-Range 与 Content-Range 判断）
+        """
+        if not self.resume_enabled or not state_path.exists() or not temp_path.exists():
+            return None
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except Exception:
+            return None
+        
+        # 签名URL每次都会变化，ETag 相同即视为同一文件
+        if state.get('url') != url and not state.get('etag'):
+            return None
+        
+        chunks = state.get('chunks') or []
+        if not chunks:
+            return None
+        # 单连接顺序写入且未预分配时，以实际文件大小为准（状态文件可能落后最多一个保存周期）
+        if len(chunks) == 1 and not state.get('preallocated'):
+            chunks[0][2] = temp_path.stat().st_size
+        return state
+    
+    def _plan_chunks(self, total_bytes: int, accept_ranges: bool) -> List[List[int]]:
+        """
+        划分下载区间 [[start, end, done], ...]（end 为 -1 表示到文件末尾）
+        
+        支持 Range 且文件足够大时拆成多个区间并行下载，否则单连接下载
+        """
+        if (accept_ranges and self.range_chunks > 1 and total_bytes > 0
+                and total_bytes >= self.range_split_min_bytes):
+            size = -(-total_bytes // self.range_chunks)
+            return [[start, min(start + size, total_bytes) - 1, 0] for start in range(0, total_bytes, size)]
+        return [[0, -1, 0]]
+    
+    def _request_headers(self, task: DownloadTask) -> Dict[str, str]:
+        # 字节偏移必须对应原始内容，不接受压缩传输
+        headers = {'Accept-Encoding': 'identity'}
+        headers.update(task.headers)
+        return headers
+    
+    @staticmethod
+    def _response_total(response: aiohttp.ClientResponse, position: int = 0) -> int:
+        """响应对应的文件总大小（206 取 Content-Range，否则取 Content-Length；未知时返回 0）"""
+        if response.status == 206:
+            match = re.match(r'bytes\s+\d+-\d+/(\d+)', response.headers.get('Content-Range', ''))
+            return int(match.group(1)) if match else 0
+        content_length = int(response.headers.get('Content-Length', 0) or 0)
+        return position + content_length if content_length else 0
+    
+    def _preallocate(self, temp_path: Path, total_bytes: int, sparse: bool) -> bool:
+        """
+        为临时文件预分配空间（download.preallocate，posix_fallocate 减少大文件碎片）
+        
+        Returns:
+            是否已预分配；未预分配且 sparse 为 True 时把文件扩展到完整大小（分段写入需要）
+        """
+        with open(temp_path, 'r+b') as f:
+            if self.preallocate and hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(f.fileno(), 0, total_bytes)
+                    return True
+                except OSError as e:
+                    logger.debug(f"预分配失败，改用稀疏文件: {e}")
+            if sparse:
+                f.truncate(total_bytes)
+        return False
+    
+    def _update_progress(self, task: DownloadTask, meter: Dict[str, float], force: bool = False):
+        """更新进度、速度与ETA（每秒一次）"""
+        current_time = time.time()
+        if not force and current_time - meter['last_update'] < 1.0:
+            return
+        time_diff = max(current_time - meter['last_update'], 1e-6)
+        bytes_diff = task.downloaded_bytes - meter['last_bytes']
+        
+        task.speed = bytes_diff / time_diff
+        task.progress = (task.downloaded_bytes / task.total_bytes * 100) if task.total_bytes > 0 else 0
+        
+        # 计算ETA
+        if task.speed > 0 and task.total_bytes > 0:
+            task.eta = (task.total_bytes - task.downloaded_bytes) / task.speed
+        else:
+            task.eta = 0
+        
+        meter['last_update'] = current_time
+        meter['last_bytes'] = task.downloaded_bytes
+    
+    async def _write_body(self, task: DownloadTask, response: aiohttp.ClientResponse, temp_path: Path,
+                          chunk: List[int], state: Dict[str, Any], state_path: Path, meter: Dict[str, float]):
+        """
+        把响应内容写入临时文件的区间位置
+        
+        数据先攒到 write_buffer_mb 再写盘（每次写盘一次线程切换），进度与续传状态也只在写盘后更新；
+        chunk[2] 只统计已写盘的字节。区间有上限时读够即停止。
+        """
+        start, end, done = chunk
+        position = start + done
+        remaining = end - position + 1 if end >= 0 else None
+        buffer = bytearray()
+        last_saved = time.time()
+        
+        async with aiofiles.open(temp_path, 'r+b') as f:
+            await f.seek(position)
+            try:
+                async for data in response.content.iter_chunked(self.chunk_size):
+                    if not self.running:
+                        raise asyncio.CancelledError("下载引擎已停止")
+                    if task.status == DownloadStatus.CANCELLED:
+                        raise asyncio.CancelledError("任务被取消")
+                    
+                    if remaining is not None:
+                        data = data[:remaining]
+                        remaining -= len(data)
+                    buffer += data
+                    task.downloaded_bytes += len(data)
+                    await self.bandwidth.athrottle(len(data), task.url)
+                    
+                    if len(buffer) >= self.write_buffer_bytes:
+                        await f.write(buffer)
+                        chunk[2] += len(buffer)
+                        buffer.clear()
+                        self._update_progress(task, meter)
+                        
+                        # 定期记录续传状态
+                        if self.resume_enabled and time.time() - last_saved >= 2.0:
+                            await f.flush()
+                            self._save_resume_state(state_path, state)
+                            last_saved = time.time()
+                    
+                    if remaining == 0:
+                        break
+            finally:
+                # 出错时已收到的数据同样有效，写盘后用于续传
+                if buffer:
+                    await f.write(buffer)
+                    chunk[2] += len(buffer)
+    
+    async def _download_chunk(self, task: DownloadTask, temp_path: Path, chunk: List[int],
+                              state: Dict[str, Any], state_path: Path, meter: Dict[str, float]):
+        """续传或并行下载一个区间（chunk[2] 记录已完成字节数）"""
+        start, end, done = chunk
+        position = start + done
+        if end >= 0 and position > end:
+            return
+        
+        headers = self._request_headers(task)
+        ranged = position > 0 or end >= 0
+        if ranged:
+            headers['Range'] = f"bytes={position}-{end if end >= 0 else ''}"
+            # 远端内容变化时服务器返回 200 完整内容，而不是错误拼接的片段
+            if_range = state.get('etag') or state.get('last_modified')
+            if if_range and position > 0:
+                headers['If-Range'] = if_range
+        
+        async with self.session.get(task.url, proxy=self.proxy, headers=headers) as response:
+            if response.status == 416 and end < 0 and task.total_bytes and position >= task.total_bytes:
+                return  # 已下载完整
+            response.raise_for_status()
+            
+            if ranged:
+                total = self._response_total(response, position)
+                changed = response.status != 206 or (state.get('total_bytes') and total
+                                                     and total != state['total_bytes'])
+                if changed:
+                    if len(state['chunks']) > 1 or response.status == 206:
+                        raise _RemoteChanged()
+                    # 服务器不支持续传或内容已变化：用这个完整响应从头写入，大小与校验信息以新响应为准
+                    logger.info(f"服务器未接受 Range 请求，从头下载: {task.filename}")
+                    task.downloaded_bytes -= done
+                    chunk[2] = 0
+                    state.update({
+                        'etag': response.headers.get('ETag', ''),
+                        'last_modified': response.headers.get('Last-Modified', ''),
+                        'total_bytes': self._response_total(response),
+                        'preallocated': False,
+                    })
+                    task.total_bytes = state['total_bytes']
+                    async with aiofiles.open(temp_path, 'wb'):
+                        pass
+            
+            if not task.total_bytes:
+                task.total_bytes = state['total_bytes'] = self._response_total(response, position)
+            
+            await self._write_body(task, response, temp_path, chunk, state, state_path, meter)
+    
+    async def _gather_chunks(self, coroutines: List[Any]):
+        """并行执行各区间，任一区间失败时取消其余区间（已写盘部分保留用于续传）"""
+        workers = [asyncio.ensure_future(c) for c in coroutines]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+    
+    async def _download_fresh(self, task: DownloadTask, temp_path: Path, state: Dict[str, Any],
+                              state_path: Path, meter: Dict[str, float]):
+        """
+        从头下载：第一个 GET 同时用于获取大小与校验信息（不再单独发送 HEAD）
+        
+        可分段时先请求 bytes=0-，响应头确定总大小后划分区间，这个响应本身继续下载第一个区间，
+        其余区间另开连接并行下载。
+        """
+        headers = self._request_headers(task)
+        if self.range_chunks > 1:
+            headers['Range'] = 'bytes=0-'
+        
+        async with self.session.get(task.url, proxy=self.proxy, headers=headers) as response:
+            response.raise_for_status()
+            total_bytes = self._response_total(response)
+            state.update({
+                'etag': response.headers.get('ETag', ''),
+                'last_modified': response.headers.get('Last-Modified', ''),
+                'total_bytes': total_bytes,
+            })
+            task.total_bytes = total_bytes
+            accept_ranges = (response.status == 206
+                             or response.headers.get('Accept-Ranges', '').lower() == 'bytes')
+            state['chunks'] = self._plan_chunks(total_bytes, accept_ranges)
+            if total_bytes:
+                state['preallocated'] = await asyncio.get_running_loop().run_in_executor(
+                    None, self._preallocate, temp_path, total_bytes, len(state['chunks']) > 1)
+            if len(state['chunks']) > 1:
+                logger.info(f"分 {len(state['chunks'])} 段并行下载: {task.filename}")
+            
+            first, others = state['chunks'][0], state['chunks'][1:]
+            await self._gather_chunks(
+                [self._write_body(task, response, temp_path, first, state, state_path, meter)] +
+                [self._download_chunk(task, temp_path, chunk, state, state_path, meter) for chunk in others]
+            )
+    
     async def _perform_download(self, task: DownloadTask, file_path: Path) -> Dict[str, Any]:
-        """执行实际的下载操作"""
+        """执行实际的下载操作（支持断点续传与分段并行下载）"""
         # 确保父目录存在
         file_path.parent.mkdir(parents=True, exist_ok=True)
-        temp_path = file_path.with_suffix(file_path.suffix + '.tmp')
+        temp_path, state_path = self._resume_paths(file_path)
+        state = None
         
         try:
-            # 发送HEAD请求获取文件大小
-            async with self.session.head(task.url, proxy=self.proxy, headers=task.headers) as response:
-                if response.status == 200:
-                    task.total_bytes = int(response.headers.get('content-length', 0))
+            state = self._load_resume_state(state_path, temp_path, task.url)
+            meter = {'last_update': time.time(), 'last_bytes': 0}
+            if state is not None:
+                task.total_bytes = state.get('total_bytes') or 0
+                task.downloaded_bytes = meter['last_bytes'] = sum(c[2] for c in state['chunks'])
+                logger.info(f"♻️ 续传: {task.filename} 已完成 {task.downloaded_bytes / (1024*1024):.2f}MB")
+                try:
+                    await self._gather_chunks([
+                        self._download_chunk(task, temp_path, chunk, state, state_path, meter)
+                        for chunk in state['chunks']
+                    ])
+                except _RemoteChanged:
+                    logger.info(f"远端文件已变化，重新下载: {task.filename}")
+                    state = None
             
-            # 开始下载
-            async with self.session.get(task.url, proxy=self.proxy, headers=task.headers) as response:
-                response.raise_for_status()
-                
-                # 获取实际的文件大小
-                if task.total_bytes == 0:
-                    task.total_bytes = int(response.headers.get('content-length', 0))
-                
-                downloaded = 0
-                last_update = time.time()
-                last_bytes = 0
-                
-                async with aiofiles.open(temp_path, 'wb') as f:
-                    async for chunk in response.content.iter_chunked(self.chunk_size):
-                        if not self.running:
-                            raise asyncio.CancelledError("下载引擎已停止")
-                        
-                        await f.write(chunk)
-                        downloaded += len(chunk)
-                        task.downloaded_bytes = downloaded
-                        
-                        # 更新进度和速度
-                        current_time = time.time()
-                        if current_time - last_update >= 1.0:  # 每秒更新一次
-                            time_diff = current_time - last_update
-                            bytes_diff = downloaded - last_bytes
-                            
-                            task.speed = bytes_diff / time_diff
-                            task.progress = (downloaded / task.total_bytes * 100) if task.total_bytes > 0 else 0
-                            
-                            # 计算ETA
-                            if task.speed > 0 and task.total_bytes > 0:
-                                remaining_bytes = task.total_bytes - downloaded
-                                task.eta = remaining_bytes / task.speed
-                            else:
-                                task.eta = 0
-                            
-                            last_update = current_time
-                            last_bytes = downloaded
-                
-                # 下载完成
-                task.progress = 100.0
-                task.speed = 0.0
-                task.eta = 0.0
-                task.end_time = time.time()
-                task.status = DownloadStatus.COMPLETED
-                
-                # 重命名临时文件
-                temp_path.rename(file_path)
-                
-                result = {
-                    "success": True,
-                    "task_id": task.task_id,
-                    "file_path": str(file_path),
-                    "file_size": task.downloaded_bytes,
-                    "download_time": task.end_time - task.start_time,
-                    "average_speed": task.downloaded_bytes / (task.end_time - task.start_time)
-                }
-                
-                logger.info(f"下载完成: {task.filename} ({task.downloaded_bytes / (1024*1024):.2f}MB)")
-                
-                if task.callback:
-                    task.callback(task, result)
-                
-                return result
-                
-        except Exception as e:
-            # 清理临时文件
-            if temp_path.exists():
-                temp_path.unlink()
+            if state is None:
+                state = {'url': task.url, 'chunks': [[0, -1, 0]]}
+                task.total_bytes = task.downloaded_bytes = meter['last_bytes'] = 0
+                with open(temp_path, 'wb'):
+                    pass
+                await self._download_fresh(task, temp_path, state, state_path, meter)
+            
+            # 校验大小（预分配后文件大小恒为总大小，以各区间实际写入字节数为准）
+            written = sum(c[2] for c in state['chunks'])
+            if task.total_bytes and written != task.total_bytes:
+                raise Exception(f"文件大小不符: {written}/{task.total_bytes}")
+            
+            # 下载完成
+            task.downloaded_bytes = temp_path.stat().st_size
+            self._update_progress(task, meter, force=True)
+            task.progress = 100.0
+            task.speed = 0.0
+            task.eta = 0.0
+            task.end_time = time.time()
+            self.registry.set_status(task, DownloadStatus.COMPLETED)
+            
+            # 重命名临时文件
+            os.replace(temp_path, file_path)
+            if state_path.exists():
+                state_path.unlink()
+            
+            result = {
+                "success": True,
+                "task_id": task.task_id,
+                "file_path": str(file_path),
+                "file_size": task.downloaded_bytes,
+                "download_time": task.end_time - task.start_time,
+                "average_speed": task.downloaded_bytes / max(task.end_time - task.start_time, 1e-6)
+            }
+            
+            logger.info(f"下载完成: {task.filename} ({task.downloaded_bytes / (1024*1024):.2f}MB)")
+            
+            if task.callback:
+                task.callback(task, result)
+            
+            return result
+            
+        except BaseException:
+            # 保留已下载部分与状态用于续传；未启用续传时清理临时文件
+            if self.resume_enabled and state is not None and temp_path.exists():
+                self._save_resume_state(state_path, state)
+            else:
+                for path in (temp_path, state_path):
+                    if path.exists():
+                        path.unlink()
             raise
+    
+    # ==================== 持久化队列 ====================
+    
+    def enqueue(self, url: str, filename: str, save_path: str,
+                headers: Dict[str, str] = None, model: str = "") -> Optional[int]:
+        """
+        加入持久化下载队列（按 URL 幂等，由 drain_queue() 执行）
+        
+        Returns:
+            队列任务ID；未启用 download.queue 时返回 None
+        """
+        if self.queue is None:
+            logger.warning("下载队列未启用（download.queue.enabled）")
+            return None
+        payload = {k: v for k, v in (('headers', headers), ('model', model)) if v} or None
+        return self.queue.enqueue(url, filename, str(save_path), kind='file', payload=payload)
+    
+    def _record_queue_result(self, item_id: int, task: DownloadTask, result: Dict[str, Any],
+                             stats: Dict[str, int]):
+        """把一次下载的结果写回队列"""
+        if result.get('success'):
+            self.queue.mark_completed(item_id, result.get('file_path', ''), result.get('file_size'))
+            stats['completed'] += 1
+        elif not self.running:
+            self.queue.update_progress(item_id, task.downloaded_bytes, task.total_bytes)
+            self.queue.release(item_id)
+            stats['interrupted'] += 1
+        elif task.status == DownloadStatus.CANCELLED:
+            self.queue.mark_cancelled(item_id)
+            stats['cancelled'] += 1
+        else:
+            status = self.queue.mark_failed(item_id, result.get('error', ''))
+            stats['failed' if status == 'failed' else 'requeued'] += 1
+    
+    async def _persist_queue_progress(self, active: Dict[int, DownloadTask], interval: float = 5.0):
+        """定期把进行中任务的字节数写入队列"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            for item_id, task in list(active.items()):
+                await loop.run_in_executor(None, self.queue.update_progress,
+                                           item_id, task.downloaded_bytes, task.total_bytes)
+    
+    async def drain_queue(self, should_stop: Callable[[], bool] = None) -> Dict[str, int]:
+        """
+        执行持久化队列中的任务直到队列为空（最多 max_concurrent 个同时下载）
+        
+        Args:
+            should_stop: 返回 True 时不再领取新任务
+            
+        Returns:
+            {'completed', 'failed', 'requeued', 'cancelled', 'interrupted'}
+        """
+        stats = {'completed': 0, 'failed': 0, 'requeued': 0, 'cancelled': 0, 'interrupted': 0}
+        if self.queue is None:
+            return stats
+        
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.queue.recover_interrupted, 'file')
+        active: Dict[int, DownloadTask] = {}
+        
+        async def worker():
+            while self.running and not (should_stop and should_stop()):
+                item = await loop.run_in_executor(None, self.queue.claim_next, 'file')
+                if item is None:
+                    return
+                task_id = self.add_task(item.url, item.filename, item.save_path,
+                                        headers=item.payload.get('headers'), model=item.payload.get('model', ''))
+                task = active[item.id] = self.registry.get(task_id)
+                try:
+                    result = await self.download_single(task_id)
+                finally:
+                    active.pop(item.id, None)
+                await loop.run_in_executor(None, self._record_queue_result, item.id, task, result, stats)
+        
+        ticker = asyncio.ensure_future(self._persist_queue_progress(active))
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.max_concurrent)))
         finally:
-            # 清理临时文件（如果下载失败）
-            if temp_path.exists() and task.status != DownloadStatus.COMPLETED:
-                temp_path.unlink()
+            ticker.cancel()
+        
+        logger.info(f"下载队列执行结束: 完成 {stats['completed']}，失败 {stats['failed']}，"
+                    f"待重试 {stats['requeued']}，中断 {stats['interrupted']}")
+        return stats
     
     async def download_batch(self, task_ids: List[str]) -> List[Dict[str, Any]]:
         """
@@ -353,40 +871,32 @@ class AsyncDownloadEngine:
         return processed_results
     
     def get_task_status(self, task_id: str) -> Optional[DownloadTask]:
-        """获取任务状态"""
-        return self.tasks.get(task_id)
+        """获取任务状态（已淘汰出内存的任务返回 None，可通过 get_task_history() 查询）"""
+        return self.registry.get(task_id)
     
     def get_all_tasks(self) -> List[DownloadTask]:
-        """获取所有任务"""
-        return list(self.tasks.values())
+        """获取内存中的任务（进行中与最近结束的）"""
+        return self.registry.tasks()
+    
+    def get_task_history(self, limit: int = 100, status: str = None) -> List[Dict[str, Any]]:
+        """查询已归档的任务（未启用 download.queue 时为空）"""
+        if self.queue is None:
+            return []
+        self.registry.flush()
+        return self.queue.history(limit, status)
     
     def cancel_task(self, task_id: str) -> bool:
         """取消任务"""
-        if task_id in self.tasks:
-            task = self.tasks[task_id]
-            if task.status == DownloadStatus.DOWNLOADING:
-                task.status = DownloadStatus.CANCELLED
-                logger.info(f"任务已标记为取消: {task_id}")
-                return True
+        task = self.registry.get(task_id)
+        if task is not None and task.status == DownloadStatus.DOWNLOADING:
+            self.registry.set_status(task, DownloadStatus.CANCELLED)
+            logger.info(f"任务已标记为取消: {task_id}")
+            return True
         return False
     
     def get_statistics(self) -> Dict[str, int]:
-        """获取下载统计信息"""
-        stats = {
-            'total': len(self.tasks),
-            'pending': 0,
-            'downloading': 0,
-            'completed': 0,
-            'failed': 0,
-            'cancelled': 0
-        }
-        
-        for task in self.tasks.values():
-            status_key = task.status.value
-            if status_key in stats:
-                stats[status_key] += 1
-        
-        return stats
+        """获取下载统计信息（本次运行添加过的全部任务）"""
+        return self.registry.counts()
 
 
 class AsyncDownloaderAdapter:
@@ -0,0 +1,253 @@
+"""
+下载带宽限制
+AsyncDownloadEngine、PornDownloader（yt-dlp）与 V3 的 HLS 分片下载共用同一个限速器，
+全局与单站点（host）两级限速，所有线程/协程的下载速度合计不超过上限。
+
+实现与 HostRateScheduler 相同的令牌桶（GCRA 形式）：每个桶维护下一个可用时间点，
+每收到 n 字节预约 n / rate 秒，burst_seconds 秒的数据量可以突发，超出部分由调用方等待
+（线程中 time.sleep，协程中 asyncio.sleep）。
+
+限速取值优先级: 运行时覆盖（GUI 设置） > 当前时段的 profile > 基础配置。
+
+配置（download.bandwidth 段）:
+    limit_mb: 全局限速（MB/s，0 不限）
+    per_host_limit_mb: 单站点限速（MB/s，0 不限）
+    burst_seconds: 允许突发的秒数（默认 1）
+    profiles: 按时段覆盖 [{start: "09:00", end: "18:00", limit_mb, per_host_limit_mb}]，
+              end 早于 start 表示跨午夜；多个时段重叠时取第一个
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+DEFAULT_BURST_SECONDS = 1.0
+GLOBAL_BUCKET = '*'
+# 时段限速的重新计算间隔（秒）
+PROFILE_CHECK_INTERVAL = 15.0
+
+
+def _parse_clock(value: Any) -> int:
+    """'HH:MM' → 当天分钟数"""
+    hours, _, minutes = str(value).strip().partition(':')
+    return (int(hours) * 60 + int(minutes or 0)) % (24 * 60)
+
+
+def _to_rate(limit_mb: Any) -> float:
+    """MB/s → 字节/秒（0 或无效值表示不限）"""
+    try:
+        return max(0.0, float(limit_mb or 0)) * MB
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class BandwidthLimiter:
+    """全局 + 单站点的下载带宽限速器（线程安全）"""
+
+    def __init__(self, limit_mb: float = 0, per_host_limit_mb: float = 0,
+                 burst_seconds: float = DEFAULT_BURST_SECONDS, profiles: Optional[List[dict]] = None):
+        """
+        初始化限速器
+
+        Args:
+            limit_mb: 全局限速（MB/s，0 不限）
+            per_host_limit_mb: 单站点限速（MB/s，0 不限）
+            burst_seconds: 允许突发的秒数
+            profiles: 按时段覆盖的限速
+        """
+        self._lock = threading.Lock()
+        self._next_free: Dict[str, float] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._override: Optional[Tuple[Optional[float], Optional[float]]] = None
+        self._rates: Tuple[float, float] = (0.0, 0.0)
+        self._rates_checked = float('-inf')
+        self.apply_settings(limit_mb, per_host_limit_mb, burst_seconds, profiles)
+
+    @classmethod
+    def from_config(cls, config: dict = None) -> 'BandwidthLimiter':
+        """从配置字典创建限速器"""
+        limiter = cls()
+        limiter.apply_config(config)
+        return limiter
+
+    def apply_config(self, config: dict = None):
+        """按配置更新限速（保留运行时覆盖与令牌桶状态）"""
+        bandwidth = ((config or {}).get('download', {}) or {}).get('bandwidth', {}) or {}
+        self.apply_settings(
+            bandwidth.get('limit_mb', 0),
+            bandwidth.get('per_host_limit_mb', 0),
+            bandwidth.get('burst_seconds', DEFAULT_BURST_SECONDS),
+            bandwidth.get('profiles') or [],
+        )
+
+    def apply_settings(self, limit_mb: float = 0, per_host_limit_mb: float = 0,
+                       burst_seconds: float = DEFAULT_BURST_SECONDS, profiles: Optional[List[dict]] = None):
+        parsed = []
+        for profile in profiles or []:
+            try:
+                parsed.append((
+                    _parse_clock(profile['start']),
+                    _parse_clock(profile['end']),
+                    _to_rate(profile.get('limit_mb', 0)),
+                    _to_rate(profile.get('per_host_limit_mb', 0)),
+                ))
+            except (KeyError, ValueError) as e:
+                logger.warning(f"忽略无效的限速时段配置 {profile}: {e}")
+        with self._lock:
+            self._base = (_to_rate(limit_mb), _to_rate(per_host_limit_mb))
+            self._burst_seconds = max(0.0, float(burst_seconds or 0))
+            self._profiles = parsed
+            self._rates_checked = float('-inf')
+
+    # ==================== 运行时调整 ====================
+
+    def set_override(self, limit_mb: Optional[float], per_host_limit_mb: Optional[float] = None):
+        """
+        运行时覆盖限速（优先于时段与基础配置）
+
+        Args:
+            limit_mb: 全局限速（MB/s，0 不限）；None 沿用配置
+            per_host_limit_mb: 单站点限速（MB/s，0 不限）；None 沿用配置
+        """
+        with self._lock:
+            if limit_mb is None and per_host_limit_mb is None:
+                self._override = None
+            else:
+                self._override = (None if limit_mb is None else _to_rate(limit_mb),
+                                  None if per_host_limit_mb is None else _to_rate(per_host_limit_mb))
+            self._rates_checked = float('-inf')
+        logger.info(f"下载限速已调整: {self.describe()}")
+
+    def clear_override(self):
+        self.set_override(None)
+
+    def _profile_rates(self, now: datetime) -> Optional[Tuple[float, float]]:
+        minute = now.hour * 60 + now.minute
+        for start, end, rate, host_rate in self._profiles:
+            inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+            if inside:
+                return rate, host_rate
+        return None
+
+    def current_rates(self) -> Tuple[float, float]:
+        """当前生效的 (全局, 单站点) 限速（字节/秒，0 不限）"""
+        with self._lock:
+            return self._current_rates_locked()
+
+    def _current_rates_locked(self) -> Tuple[float, float]:
+        now = time.monotonic()
+        if now - self._rates_checked >= PROFILE_CHECK_INTERVAL:
+            rate, host_rate = self._profile_rates(datetime.now()) or self._base
+            if self._override is not None:
+                override_rate, override_host_rate = self._override
+                rate = rate if override_rate is None else override_rate
+                host_rate = host_rate if override_host_rate is None else override_host_rate
+            self._rates = (rate, host_rate)
+            self._rates_checked = now
+        return self._rates
+
+    @property
+    def enabled(self) -> bool:
+        """当前是否有任何限速生效"""
+        rate, host_rate = self.current_rates()
+        return rate > 0 or host_rate > 0
+
+    def describe(self) -> str:
+        rate, host_rate = self.current_rates()
+        parts = [f"全局 {rate / MB:.2f}MB/s" if rate else "全局不限",
+                 f"单站点 {host_rate / MB:.2f}MB/s" if host_rate else "单站点不限"]
+        return "，".join(parts)
+
+    # ==================== 限速 ====================
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        host = (urlparse(url or '').hostname or '').lower()
+        return host[4:] if host.startswith('www.') else host
+
+    def _reserve_bucket(self, key: str, nbytes: int, rate: float, now: float) -> float:
+        # 空闲时最多累积 burst_seconds 的额度
+        next_free = max(self._next_free.get(key, now), now - self._burst_seconds)
+        next_free += nbytes / rate
+        self._next_free[key] = next_free
+        return max(0.0, next_free - now)
+
+    def reserve(self, nbytes: int, url: str = '') -> float:
+        """
+        登记收到的字节数（不阻塞）
+
+        Args:
+            nbytes: 字节数
+            url: 下载URL（用于单站点限速）
+
+        Returns:
+            需要等待的秒数
+        """
+        if nbytes <= 0:
+            return 0.0
+        host = self.host_key(url)
+        with self._lock:
+            rate, host_rate = self._current_rates_locked()
+            if not rate and not host_rate:
+                return 0.0
+            now = time.monotonic()
+            wait = 0.0
+            if rate:
+                wait = self._reserve_bucket(GLOBAL_BUCKET, nbytes, rate, now)
+            if host_rate:
+                wait = max(wait, self._reserve_bucket(host, nbytes, host_rate, now))
+
+            stats = self._stats.setdefault(host, {'bytes': 0, 'waited': 0.0})
+            stats['bytes'] += nbytes
+            stats['waited'] += wait
+        return wait
+
+    def throttle(self, nbytes: int, url: str = '') -> float:
+        """线程中使用：登记字节数并等待，返回等待的秒数"""
+        delay = self.reserve(nbytes, url)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def athrottle(self, nbytes: int, url: str = '') -> float:
+        """协程中使用：登记字节数并等待，返回等待的秒数"""
+        delay = self.reserve(nbytes, url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """各站点的字节数与累计等待时间"""
+        with self._lock:
+            return {host: dict(stats) for host, stats in self._stats.items()}
+
+
+_limiter: Optional[BandwidthLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def configure_bandwidth_limiter(config: dict = None) -> BandwidthLimiter:
+    """按配置更新全局限速器（配置保存后调用；保留运行时覆盖）"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = BandwidthLimiter.from_config(config)
+        else:
+            _limiter.apply_config(config)
+        return _limiter
+
+
+def get_bandwidth_limiter(config: dict = None) -> BandwidthLimiter:
+    """获取全局限速器，尚未创建时按传入配置创建"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = BandwidthLimiter.from_config(config)
+        return _limiter
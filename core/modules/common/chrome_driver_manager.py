@@ -20,6 +20,38 @@ logger = logging.getLogger(__name__)
 class ChromeVersionDetector:
     """Chrome浏览器版本检测器"""
     
+    @staticmethod
+    def find_chrome_binary() -> Optional[str]:
+        """
+        查找Chrome可执行文件路径（不启动进程，用于预检缓存判断 Chrome 是否更新）
+        
+        Returns:
+            str: 可执行文件路径
+            None: 未找到
+        """
+        import shutil
+        system = platform.system()
+        if system == "Windows":
+            candidates = [
+                r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+                r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+                r"%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe",
+            ]
+        elif system == "Darwin":
+            candidates = [
+                "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+                "~/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+            ]
+        else:
+            candidates = [shutil.which(name) or '' for name in
+                          ('google-chrome', 'google-chrome-stable', 'chromium-browser', 'chromium')]
+        
+        for candidate in candidates:
+            path = os.path.expanduser(os.path.expandvars(candidate)) if candidate else ''
+            if path and os.path.exists(path):
+                return os.path.realpath(path)
+        return None
+    
     @staticmethod
     def detect_chrome_version() -> Optional[str]:
         """
@@ -212,11 +212,22 @@ def load_models(model_path: str = "models.json", use_database: bool = True) -> d
 # 导入智能缓存模块
 from .smart_cache import SmartCache, create_smart_cache
 
-# 导入数据库存储模块
-from .database_storage import create_database_cache_adapter
-
-# 导入异步下载器模块
-from .async_downloader import AsyncDownloadEngine, AsyncDownloaderAdapter
+# 数据库存储与异步下载器（aiohttp/aiofiles）按需导入，查重流程启动时不加载
+_LAZY_EXPORTS = {
+    'create_database_cache_adapter': ('.database_storage', 'create_database_cache_adapter'),
+    'AsyncDownloadEngine': ('.async_downloader', 'AsyncDownloadEngine'),
+    'AsyncDownloaderAdapter': ('.async_downloader', 'AsyncDownloaderAdapter'),
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    module_name, attr = _LAZY_EXPORTS[name]
+    value = getattr(importlib.import_module(module_name, __package__), attr)
+    globals()[name] = value
+    return value
 
 # 全局智能缓存实例（延迟初始化）
 _smart_cache_instance: SmartCache = None
@@ -261,6 +272,7 @@ def get_smart_cache(cache_dir: str = None, config: dict = None) -> SmartCache:
         
         if use_database:
             # 使用数据库存储
+            from .database_storage import create_database_cache_adapter
             db_path = cache_config.get('database_path', 'output/cache.db')
             _smart_cache_instance = create_database_cache_adapter(db_path, config)
             logging.getLogger(__name__).info(f"使用数据库存储: {db_path}")
@@ -369,6 +381,22 @@ def clean_filename(name: str, patterns: List[str]) -> str:
     
     return cleaned.strip()
 
+def normalize_title(title: str, comparison_cfg: Optional[dict] = None) -> str:
+    """
+    对比用的标题归一化（comparison 段：case_sensitive / strip_punctuation）
+    查重对比与下载前的“已存在”检查共用，保证两边判定一致
+    """
+    comparison_cfg = comparison_cfg or {}
+    t = (title or '').strip()
+    if not t:
+        return ''
+    if not comparison_cfg.get('case_sensitive', False):
+        t = t.lower()
+    if comparison_cfg.get('strip_punctuation', True):
+        t = re.sub(r'[\W_]+', '', t, flags=re.UNICODE)
+    t = re.sub(r'\s+', '', t)
+    return t
+
 def extract_local_videos(folder: str, video_exts: Set[str], 
                         clean_patterns: List[str]) -> Set[str]:
     """
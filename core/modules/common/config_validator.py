@@ -221,6 +221,14 @@ class ConfigValidator:
             self.result.add_error("最大延迟必须是非负数")
         if min_delay > max_delay:
             self.result.add_error("最小延迟不能大于最大延迟")
+        
+        burst = delay_config.get('burst', 1)
+        if not isinstance(burst, int) or burst < 1:
+            self.result.add_error("突发请求数(burst)必须是正整数")
+        
+        hosts = delay_config.get('hosts', {}) or {}
+        if not isinstance(hosts, dict):
+            self.result.add_error("按站点限速(hosts)必须是 {站点: {min, max}} 形式的字典")
     
     def _validate_multithreading(self):
         """验证多线程配置"""
@@ -7,11 +7,12 @@ import sqlite3
 import json
 import threading
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from pathlib import Path
 from contextlib import contextmanager
 
+from .smart_cache import compute_page_hash
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,36 +34,98 @@ class DatabaseStorage:
         # 确保数据库目录存在
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # 线程锁
+        # 线程锁（写操作与事务共用，保证跨线程写入串行）
         self._lock = threading.RLock()
         
+        # 每线程一个长连接，避免每次调用都重新打开数据库
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        
+        # 模特名 -> ID 映射缓存，避免每次写入前都查询/更新 models 表
+        self._model_ids: Dict[str, int] = {}
+        
         # 初始化数据库
         self._initialize_database()
     
-    @contextmanager
-    def get_connection(self):
-        """获取数据库连接的上下文管理器"""
-        conn = None
-        try:
+    def _get_thread_connection(self) -> sqlite3.Connection:
+        """获取当前线程的长连接（首次调用时创建并启用WAL模式）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
             conn = sqlite3.connect(
                 str(self.db_path),
                 timeout=30.0,
                 check_same_thread=False
             )
             conn.row_factory = sqlite3.Row  # 使结果可以通过列名访问
+            # WAL模式：读写互不阻塞，提交只追加日志
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.tx_depth = 0
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    @contextmanager
+    def get_connection(self):
+        """获取数据库连接的上下文管理器（当前线程的长连接，退出时不关闭）"""
+        conn = self._get_thread_connection()
+        try:
             yield conn
-        except Exception as e:
-            if conn:
+        except Exception:
+            # 处于外层事务中时由 transaction() 负责回滚
+            if not self._local.tx_depth:
                 conn.rollback()
             raise
-        finally:
-            if conn:
-                conn.close()
+    
+    @contextmanager
+    def transaction(self):
+        """
+        事务上下文管理器
+        
+        块内的所有写操作在退出时一次性提交，异常时整体回滚。
+        支持嵌套，只有最外层退出时才真正提交。
+        
+        用法:
+            with storage.transaction():
+                storage.add_videos(model_name, videos)
+                storage.update_page_timestamp(model_name, page_num)
+        """
+        with self._lock:
+            conn = self._get_thread_connection()
+            self._local.tx_depth += 1
+            try:
+                yield conn
+            except Exception:
+                self._local.tx_depth -= 1
+                if self._local.tx_depth == 0:
+                    conn.rollback()
+                raise
+            else:
+                self._local.tx_depth -= 1
+                if self._local.tx_depth == 0:
+                    conn.commit()
+    
+    def _in_transaction(self) -> bool:
+        """当前线程是否处于 transaction() 块内"""
+        return getattr(self._local, 'tx_depth', 0) > 0
+    
+    def close(self):
+        """关闭所有线程创建的数据库连接"""
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
     
     def _initialize_database(self):
         """初始化数据库表结构"""
         try:
-            with self.get_connection() as conn:
+            with self.transaction() as conn:
                 cursor = conn.cursor()
                 
                 # 创建模特信息表
@@ -100,6 +163,7 @@ class DatabaseStorage:
                         last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         fetch_count INTEGER DEFAULT 0,
                         full_fetch_count INTEGER DEFAULT 0,
+                        schema_version INTEGER DEFAULT 0,
                         FOREIGN KEY (model_id) REFERENCES models (id) ON DELETE CASCADE,
                         UNIQUE(model_id)
                     )
@@ -112,11 +176,20 @@ class DatabaseStorage:
                         model_id INTEGER NOT NULL,
                         page_number INTEGER NOT NULL,
                         timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        content_hash TEXT,
                         FOREIGN KEY (model_id) REFERENCES models (id) ON DELETE CASCADE,
                         UNIQUE(model_id, page_number)
                     )
                 ''')
                 
+                # 旧版数据库迁移：补充页面内容哈希列、缓存版本列
+                cursor.execute('PRAGMA table_info(page_timestamps)')
+                if 'content_hash' not in {row['name'] for row in cursor.fetchall()}:
+                    cursor.execute('ALTER TABLE page_timestamps ADD COLUMN content_hash TEXT')
+                cursor.execute('PRAGMA table_info(cache_metadata)')
+                if 'schema_version' not in {row['name'] for row in cursor.fetchall()}:
+                    cursor.execute('ALTER TABLE cache_metadata ADD COLUMN schema_version INTEGER DEFAULT 0')
+                
                 # 创建缺失视频表
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS missing_videos (
@@ -138,7 +211,6 @@ class DatabaseStorage:
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_timestamps_model_page ON page_timestamps(model_id, page_number)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_missing_videos_model_status ON missing_videos(model_id, status)')
                 
-                conn.commit()
                 self.logger.info(f"数据库初始化完成: {self.db_path}")
                 
         except Exception as e:
@@ -156,34 +228,59 @@ class DatabaseStorage:
         Returns:
             模特ID
         """
-        with self._lock:
-            try:
-                with self.get_connection() as conn:
-                    cursor = conn.cursor()
-                    
-                    # 插入或更新模特信息
-                    cursor.execute('''
-                        INSERT INTO models (name, url, updated_at)
-                        VALUES (?, ?, CURRENT_TIMESTAMP)
-                        ON CONFLICT(name) DO UPDATE SET
-                            url = excluded.url,
-                            updated_at = CURRENT_TIMESTAMP
-                    ''', (model_name, url))
-                    
-                    # 获取插入的ID
-                    model_id = cursor.lastrowid
-                    if model_id is None:
-                        # 如果是更新，需要查询ID
-                        cursor.execute('SELECT id FROM models WHERE name = ?', (model_name,))
-                        result = cursor.fetchone()
-                        model_id = result['id'] if result else 0
-                    
-                    conn.commit()
-                    return model_id
-                    
-            except Exception as e:
-                self.logger.error(f"添加/更新模特失败: {e}")
-                raise
+        try:
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                
+                # 插入或更新模特信息
+                cursor.execute('''
+                    INSERT INTO models (name, url, updated_at)
+                    VALUES (?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(name) DO UPDATE SET
+                        url = excluded.url,
+                        updated_at = CURRENT_TIMESTAMP
+                ''', (model_name, url))
+                
+                # UPSERT 走更新分支时 lastrowid 不可靠，统一按名称查询ID
+                cursor.execute('SELECT id FROM models WHERE name = ?', (model_name,))
+                result = cursor.fetchone()
+                model_id = result['id'] if result else 0
+                
+                if model_id:
+                    self._model_ids[model_name] = model_id
+                return model_id
+                
+        except Exception as e:
+            self.logger.error(f"添加/更新模特失败: {e}")
+            raise
+    
+    def _ensure_model_id(self, model_name: str) -> int:
+        """
+        获取模特ID，不存在时才插入（已存在时不改写 url/updated_at）
+        
+        Args:
+            model_name: 模特名称
+            
+        Returns:
+            模特ID
+        """
+        model_id = self._get_model_id(model_name)
+        if model_id:
+            return model_id
+        
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO models (name, url) VALUES (?, '')
+                ON CONFLICT(name) DO NOTHING
+            ''', (model_name,))
+            cursor.execute('SELECT id FROM models WHERE name = ?', (model_name,))
+            result = cursor.fetchone()
+            model_id = result['id'] if result else 0
+        
+        if model_id:
+            self._model_ids[model_name] = model_id
+        return model_id
     
     def add_videos(self, model_name: str, videos: List[Tuple[str, str, int]]) -> int:
         """
@@ -196,43 +293,41 @@ class DatabaseStorage:
         Returns:
             新增视频数量
         """
-        with self._lock:
-            try:
-                model_id = self.add_or_update_model(model_name)
-                new_count = 0
-                
-                with self.get_connection() as conn:
-                    cursor = conn.cursor()
-                    
-                    for title, url, page_number in videos:
-                        cursor.execute('''
-                            INSERT INTO videos (model_id, title, url, page_number, fetched_at)
-                            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                            ON CONFLICT(model_id, title) DO UPDATE SET
-                                url = excluded.url,
-                                page_number = excluded.page_number,
-                                fetched_at = CURRENT_TIMESTAMP
-                        ''', (model_id, title, url, page_number))
-                        
-                        # 如果是新插入的行，计数加1
-                        if cursor.rowcount > 0:
-                            new_count += 1
-                    
-                    # 更新缓存元数据
-                    cursor.execute('''
-                        INSERT INTO cache_metadata (model_id, last_updated)
-                        VALUES (?, CURRENT_TIMESTAMP)
-                        ON CONFLICT(model_id) DO UPDATE SET
-                            last_updated = CURRENT_TIMESTAMP
-                    ''', (model_id,))
-                    
-                    conn.commit()
-                    self.logger.debug(f"添加了 {new_count} 个新视频到数据库")
-                    return new_count
-                    
-            except Exception as e:
-                self.logger.error(f"添加视频失败: {e}")
-                raise
+        try:
+            with self.transaction() as conn:
+                model_id = self._ensure_model_id(model_name)
+                cursor = conn.cursor()
+                
+                # UPSERT 的 rowcount 无法区分插入和更新，用前后行数差计算新增数量
+                cursor.execute('SELECT COUNT(*) FROM videos WHERE model_id = ?', (model_id,))
+                before_count = cursor.fetchone()[0]
+                
+                cursor.executemany('''
+                    INSERT INTO videos (model_id, title, url, page_number, fetched_at)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(model_id, title) DO UPDATE SET
+                        url = excluded.url,
+                        page_number = excluded.page_number,
+                        fetched_at = CURRENT_TIMESTAMP
+                ''', [(model_id, title, url, page_number) for title, url, page_number in videos])
+                
+                cursor.execute('SELECT COUNT(*) FROM videos WHERE model_id = ?', (model_id,))
+                new_count = cursor.fetchone()[0] - before_count
+                
+                # 更新缓存元数据
+                cursor.execute('''
+                    INSERT INTO cache_metadata (model_id, last_updated)
+                    VALUES (?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(model_id) DO UPDATE SET
+                        last_updated = CURRENT_TIMESTAMP
+                ''', (model_id,))
+                
+            self.logger.debug(f"添加了 {new_count} 个新视频到数据库")
+            return new_count
+                
+        except Exception as e:
+            self.logger.error(f"添加视频失败: {e}")
+            raise
     
     def get_cached_titles(self, model_name: str) -> List[str]:
         """
@@ -290,68 +385,224 @@ class DatabaseStorage:
             self.logger.error(f"获取视频URL失败: {e}")
             return None
     
-    def update_page_timestamp(self, model_name: str, page_number: int):
+    def get_video_urls(self, model_name: str) -> Dict[str, str]:
+        """
+        一次性获取模特所有视频的 标题 -> URL 映射
+        
+        Args:
+            model_name: 模特名称
+            
+        Returns:
+            {title: url}
+        """
+        try:
+            model_id = self._get_model_id(model_name)
+            if not model_id:
+                return {}
+            
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT title, url FROM videos WHERE model_id = ?
+                ''', (model_id,))
+                return {row['title']: row['url'] or '' for row in cursor.fetchall()}
+                
+        except Exception as e:
+            self.logger.error(f"获取视频URL映射失败: {e}")
+            return {}
+    
+    def get_video_records(self, model_name: str) -> Dict[str, Dict[str, Any]]:
+        """
+        一次性获取模特所有视频记录
+        
+        Args:
+            model_name: 模特名称
+            
+        Returns:
+            {title: {url, page, timestamp}}
+        """
+        try:
+            model_id = self._get_model_id(model_name)
+            if not model_id:
+                return {}
+            
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT title, url, page_number, fetched_at FROM videos WHERE model_id = ?
+                ''', (model_id,))
+                return {
+                    row['title']: {
+                        'url': row['url'] or '',
+                        'page': row['page_number'] or 0,
+                        'timestamp': row['fetched_at']
+                    }
+                    for row in cursor.fetchall()
+                }
+                
+        except Exception as e:
+            self.logger.error(f"获取视频记录失败: {e}")
+            return {}
+    
+    def update_page_timestamp(self, model_name: str, page_number: int,
+                              content_hash: Optional[str] = None):
         """
         更新页面时间戳
         
         Args:
             model_name: 模特名称
             page_number: 页码
+            content_hash: 页面内容哈希（为None时保留原值）
         """
-        with self._lock:
-            try:
-                model_id = self.add_or_update_model(model_name)
-                
-                with self.get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        INSERT INTO page_timestamps (model_id, page_number, timestamp)
-                        VALUES (?, ?, CURRENT_TIMESTAMP)
-                        ON CONFLICT(model_id, page_number) DO UPDATE SET
-                            timestamp = CURRENT_TIMESTAMP
-                    ''', (model_id, page_number))
-                    conn.commit()
-                    
-            except Exception as e:
-                self.logger.error(f"更新页面时间戳失败: {e}")
+        try:
+            with self.transaction() as conn:
+                model_id = self._ensure_model_id(model_name)
+                conn.execute('''
+                    INSERT INTO page_timestamps (model_id, page_number, timestamp, content_hash)
+                    VALUES (?, ?, CURRENT_TIMESTAMP, ?)
+                    ON CONFLICT(model_id, page_number) DO UPDATE SET
+                        timestamp = CURRENT_TIMESTAMP,
+                        content_hash = COALESCE(excluded.content_hash, content_hash)
+                ''', (model_id, page_number, content_hash))
+                
+        except Exception as e:
+            self.logger.error(f"更新页面时间戳失败: {e}")
+            # 处于外层事务中时向上抛出，由 transaction() 整体回滚
+            if self._in_transaction():
+                raise
+
+    def save_page_results(self, model_name: str, page_number: int,
+                          videos: List[Tuple[str, str, int]],
+                          content_hash: Optional[str] = None) -> int:
+        """
+        在单个事务中保存一页的抓取结果（视频、页面时间戳、最后抓取页码）
+
+        Args:
+            model_name: 模特名称
+            page_number: 页码
+            videos: 视频列表 [(title, url, page_number), ...]
+            content_hash: 页面内容哈希（可选）
+
+        Returns:
+            新增视频数量
+        """
+        with self.transaction() as conn:
+            new_count = self.add_videos(model_name, videos) if videos else 0
+            self.update_page_timestamp(model_name, page_number, content_hash)
+            conn.execute('''
+                INSERT INTO cache_metadata (model_id, last_page_fetched, last_updated)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(model_id) DO UPDATE SET
+                    last_page_fetched = MAX(last_page_fetched, excluded.last_page_fetched),
+                    last_updated = CURRENT_TIMESTAMP
+            ''', (self._ensure_model_id(model_name), page_number))
+        return new_count
     
-    def should_update_page(self, model_name: str, page_number: int, expiry_hours: int = 24) -> bool:
+    def get_page_hash(self, model_name: str, page_number: int) -> Optional[str]:
         """
-        判断页面是否需要更新
+        获取页面上次保存时的内容哈希
         
         Args:
             model_name: 模特名称
             page_number: 页码
-            expiry_hours: 过期小时数
             
         Returns:
-            是否需要更新
+            内容哈希，无记录时返回None
         """
         try:
             model_id = self._get_model_id(model_name)
             if not model_id:
-                return True
+                return None
             
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
-                    SELECT timestamp FROM page_timestamps 
+                    SELECT content_hash FROM page_timestamps
                     WHERE model_id = ? AND page_number = ?
                 ''', (model_id, page_number))
+                row = cursor.fetchone()
+                return row['content_hash'] if row else None
                 
-                result = cursor.fetchone()
-                if not result:
-                    return True
-                
-                # 检查是否过期
-                last_timestamp = datetime.fromisoformat(result['timestamp'])
-                expiry_time = datetime.now() - timedelta(hours=expiry_hours)
-                
-                return last_timestamp < expiry_time
+        except Exception as e:
+            self.logger.warning(f"获取页面内容哈希失败: {e}")
+            return None
+    
+    def should_update_page(self, model_name: str, page_number: int, expiry_hours: int = 24) -> bool:
+        """
+        判断页面是否需要更新
+        
+        Args:
+            model_name: 模特名称
+            page_number: 页码
+            expiry_hours: 过期小时数
+            
+        Returns:
+            是否需要更新
+        """
+        return page_number in self.get_expired_pages(model_name, [page_number], expiry_hours)
+    
+    def get_expired_pages(self, model_name: str, page_numbers: List[int], expiry_hours: int = 24) -> List[int]:
+        """
+        一次查询判断多个页面中哪些需要更新（无记录或已过期）
+        
+        时间戳由 CURRENT_TIMESTAMP 写入（UTC），因此过期判断也在SQL中用 UTC 完成。
+        
+        Args:
+            model_name: 模特名称
+            page_numbers: 待检查的页码列表
+            expiry_hours: 过期小时数
+            
+        Returns:
+            需要更新的页码列表（保持输入顺序）
+        """
+        if not page_numbers:
+            return []
+        try:
+            model_id = self._get_model_id(model_name)
+            if not model_id:
+                return list(page_numbers)
+            
+            placeholders = ", ".join("?" for _ in page_numbers)
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f'''
+                    SELECT page_number FROM page_timestamps
+                    WHERE model_id = ? AND page_number IN ({placeholders})
+                      AND timestamp >= datetime('now', ?)
+                ''', [model_id, *page_numbers, f"-{float(expiry_hours)} hours"])
+                fresh_pages = {row['page_number'] for row in cursor.fetchall()}
+            
+            return [p for p in page_numbers if p not in fresh_pages]
                 
         except Exception as e:
             self.logger.warning(f"检查页面更新状态失败: {e}")
-            return True
+            return list(page_numbers)
+    
+    def get_page_timestamps(self, model_name: str) -> Dict[str, str]:
+        """
+        获取所有页面的时间戳
+        
+        Args:
+            model_name: 模特名称
+            
+        Returns:
+            {页码字符串: 时间戳}
+        """
+        try:
+            model_id = self._get_model_id(model_name)
+            if not model_id:
+                return {}
+            
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT page_number, timestamp FROM page_timestamps WHERE model_id = ?
+                ''', (model_id,))
+                return {str(row['page_number']): row['timestamp'] for row in cursor.fetchall()}
+                
+        except Exception as e:
+            self.logger.error(f"获取页面时间戳失败: {e}")
+            return {}
     
     def get_last_page_fetched(self, model_name: str) -> int:
         """
@@ -381,6 +632,60 @@ class DatabaseStorage:
             self.logger.error(f"获取最后抓取页码失败: {e}")
             return 0
     
+    def mark_full_fetch_completed(self, model_name: str, total_pages: int):
+        """
+        标记完整抓取完成
+        
+        Args:
+            model_name: 模特名称
+            total_pages: 总页数
+        """
+        try:
+            with self.transaction() as conn:
+                model_id = self._ensure_model_id(model_name)
+                conn.execute('''
+                    INSERT INTO cache_metadata (model_id, last_page_fetched, total_pages,
+                                                fetch_count, full_fetch_count, last_updated)
+                    VALUES (?, ?, ?, 1, 1, CURRENT_TIMESTAMP)
+                    ON CONFLICT(model_id) DO UPDATE SET
+                        last_page_fetched = excluded.last_page_fetched,
+                        total_pages = excluded.total_pages,
+                        fetch_count = fetch_count + 1,
+                        full_fetch_count = full_fetch_count + 1,
+                        last_updated = CURRENT_TIMESTAMP
+                ''', (model_id, total_pages, total_pages))
+                
+        except Exception as e:
+            self.logger.error(f"标记完整抓取失败: {e}")
+    
+    def is_cache_valid(self, model_name: str, expiration_days: float = 7) -> bool:
+        """
+        检查缓存是否在有效期内
+        
+        Args:
+            model_name: 模特名称
+            expiration_days: 过期天数
+            
+        Returns:
+            缓存是否有效
+        """
+        try:
+            model_id = self._get_model_id(model_name)
+            if not model_id:
+                return False
+            
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT 1 FROM cache_metadata
+                    WHERE model_id = ? AND last_updated >= datetime('now', ?)
+                ''', (model_id, f"-{float(expiration_days)} days"))
+                return cursor.fetchone() is not None
+                
+        except Exception as e:
+            self.logger.warning(f"检查缓存有效性失败: {e}")
+            return False
+    
     def update_cache_metadata(self, model_name: str, **kwargs):
         """
         更新缓存元数据
@@ -389,27 +694,89 @@ class DatabaseStorage:
             model_name: 模特名称
             **kwargs: 要更新的字段
         """
-        with self._lock:
-            try:
-                model_id = self.add_or_update_model(model_name)
-                
-                # 构建更新SQL
-                set_clause = ", ".join([f"{key} = ?" for key in kwargs.keys()])
-                values = list(kwargs.values()) + [model_id]
-                
-                with self.get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute(f'''
-                        INSERT INTO cache_metadata (model_id)
-                        VALUES (?)
-                        ON CONFLICT(model_id) DO UPDATE SET
-                            {set_clause},
-                            last_updated = CURRENT_TIMESTAMP
-                    ''', values)
-                    conn.commit()
-                    
-            except Exception as e:
-                self.logger.error(f"更新缓存元数据失败: {e}")
+        try:
+            with self.transaction() as conn:
+                model_id = self._ensure_model_id(model_name)
+                
+                # 构建更新SQL（新插入的行同样写入这些字段）
+                columns = ", ".join(kwargs.keys())
+                placeholders = ", ".join("?" for _ in kwargs)
+                set_clause = ", ".join([f"{key} = excluded.{key}" for key in kwargs.keys()])
+                values = [model_id] + list(kwargs.values())
+                
+                conn.execute(f'''
+                    INSERT INTO cache_metadata (model_id, {columns})
+                    VALUES (?, {placeholders})
+                    ON CONFLICT(model_id) DO UPDATE SET
+                        {set_clause},
+                        last_updated = CURRENT_TIMESTAMP
+                ''', values)
+                
+        except Exception as e:
+            self.logger.error(f"更新缓存元数据失败: {e}")
+            # 处于外层事务中时向上抛出，由 transaction() 整体回滚
+            if self._in_transaction():
+                raise
+    
+    def get_cache_schema_version(self, model_name: str) -> int:
+        """
+        获取模特缓存的版本号（由抓取规则决定，无记录时为0）
+        
+        Args:
+            model_name: 模特名称
+            
+        Returns:
+            缓存版本号
+        """
+        try:
+            model_id = self._get_model_id(model_name)
+            if not model_id:
+                return 0
+            
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT schema_version FROM cache_metadata WHERE model_id = ?', (model_id,))
+                row = cursor.fetchone()
+                return (row['schema_version'] or 0) if row else 0
+                
+        except Exception as e:
+            self.logger.error(f"获取缓存版本失败: {e}")
+            return 0
+    
+    def remove_videos(self, model_name: str, titles: List[str]) -> int:
+        """
+        删除指定视频，并清空其所在页面的内容哈希
+        
+        Args:
+            model_name: 模特名称
+            titles: 视频标题列表
+            
+        Returns:
+            删除的数量
+        """
+        if not titles:
+            return 0
+        try:
+            model_id = self._get_model_id(model_name)
+            if not model_id:
+                return 0
+            
+            with self.transaction() as conn:
+                conn.executemany('''
+                    UPDATE page_timestamps SET content_hash = NULL
+                    WHERE model_id = ? AND page_number = (
+                        SELECT page_number FROM videos WHERE model_id = ? AND title = ?
+                    )
+                ''', [(model_id, model_id, title) for title in titles])
+                cursor = conn.executemany(
+                    'DELETE FROM videos WHERE model_id = ? AND title = ?',
+                    [(model_id, title) for title in titles]
+                )
+                return cursor.rowcount
+                
+        except Exception as e:
+            self.logger.error(f"删除视频失败: {e}")
+            return 0
     
     def update_missing_videos(self, model_name: str, missing_videos: List[Tuple[str, str]]):
         """
@@ -419,29 +786,27 @@ class DatabaseStorage:
             model_name: 模特名称
             missing_videos: 缺失视频列表 [(title, url), ...]
         """
-        with self._lock:
-            try:
-                model_id = self.add_or_update_model(model_name)
-                
-                with self.get_connection() as conn:
-                    cursor = conn.cursor()
-                    
-                    # 更新缺失视频状态
-                    for title, url in missing_videos:
-                        cursor.execute('''
-                            INSERT INTO missing_videos (model_id, title, url, last_missing, status)
-                            VALUES (?, ?, ?, CURRENT_TIMESTAMP, 'missing')
-                            ON CONFLICT(model_id, title) DO UPDATE SET
-                                url = excluded.url,
-                                last_missing = CURRENT_TIMESTAMP,
-                                status = 'missing'
-                        ''', (model_id, title, url))
-                    
-                    conn.commit()
-                    self.logger.info(f"更新了 {len(missing_videos)} 个缺失视频")
-                    
-            except Exception as e:
-                self.logger.error(f"更新缺失视频失败: {e}")
+        try:
+            with self.transaction() as conn:
+                model_id = self._ensure_model_id(model_name)
+                
+                # 批量更新缺失视频状态
+                conn.executemany('''
+                    INSERT INTO missing_videos (model_id, title, url, last_missing, status)
+                    VALUES (?, ?, ?, CURRENT_TIMESTAMP, 'missing')
+                    ON CONFLICT(model_id, title) DO UPDATE SET
+                        url = excluded.url,
+                        last_missing = CURRENT_TIMESTAMP,
+                        status = 'missing'
+                ''', [(model_id, title, url) for title, url in missing_videos])
+                
+            self.logger.info(f"更新了 {len(missing_videos)} 个缺失视频")
+                
+        except Exception as e:
+            self.logger.error(f"更新缺失视频失败: {e}")
+            # 处于外层事务中时向上抛出，由 transaction() 整体回滚
+            if self._in_transaction():
+                raise
     
     def get_missing_videos(self, model_name: str) -> List[Tuple[str, str]]:
         """
@@ -471,31 +836,108 @@ class DatabaseStorage:
             self.logger.error(f"获取缺失视频失败: {e}")
             return []
     
-    def mark_video_downloaded(self, model_name: str, title: str):
+    def get_downloaded_titles(self, model_name: str) -> List[str]:
+        """
+        获取已标记为下载完成的视频标题
+        
+        Args:
+            model_name: 模特名称
+            
+        Returns:
+            视频标题列表
+        """
+        try:
+            model_id = self._get_model_id(model_name)
+            if not model_id:
+                return []
+            
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT title FROM missing_videos
+                    WHERE model_id = ? AND status = 'downloaded'
+                ''', (model_id,))
+                return [row['title'] for row in cursor.fetchall()]
+                
+        except Exception as e:
+            self.logger.error(f"获取已下载视频失败: {e}")
+            return []
+    
+    def get_missing_video_records(self, model_name: str) -> Dict[str, Dict[str, Any]]:
+        """
+        获取缺失视频表的完整记录（含已下载状态）
+        
+        Args:
+            model_name: 模特名称
+            
+        Returns:
+            {title: {url, last_missing, status, downloaded_at}}
+        """
+        try:
+            model_id = self._get_model_id(model_name)
+            if not model_id:
+                return {}
+            
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT title, url, last_missing, status, downloaded_at
+                    FROM missing_videos WHERE model_id = ?
+                ''', (model_id,))
+                records = {}
+                for row in cursor.fetchall():
+                    record = {
+                        'url': row['url'] or '',
+                        'last_missing': row['last_missing'],
+                        'status': row['status']
+                    }
+                    if row['downloaded_at']:
+                        record['downloaded_at'] = row['downloaded_at']
+                    records[row['title']] = record
+                return records
+                
+        except Exception as e:
+            self.logger.error(f"获取缺失视频记录失败: {e}")
+            return {}
+    
+    def mark_video_downloaded(self, model_name: str, title: str, url: str = ''):
         """
         标记视频已下载
         
         Args:
             model_name: 模特名称
             title: 视频标题
+            url: 视频URL（缺失列表中没有该标题时据此新增一条已下载记录）
         """
-        with self._lock:
-            try:
-                model_id = self._get_model_id(model_name)
-                if not model_id:
-                    return
-                
-                with self.get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        UPDATE missing_videos 
-                        SET status = 'downloaded', downloaded_at = CURRENT_TIMESTAMP
-                        WHERE model_id = ? AND title = ?
-                    ''', (model_id, title))
-                    conn.commit()
-                    
-            except Exception as e:
-                self.logger.error(f"标记视频已下载失败: {e}")
+        try:
+            if url:
+                with self.transaction() as conn:
+                    model_id = self._ensure_model_id(model_name)
+                    conn.execute('''
+                        INSERT INTO missing_videos (model_id, title, url, status, downloaded_at)
+                        VALUES (?, ?, ?, 'downloaded', CURRENT_TIMESTAMP)
+                        ON CONFLICT(model_id, title) DO UPDATE SET
+                            status = 'downloaded',
+                            downloaded_at = CURRENT_TIMESTAMP
+                    ''', (model_id, title, url))
+                return
+            
+            model_id = self._get_model_id(model_name)
+            if not model_id:
+                return
+            
+            with self.transaction() as conn:
+                conn.execute('''
+                    UPDATE missing_videos 
+                    SET status = 'downloaded', downloaded_at = CURRENT_TIMESTAMP
+                    WHERE model_id = ? AND title = ?
+                ''', (model_id, title))
+                
+        except Exception as e:
+            self.logger.error(f"标记视频已下载失败: {e}")
+            # 处于外层事务中时向上抛出，由 transaction() 整体回滚
+            if self._in_transaction():
+                raise
     
     def get_cache_stats(self, model_name: str) -> Dict[str, Any]:
         """
@@ -544,13 +986,19 @@ class DatabaseStorage:
             return {}
     
     def _get_model_id(self, model_name: str) -> Optional[int]:
-        """获取模特ID"""
+        """获取模特ID（优先使用内存映射缓存）"""
+        model_id = self._model_ids.get(model_name)
+        if model_id:
+            return model_id
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('SELECT id FROM models WHERE name = ?', (model_name,))
                 result = cursor.fetchone()
-                return result['id'] if result else None
+                if not result:
+                    return None
+                self._model_ids[model_name] = result['id']
+                return result['id']
         except Exception:
             return None
     
@@ -561,104 +1009,237 @@ class DatabaseStorage:
         Args:
             model_name: 模特名称，如果为None则清除所有缓存
         """
-        with self._lock:
-            try:
-                with self.get_connection() as conn:
-                    cursor = conn.cursor()
-                    
-                    if model_name:
-                        model_id = self._get_model_id(model_name)
-                        if model_id:
-                            # 删除特定模特的缓存
-                            cursor.execute('DELETE FROM videos WHERE model_id = ?', (model_id,))
-                            cursor.execute('DELETE FROM cache_metadata WHERE model_id = ?', (model_id,))
-                            cursor.execute('DELETE FROM page_timestamps WHERE model_id = ?', (model_id,))
-                            cursor.execute('DELETE FROM missing_videos WHERE model_id = ?', (model_id,))
-                            self.logger.info(f"已清除模特缓存: {model_name}")
-                    else:
-                        # 清除所有缓存
-                        cursor.execute('DELETE FROM videos')
-                        cursor.execute('DELETE FROM cache_metadata')
-                        cursor.execute('DELETE FROM page_timestamps')
-                        cursor.execute('DELETE FROM missing_videos')
-                        cursor.execute('DELETE FROM models')
-                        self.logger.info("已清除所有缓存")
-                    
-                    conn.commit()
-                    
-            except Exception as e:
-                self.logger.error(f"清除缓存失败: {e}")
+        try:
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                
+                if model_name:
+                    model_id = self._get_model_id(model_name)
+                    if model_id:
+                        # 删除特定模特的缓存
+                        cursor.execute('DELETE FROM videos WHERE model_id = ?', (model_id,))
+                        cursor.execute('DELETE FROM cache_metadata WHERE model_id = ?', (model_id,))
+                        cursor.execute('DELETE FROM page_timestamps WHERE model_id = ?', (model_id,))
+                        cursor.execute('DELETE FROM missing_videos WHERE model_id = ?', (model_id,))
+                        self.logger.info(f"已清除模特缓存: {model_name}")
+                else:
+                    # 清除所有缓存
+                    cursor.execute('DELETE FROM videos')
+                    cursor.execute('DELETE FROM cache_metadata')
+                    cursor.execute('DELETE FROM page_timestamps')
+                    cursor.execute('DELETE FROM missing_videos')
+                    cursor.execute('DELETE FROM models')
+                    self._model_ids.clear()
+                    self.logger.info("已清除所有缓存")
+                
+        except Exception as e:
+            self.logger.error(f"清除缓存失败: {e}")
+            # 处于外层事务中时向上抛出，由 transaction() 整体回滚
+            if self._in_transaction():
+                raise
 
 
 # 兼容性适配器 - 使数据库存储可以替代现有的SmartCache
 class DatabaseCacheAdapter:
-    """数据库缓存适配器，兼容SmartCache接口"""
+    """
+    数据库缓存适配器，实现完整的SmartCache接口
+    
+    每个接口方法直接映射为针对性的SQL查询/写入，不再整体加载/回写缓存字典。
+    load()/save() 仅为兼容保留，热路径请使用细粒度方法。
+    """
     
     def __init__(self, db_storage: DatabaseStorage):
         self.db = db_storage
-        self.enabled = True
-        self.incremental_update = True
-        self.page_expiry_hours = 24
+        
+        # 缓存配置（与SmartCache保持一致）
+        cache_config = (db_storage.config or {}).get('cache', {})
+        self.enabled = cache_config.get('enabled', True)
+        self.expiration_days = cache_config.get('expiration_days', 7)
+        self.incremental_update = cache_config.get('incremental_update', True)
+        self.page_expiry_hours = cache_config.get('page_expiry_hours', 24)
     
     def load(self, model_name: str) -> dict:
-        """加载缓存数据（兼容接口）"""
-        # 从数据库获取数据并转换为SmartCache期望的格式
-        titles = self.db.get_cached_titles(model_name)
-        videos = {}
-        for title in titles:
-            url = self.db.get_video_url(model_name, title)
-            videos[title] = {
-                'url': url or '',
-                'page': 0,  # 数据库中可能没有页码信息
-                'timestamp': datetime.now().isoformat()
-            }
+        """加载缓存数据（兼容接口，按SmartCache格式组装）"""
+        videos = self.db.get_video_records(model_name)
+        stats = self.db.get_cache_stats(model_name)
+        missing_videos = self.db.get_missing_video_records(model_name)
         
         return {
-            'video_titles': titles,
+            'version': '2.0',
+            'model_name': model_name,
+            'video_titles': list(videos.keys()),
             'videos': videos,
-            'page_timestamps': {},  # 需要额外查询
-            'last_page_fetched': self.db.get_last_page_fetched(model_name),
-            'last_updated': datetime.now().isoformat(),
-            'model_name': model_name
+            'page_timestamps': self.db.get_page_timestamps(model_name),
+            'last_page_fetched': stats.get('last_page_fetched', 0),
+            'total_pages': stats.get('total_pages', 0),
+            'last_updated': stats.get('last_updated'),
+            'fetch_count': stats.get('fetch_count', 0),
+            'missing_videos': missing_videos,
+            'metadata': {
+                'total_videos': len(videos),
+                'missing_count': sum(1 for v in missing_videos.values() if v.get('status') == 'missing')
+            }
         }
     
     def save(self, model_name: str, data: dict):
-        """保存缓存数据（兼容接口）"""
-        # 从SmartCache格式转换为数据库格式
-        videos_data = []
-        for title, video_info in data.get('videos', {}).items():
-            videos_data.append((
-                title,
-                video_info.get('url', ''),
-                video_info.get('page', 0)
-            ))
-        
-        if videos_data:
-            self.db.add_videos(model_name, videos_data)
+        """保存缓存数据（兼容接口，单个事务内批量写入）"""
+        if not self.enabled:
+            return
+        
+        videos_data = [
+            (title, video_info.get('url', ''), video_info.get('page', 0))
+            for title, video_info in data.get('videos', {}).items()
+        ]
+        
+        with self.db.transaction():
+            if videos_data:
+                self.db.add_videos(model_name, videos_data)
+            if data.get('last_page_fetched') or data.get('total_pages'):
+                self.db.update_cache_metadata(
+                    model_name,
+                    last_page_fetched=data.get('last_page_fetched', 0),
+                    total_pages=data.get('total_pages', 0)
+                )
+    
+    def transaction(self):
+        """事务上下文（块内写操作一次性提交）"""
+        return self.db.transaction()
+    
+    def flush(self, model_name: Optional[str] = None):
+        """兼容接口（数据库后端每次写入都已提交，无需额外写入）"""
     
     def add_videos(self, model_name: str, videos: List[Tuple[str, str, int]]):
         """添加视频（兼容接口）"""
+        if not self.enabled:
+            return
         self.db.add_videos(model_name, videos)
     
     def get_cached_titles(self, model_name: str) -> set:
         """获取缓存标题（兼容接口）"""
         return set(self.db.get_cached_titles(model_name))
     
+    def get_video_url(self, model_name: str, title: str) -> Optional[str]:
+        """获取单个视频URL（兼容接口）"""
+        return self.db.get_video_url(model_name, title)
+    
+    def get_video_urls(self, model_name: str) -> Dict[str, str]:
+        """获取 标题 -> URL 映射"""
+        return self.db.get_video_urls(model_name)
+    
     def should_update_page(self, model_name: str, page_num: int) -> bool:
         """判断是否需要更新页面（兼容接口）"""
+        if not self.enabled or not self.incremental_update:
+            return True
         return self.db.should_update_page(model_name, page_num, self.page_expiry_hours)
     
     def update_page_timestamp(self, model_name: str, page_num: int):
-        """更新页面时间戳（兼容接口）"""
-        self.db.update_page_timestamp(model_name, page_num)
+        """更新页面时间戳，并推进最后抓取页码（兼容接口）"""
+        if not self.enabled:
+            return
+        self.db.save_page_results(model_name, page_num, [])
+    
+    def save_page(self, model_name: str, page_num: int, videos: List[Tuple[str, str, int]]) -> bool:
+        """
+        保存一页的抓取结果，内容哈希未变化时只刷新时间戳
+        
+        Returns:
+            页面内容是否有变化
+        """
+        if not self.enabled:
+            return True
+        page_hash = compute_page_hash(videos)
+        with self.db.transaction():
+            changed = self.db.get_page_hash(model_name, page_num) != page_hash
+            self.db.save_page_results(model_name, page_num, videos if changed else [], page_hash)
+        if not changed:
+            logger.debug(f"第 {page_num} 页内容未变化，仅刷新时间戳: {model_name}")
+        return changed
+    
+    def remove_videos(self, model_name: str, titles: List[str]) -> int:
+        """删除指定视频"""
+        return self.db.remove_videos(model_name, titles)
+    
+    def reconcile_model_cache(self, model_name: str, schema_version: int,
+                              entry_validator: Optional[Callable[[str, dict], bool]] = None) -> Dict[str, Any]:
+        """校验模特缓存：版本不一致时整体重建，否则只剔除校验不通过的条目"""
+        with self.db.transaction():
+            if self.db.get_cache_schema_version(model_name) != schema_version:
+                removed = len(self.db.get_video_urls(model_name))
+                self.db.clear_cache(model_name)
+                self.db.update_cache_metadata(model_name, schema_version=schema_version)
+                return {'reset': True, 'removed': removed, 'kept': 0}
+            
+            records = self.db.get_video_records(model_name)
+            invalid = []
+            if entry_validator:
+                invalid = [title for title, info in records.items() if not entry_validator(title, info)]
+            removed = self.db.remove_videos(model_name, invalid)
+        
+        return {'reset': False, 'removed': removed, 'kept': len(records) - removed}
     
     def get_last_page(self, model_name: str) -> int:
         """获取最后页面（兼容接口）"""
         return self.db.get_last_page_fetched(model_name)
     
+    def is_cache_valid(self, model_name: str) -> bool:
+        """检查缓存是否有效（兼容接口）"""
+        if not self.enabled:
+            return False
+        return self.db.is_cache_valid(model_name, self.expiration_days)
+    
     def get_cache_stats(self, model_name: str) -> dict:
         """获取缓存统计（兼容接口）"""
         return self.db.get_cache_stats(model_name)
+    
+    def clear_cache(self, model_name: Optional[str] = None):
+        """清除缓存（兼容接口）"""
+        self.db.clear_cache(model_name)
+    
+    def get_incremental_fetch_range(self, model_name: str, max_pages: int = -1) -> Tuple[int, int]:
+        """获取增量抓取范围（兼容接口，前3页过期状态一次查询完成）"""
+        end_page = max_pages if max_pages > 0 else 9999
+        if not self.enabled or not self.incremental_update:
+            return (1, end_page)
+        
+        last_page = self.db.get_last_page_fetched(model_name)
+        if last_page == 0:
+            logger.info(f"{model_name}: 无缓存，执行完整抓取")
+            return (1, end_page)
+        
+        check_pages = list(range(1, min(3, last_page) + 1))
+        pages_to_refresh = self.db.get_expired_pages(model_name, check_pages, self.page_expiry_hours)
+        if pages_to_refresh:
+            logger.info(f"{model_name}: 检测到前 {len(pages_to_refresh)} 页需要刷新")
+            return (1, end_page)
+        
+        logger.info(f"{model_name}: 增量抓取，从第 {last_page + 1} 页开始")
+        return (last_page + 1, end_page)
+    
+    def mark_full_fetch_completed(self, model_name: str, total_pages: int):
+        """标记完整抓取完成（兼容接口）"""
+        if not self.enabled:
+            return
+        self.db.mark_full_fetch_completed(model_name, total_pages)
+    
+    def update_missing_videos(self, model_name: str, missing_videos: List[Tuple[str, str]]):
+        """更新缺失视频列表（兼容接口）"""
+        if not self.enabled:
+            return
+        self.db.update_missing_videos(model_name, missing_videos)
+    
+    def get_missing_videos(self, model_name: str) -> List[Tuple[str, str]]:
+        """获取缺失视频列表（兼容接口）"""
+        return self.db.get_missing_videos(model_name)
+    
+    def get_downloaded_titles(self, model_name: str) -> Set[str]:
+        """获取已下载视频标题集合"""
+        return set(self.db.get_downloaded_titles(model_name))
+    
+    def mark_video_downloaded(self, model_name: str, title: str, url: str = ''):
+        """标记视频已下载（兼容接口）"""
+        if not self.enabled:
+            return
+        self.db.mark_video_downloaded(model_name, title, url)
 
 
 # 工厂函数
@@ -0,0 +1,313 @@
+"""
+下载引擎基准测试（本地 HTTP 服务器）
+在本机启动支持 Range / ETag / If-Range 的测试服务器，驱动真实的 AsyncDownloadEngine，
+对比单连接、分段并行与断点续传的耗时和服务器实际发送的字节数，并校验文件内容。
+
+场景:
+    single      - 单连接下载（默认写缓冲）
+    unbuffered  - 单连接，8KB 读块、收到即写盘（调优前的写入方式），作为 single 的对照
+    preallocate - 单连接，posix_fallocate 预分配
+    parallel    - 按 range_chunks 分段并行下载
+    resume      - 传输中途断开 --failures 次，启用续传（Range 从断点继续）
+    restart     - 同上但关闭续传（每次重试从头下载），作为 resume 的对照
+
+服务器对每个连接限速（--rate-mb，0 不限速），模拟单连接带宽受限的CDN。
+测试内容由 1MB 随机块循环组成，GB 级文件也不占用同等内存。
+
+用法:
+    python -m core.modules.common.download_benchmark --size-mb 32 --rate-mb 8 --chunks 4
+    python -m core.modules.common.download_benchmark --scenarios resume,restart --failures 3 --json bench.json
+    python -m core.modules.common.download_benchmark --size-mb 2048 --rate-mb 0 --scenarios single,unbuffered,preallocate
+    python -m core.modules.common.download_benchmark --rate-mb 0 --limit-mb 4 --scenarios single,parallel
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import hashlib
+import logging
+import platform
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Dict, List, Optional
+
+from .bandwidth_limiter import configure_bandwidth_limiter
+
+SCENARIOS = ('single', 'unbuffered', 'preallocate', 'parallel', 'resume', 'restart')
+
+# 各场景相对默认配置的改动
+SCENARIO_OPTIONS = {
+    'single': {},
+    'unbuffered': {'chunk_size': 8192, 'write_buffer_mb': 0},
+    'preallocate': {'preallocate': True},
+    'parallel': {},
+    'resume': {},
+    'restart': {'resume': False},
+}
+
+BLOCK_SIZE = 1024 * 1024
+
+
+class _Payload:
+    """由随机块循环组成的测试内容"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.block = os.urandom(min(BLOCK_SIZE, size) or 1)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def read(self, start: int, end: int) -> bytes:
+        """[start, end) 区间的内容"""
+        block = self.block
+        parts = []
+        while start < end:
+            offset = start % len(block)
+            piece = block[offset:offset + end - start]
+            parts.append(piece)
+            start += len(piece)
+        return b''.join(parts)
+
+    def matches(self, path: str) -> bool:
+        """文件内容是否与测试内容一致"""
+        if os.path.getsize(path) != self.size:
+            return False
+        with open(path, 'rb') as f:
+            position = 0
+            while position < self.size:
+                data = f.read(BLOCK_SIZE)
+                if not data or data != self.read(position, position + len(data)):
+                    return False
+                position += len(data)
+        return True
+
+
+class _RangeServer:
+    """支持 Range 的本地测试服务器（按连接限速，可在传输中途断开）"""
+
+    def __init__(self, payload: _Payload, rate_bytes: int = 0, failures: int = 0, fail_fraction: float = 0.5):
+        self.payload = payload
+        self.etag = f'"{hashlib.sha1(payload.block).hexdigest()[:16]}-{len(payload)}"'
+        self.rate_bytes = rate_bytes
+        self.failures_left = failures
+        self.fail_fraction = fail_fraction
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'head_requests': 0, 'range_requests': 0, 'bytes_sent': 0, 'dropped': 0}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _parse_range(self):
+                header = self.headers.get('Range')
+                if_range = self.headers.get('If-Range')
+                if not header or (if_range and if_range != server.etag):
+                    return None
+                start, _, end = header.replace('bytes=', '').partition('-')
+                size = len(server.payload)
+                start = int(start)
+                end = int(end) if end else size - 1
+                return start, min(end, size - 1)
+
+            def do_HEAD(self):
+                with server.lock:
+                    server.stats['head_requests'] += 1
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(server.payload)))
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('ETag', server.etag)
+                self.end_headers()
+
+            def do_GET(self):
+                byte_range = self._parse_range()
+                size = len(server.payload)
+                with server.lock:
+                    server.stats['requests'] += 1
+                    if byte_range:
+                        server.stats['range_requests'] += 1
+                    drop = server.failures_left > 0
+                    if drop:
+                        server.failures_left -= 1
+
+                if byte_range:
+                    start, end = byte_range
+                    if start >= size:
+                        self.send_response(416)
+                        self.send_header('Content-Range', f'bytes */{size}')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+                else:
+                    start, end = 0, size - 1
+                    self.send_response(200)
+                length = end - start + 1
+                self.send_header('Content-Length', str(length))
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('ETag', server.etag)
+                self.end_headers()
+
+                # 断开点：本次响应的一部分
+                limit = int(length * server.fail_fraction) if drop else length
+                block = 64 * 1024
+                sent = 0
+                began = time.time()
+                try:
+                    while sent < limit:
+                        data = server.payload.read(start + sent, start + min(sent + block, limit))
+                        self.wfile.write(data)
+                        sent += len(data)
+                        with server.lock:
+                            server.stats['bytes_sent'] += len(data)
+                        if server.rate_bytes:
+                            ahead = sent / server.rate_bytes - (time.time() - began)
+                            if ahead > 0:
+                                time.sleep(ahead)
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+                if drop:
+                    with server.lock:
+                        server.stats['dropped'] += 1
+                    self.close_connection = True
+                    self.connection.shutdown(2)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        # 客户端取消分段时会重置连接，属正常情况
+        self.httpd.handle_error = lambda request, client_address: None
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/video.mp4'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+async def _download_once(url: str, save_dir: str, config: dict) -> Dict[str, Any]:
+    from .async_downloader import AsyncDownloadEngine
+    async with AsyncDownloadEngine(config) as engine:
+        task_id = engine.add_task(url=url, filename='video.mp4', save_path=save_dir)
+        result = await engine.download_single(task_id)
+        result['retries'] = engine.get_task_status(task_id).retries
+        return result
+
+
+def run_scenario(name: str, payload: _Payload, rate_bytes: int, chunks: int, failures: int,
+                 limit_mb: float = 0) -> Dict[str, Any]:
+    """运行一个场景，返回耗时、服务器发送字节数与校验结果"""
+    server = _RangeServer(payload, rate_bytes, failures=failures if name in ('resume', 'restart') else 0)
+    config = {'download': {
+        'max_workers': 1,
+        'retry_delay': 0,
+        'timeout': 3600,
+        'range_chunks': chunks if name == 'parallel' else 1,
+        'range_split_min_mb': 0,
+        'bandwidth': {'limit_mb': limit_mb},
+    }}
+    config['download'].update(SCENARIO_OPTIONS[name])
+    configure_bandwidth_limiter(config)
+    save_dir = tempfile.mkdtemp(prefix='dl_bench_')
+    try:
+        started = time.perf_counter()
+        result = asyncio.run(_download_once(server.url, save_dir, config))
+        elapsed = time.perf_counter() - started
+
+        file_path = os.path.join(save_dir, 'video.mp4')
+        valid = bool(result.get('success')) and os.path.exists(file_path) and payload.matches(file_path)
+        size = len(payload)
+        return {
+            'scenario': name,
+            'success': bool(result.get('success')),
+            'valid': valid,
+            'seconds': round(elapsed, 3),
+            'mb_per_s': round(size / (1024 * 1024) / elapsed, 2) if elapsed else 0,
+            'bytes_sent': server.stats['bytes_sent'],
+            'overhead': round(server.stats['bytes_sent'] / size, 3) if size else 0,
+            'requests': server.stats['requests'],
+            'head_requests': server.stats['head_requests'],
+            'range_requests': server.stats['range_requests'],
+            'dropped': server.stats['dropped'],
+            'retries': result.get('retries', 0),
+            'error': result.get('error'),
+        }
+    finally:
+        server.close()
+        shutil.rmtree(save_dir, ignore_errors=True)
+
+
+def run_download_benchmark(scenarios: List[str], size_mb: float = 32, rate_mb: float = 8,
+                           chunks: int = 4, failures: int = 2, limit_mb: float = 0) -> Dict[str, Any]:
+    """运行所有场景"""
+    payload = _Payload(int(size_mb * 1024 * 1024))
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'size_mb': size_mb,
+        'rate_mb_per_conn': rate_mb,
+        'chunks': chunks,
+        'failures': failures,
+        'limit_mb': limit_mb,
+        'results': [run_scenario(name, payload, int(rate_mb * 1024 * 1024), chunks, failures, limit_mb)
+                    for name in scenarios],
+    }
+
+
+def print_download_benchmark_report(report: Dict[str, Any]):
+    """打印基准结果"""
+    print("=" * 94)
+    print(f"下载引擎基准  文件 {report['size_mb']}MB  单连接限速 {report['rate_mb_per_conn']}MB/s  "
+          f"分段 {report['chunks']}  中断 {report['failures']} 次  "
+          f"客户端限速 {report['limit_mb'] or '不限'}{'MB/s' if report['limit_mb'] else ''}")
+    print("=" * 94)
+    print(f"{'场景':<12}{'结果':<6}{'耗时(s)':>10}{'MB/s':>10}{'发送/文件':>12}{'GET':>6}{'HEAD':>6}{'Range':>8}{'重试':>8}")
+    for r in report['results']:
+        status = '✅' if r['success'] and r['valid'] else '❌'
+        print(f"{r['scenario']:<12}{status:<6}{r['seconds']:>10.2f}{r['mb_per_s']:>10.2f}{r['overhead']:>12.2f}"
+              f"{r['requests']:>6}{r['head_requests']:>6}{r['range_requests']:>8}{r['retries']:>8}")
+        if r['error']:
+            print(f"  ⚠️ {r['error']}")
+    print()
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='下载引擎基准测试（本地 Range 服务器）')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='逗号分隔的场景: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--size-mb', type=float, default=32, help='测试文件大小（MB）')
+    parser.add_argument('--rate-mb', type=float, default=8, help='服务器单连接限速（MB/s，0 不限速）')
+    parser.add_argument('--chunks', type=int, default=4, help='parallel 场景的分段数')
+    parser.add_argument('--failures', type=int, default=2, help='resume/restart 场景的中途断开次数')
+    parser.add_argument('--limit-mb', type=float, default=0, help='客户端全局限速（download.bandwidth.limit_mb）')
+    parser.add_argument('--json', dest='json_path', help='将结果写入JSON文件')
+    args = parser.parse_args(argv)
+
+    scenarios = [s for s in args.scenarios.split(',') if s in SCENARIOS]
+    if not scenarios:
+        print(f"未知场景: {args.scenarios}")
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.WARNING)
+    report = run_download_benchmark(scenarios, args.size_mb, args.rate_mb, args.chunks, args.failures, args.limit_mb)
+    print_download_benchmark_report(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
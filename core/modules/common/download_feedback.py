@@ -0,0 +1,72 @@
+"""
+下载结果回写查重状态
+视频下载成功后，立即把结果写回三处查重状态，不必重新扫描目录或重新抓取列表：
+    - 已下载文件索引（DownloadedFileIndex）：登记新文件，之后的“已存在”检查直接命中
+    - 查重缓存（DupCacheStore）：从该模特缓存记录的缺失列表中移除，下次运行走快速路径时不再出现
+    - 智能缓存（SmartCache）：标记为已下载，快速路径把它计入本地已有
+
+三处更新在同一把锁内完成，多个下载线程同时回写时不会交错；
+查重缓存的修改在单个 SQLite 事务内完成。
+"""
+
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional, Union
+
+from .common import get_cache_dir, get_smart_cache
+from .download_index import get_download_index
+from .dup_cache import DupCacheStore
+
+logger = logging.getLogger(__name__)
+
+_feedback_lock = threading.Lock()
+
+
+def record_download_success(config: dict, model_name: str, url: str,
+                            file_path: Optional[Union[str, Path]] = None,
+                            save_dir: Optional[Union[str, Path]] = None,
+                            title: str = '') -> List[str]:
+    """
+    下载成功后回写查重状态
+
+    Args:
+        config: 配置字典
+        model_name: 模特名称
+        url: 视频URL（查重结果中的链接）
+        file_path: 下载得到的文件
+        save_dir: 保存目录（对应的文件索引；默认取文件所在目录）
+        title: 视频标题（查重缓存中找不到该URL时用于标记智能缓存）
+
+    Returns:
+        从缺失列表中移除的标题
+    """
+    config = config or {}
+    cache_cfg = config.get('cache', {}) or {}
+
+    with _feedback_lock:
+        if file_path and os.path.exists(str(file_path)):
+            index_dir = save_dir or os.path.dirname(str(file_path))
+            get_download_index(index_dir, config).add(file_path)
+
+        titles: List[str] = []
+        if model_name and url:
+            try:
+                store = DupCacheStore(cache_cfg.get('dup_cache_path', 'output/dup_cache.db'))
+                titles = [t for t, _ in store.mark_downloaded(model_name, [url])]
+            except Exception as e:
+                logger.warning(f"更新查重缓存失败: {model_name} - {e}")
+
+            if cache_cfg.get('enabled', True):
+                try:
+                    smart_cache = get_smart_cache(get_cache_dir(config), config)
+                    if smart_cache.enabled:
+                        for marked in titles or ([title] if title else []):
+                            smart_cache.mark_video_downloaded(model_name, marked, url)
+                except Exception as e:
+                    logger.warning(f"更新智能缓存失败: {model_name} - {e}")
+
+    if titles:
+        logger.debug(f"已回写下载结果: {model_name} - {', '.join(titles)}")
+    return titles
@@ -0,0 +1,204 @@
+"""
+已下载文件索引
+下载前的“文件已存在”检查：每个目录只扫描一次，把视频文件名清理、归一化后放入集合，
+之后每个视频的判断都是 O(1) 查找，替代逐个视频 glob 整个目录。
+
+文件名用与查重对比相同的规则处理（clean_filename + normalize_title），
+所以对比结果中“本地已有”的视频，下载时同样会被判定为已存在。
+
+完整目录下载、PornDownloader.download_video（GUI 的下载流程经由它）与 AsyncDownloadEngine
+共用 get_download_index() 返回的实例。本进程下载完成的文件通过 add() 直接加入；
+外部增删的文件在查找未命中时才重新扫描：扫描过的目录（含子目录）修改时间有变化、
+且距上次扫描超过 download.index_refresh_seconds 时重建。下载过程中的 .part / .tmp
+文件会不断改变目录修改时间，所以不在每次获取索引时检查。
+"""
+
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .common import clean_filename, normalize_title
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VIDEO_EXTENSIONS = {'.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.ts'}
+DEFAULT_REFRESH_INTERVAL = 30.0
+
+
+def _split_dirs(directory: Union[str, Path]) -> List[str]:
+    """支持自动模式合并路径（; 分隔）"""
+    directory = str(directory)
+    if directory and not os.path.exists(directory) and ';' in directory:
+        return [p.strip() for p in directory.split(';') if p.strip()]
+    return [directory]
+
+
+def _dir_stamp(dirs: Iterable[str]) -> Dict[str, Optional[int]]:
+    """各目录的修改时间（目录不存在时为 None）"""
+    stamp: Dict[str, Optional[int]] = {}
+    for d in dirs:
+        try:
+            stamp[d] = os.stat(d).st_mtime_ns
+        except OSError:
+            stamp[d] = None
+    return stamp
+
+
+class DownloadedFileIndex:
+    """目录下视频文件的标题索引（线程安全）"""
+
+    def __init__(self, directory: Union[str, Path], video_exts: Optional[Iterable[str]] = None,
+                 clean_patterns: Optional[List[str]] = None, comparison_cfg: Optional[dict] = None,
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        """
+        初始化并扫描目录
+
+        Args:
+            directory: 目录（可用 ; 分隔多个），递归扫描子目录
+            video_exts: 视频扩展名
+            clean_patterns: 文件名清理规则（filename_clean_patterns）
+            comparison_cfg: 对比配置（comparison 段）
+            refresh_interval: 查找未命中时两次重新扫描的最小间隔（秒）
+        """
+        self.dirs = _split_dirs(directory)
+        self.video_exts = {e.lower() for e in (video_exts or DEFAULT_VIDEO_EXTENSIONS)}
+        self.clean_patterns = list(clean_patterns or [])
+        self.comparison_cfg = comparison_cfg or {}
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshed_at = 0.0
+        self._names: Dict[str, Path] = {}
+        self._keys: Dict[str, Path] = {}
+        self._stamp: Dict[str, Optional[int]] = {}
+        self.refresh()
+
+    @classmethod
+    def from_config(cls, directory: Union[str, Path], config: dict = None) -> 'DownloadedFileIndex':
+        """按配置（video_extensions / filename_clean_patterns / comparison / download.index_refresh_seconds）创建索引"""
+        config = config or {}
+        return cls(
+            directory,
+            video_exts=config.get('video_extensions') or DEFAULT_VIDEO_EXTENSIONS,
+            clean_patterns=config.get('filename_clean_patterns', []),
+            comparison_cfg=config.get('comparison', {}),
+            refresh_interval=float((config.get('download', {}) or {}).get('index_refresh_seconds',
+                                                                          DEFAULT_REFRESH_INTERVAL)),
+        )
+
+    def key(self, name: str) -> str:
+        """标题/文件名（不含扩展名）对应的索引键"""
+        return normalize_title(clean_filename(name, self.clean_patterns) or name, self.comparison_cfg)
+
+    def refresh(self):
+        """重新扫描目录"""
+        names: Dict[str, Path] = {}
+        keys: Dict[str, Path] = {}
+        walked: List[str] = list(self.dirs)
+        for base in self.dirs:
+            if not base or not os.path.isdir(base):
+                continue
+            for root_dir, _, files in os.walk(base):
+                if root_dir != base:
+                    walked.append(root_dir)
+                for file in files:
+                    stem, ext = os.path.splitext(file)
+                    path = Path(root_dir) / file
+                    names[file] = path
+                    if ext.lower() in self.video_exts:
+                        key = self.key(stem)
+                        if key:
+                            keys.setdefault(key, path)
+        with self._lock:
+            self._names, self._keys = names, keys
+            self._stamp = _dir_stamp(walked)
+            self._refreshed_at = time.monotonic()
+        logger.debug(f"已下载文件索引: {';'.join(self.dirs)} 共 {len(keys)} 个视频")
+
+    def is_stale(self) -> bool:
+        """扫描过的目录（含子目录）修改时间是否与索引时不同"""
+        with self._lock:
+            stamp = dict(self._stamp)
+        return _dir_stamp(stamp) != stamp
+
+    def _rescan_due(self) -> bool:
+        return time.monotonic() - self._refreshed_at >= self.refresh_interval and self.is_stale()
+
+    def find(self, *names: str) -> Optional[Path]:
+        """
+        查找已存在的文件（未命中且目录有外部变化时按 refresh_interval 限频重新扫描一次）
+
+        Args:
+            names: 候选文件名或标题（可带扩展名）；依次按完整文件名、归一化标题匹配
+
+        Returns:
+            已存在文件的路径，未找到时返回 None
+        """
+        path = self._lookup(names)
+        if path is None and self._rescan_due():
+            with self._refresh_lock:
+                # 等锁期间其他线程可能已经重新扫描
+                if self._rescan_due():
+                    self.refresh()
+            path = self._lookup(names)
+        return path
+
+    def _lookup(self, names: Tuple[str, ...]) -> Optional[Path]:
+        with self._lock:
+            for name in names:
+                if not name:
+                    continue
+                path = self._names.get(name)
+                if path is not None and path.exists():
+                    return path
+            for name in names:
+                if not name:
+                    continue
+                # 带视频扩展名时去掉扩展名再归一化（其他扩展名视为标题的一部分）
+                stem, ext = os.path.splitext(name)
+                if ext.lower() in self.video_exts:
+                    name = stem
+                path = self._keys.get(self.key(name))
+                if path is not None and path.exists():
+                    return path
+        return None
+
+    def contains(self, *names: str) -> bool:
+        return self.find(*names) is not None
+
+    def add(self, file_path: Union[str, Path]):
+        """登记新下载完成的文件"""
+        path = Path(file_path)
+        stem, ext = os.path.splitext(path.name)
+        with self._lock:
+            self._names[path.name] = path
+            if ext.lower() in self.video_exts:
+                key = self.key(stem)
+                if key:
+                    self._keys[key] = path
+            # 只刷新文件所在目录的时间戳；新建的子目录会使上级目录时间变化，下次检查时重建
+            parent = str(path.parent)
+            if parent in self._stamp:
+                self._stamp.update(_dir_stamp([parent]))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._keys)
+
+
+_indexes: Dict[Tuple[str, ...], DownloadedFileIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_download_index(directory: Union[str, Path], config: dict = None) -> DownloadedFileIndex:
+    """获取目录的共享索引（首次使用时扫描；外部变化由 find() 未命中时处理）"""
+    key = tuple(os.path.abspath(d) for d in _split_dirs(directory))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = DownloadedFileIndex.from_config(directory, config)
+            _indexes[key] = index
+        return index
@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+"""
+持久化下载队列（SQLite）
+下载任务、状态、已下载字节数、尝试次数与最近错误写入数据库，关闭程序或崩溃后队列不会丢失。
+
+状态流转: pending → downloading → completed / failed / cancelled
+    - 失败后尝试次数未达 max_attempts 时回到 pending，下次继续
+    - 程序退出时仍为 downloading 的任务，启动时由 recover_interrupted() 恢复为 pending
+      （文件本身的断点由下载器的 .tmp / .tmp.json 保存，重新下载时从断点继续）
+
+按 URL 入队幂等：已在队列中的 URL 不会重复添加；失败或取消的任务重新入队时回到 pending。
+
+download_history 表保存 AsyncDownloadEngine 已结束任务的归档（引擎内存中只保留最近的任务）。
+
+任务类型（kind）:
+    file  - 直链文件，由 AsyncDownloadEngine.drain_queue() 执行
+    video - 视频页面，由 GUI 的下载选中/全部缺失视频流程（PornDownloader）执行
+    model - 模特完整目录，由 GUI 的完整目录下载流程（batch_download_models）执行
+
+配置（download.queue 段）:
+    enabled: 是否启用（默认 false）
+    db_path: 数据库路径（默认 output/download_queue.db）
+    max_attempts: 单个任务最多尝试次数（默认 5）
+    auto_resume: 启动时自动继续未完成的任务（默认 true）
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "output/download_queue.db"
+DEFAULT_MAX_ATTEMPTS = 5
+
+PENDING = "pending"
+DOWNLOADING = "downloading"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# 入队时会被重新排队的状态
+_REQUEUE_STATUSES = (FAILED, CANCELLED)
+
+
+@dataclass
+class QueuedDownload:
+    """队列中的一个下载任务"""
+    id: int
+    url: str
+    kind: str = "file"
+    filename: str = ""
+    save_path: str = ""
+    status: str = PENDING
+    bytes_done: int = 0
+    total_bytes: int = 0
+    attempts: int = 0
+    last_error: str = ""
+    file_path: str = ""
+    payload: Dict[str, Any] = field(default_factory=dict)   # 请求头、模特名等附加信息
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
+_COLUMNS = ('id, url, kind, filename, save_path, status, bytes_done, total_bytes, attempts, '
+            'last_error, file_path, payload_json, created_at, updated_at')
+
+
+def _row_to_item(row) -> QueuedDownload:
+    return QueuedDownload(
+        id=row[0],
+        url=row[1],
+        kind=row[2] or "file",
+        filename=row[3] or "",
+        save_path=row[4] or "",
+        status=row[5] or PENDING,
+        bytes_done=row[6] or 0,
+        total_bytes=row[7] or 0,
+        attempts=row[8] or 0,
+        last_error=row[9] or "",
+        file_path=row[10] or "",
+        payload=json.loads(row[11]) if row[11] else {},
+        created_at=row[12],
+        updated_at=row[13],
+    )
+
+
+class DownloadQueueStore:
+    """SQLite 下载队列（多线程共用，每次操作独立连接）"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.db_path = db_path
+        self.max_attempts = max(1, int(max_attempts))
+        dir_path = os.path.dirname(db_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        self._init_db()
+
+    @classmethod
+    def from_config(cls, config: dict = None) -> 'DownloadQueueStore':
+        """从配置字典创建（download.queue 段）"""
+        queue_cfg = ((config or {}).get('download', {}) or {}).get('queue', {}) or {}
+        return cls(
+            db_path=queue_cfg.get('db_path', DEFAULT_DB_PATH),
+            max_attempts=queue_cfg.get('max_attempts', DEFAULT_MAX_ATTEMPTS),
+        )
+
+    @contextmanager
+    def _connect(self):
+        # isolation_level=None：事务由 BEGIN IMMEDIATE 显式控制
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        try:
+            self._create_tables()
+        except sqlite3.DatabaseError:
+            self._recover_db()
+            self._create_tables()
+
+    def _create_tables(self):
+        with self._connect() as conn:
+            # WAL：下载线程写进度时不阻塞界面读取队列
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS download_queue (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT UNIQUE NOT NULL,
+                    kind TEXT DEFAULT 'file',
+                    filename TEXT,
+                    save_path TEXT,
+                    status TEXT DEFAULT 'pending',
+                    bytes_done INTEGER DEFAULT 0,
+                    total_bytes INTEGER DEFAULT 0,
+                    attempts INTEGER DEFAULT 0,
+                    last_error TEXT,
+                    file_path TEXT,
+                    payload_json TEXT,
+                    created_at TIMESTAMP,
+                    updated_at TIMESTAMP
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_download_queue_status ON download_queue(status, kind)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS download_history (
+                    task_id TEXT PRIMARY KEY,
+                    url TEXT,
+                    filename TEXT,
+                    save_path TEXT,
+                    status TEXT,
+                    bytes_done INTEGER DEFAULT 0,
+                    total_bytes INTEGER DEFAULT 0,
+                    retries INTEGER DEFAULT 0,
+                    last_error TEXT,
+                    started_at TIMESTAMP,
+                    finished_at TIMESTAMP
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_download_history_finished ON download_history(finished_at)')
+
+    def _recover_db(self):
+        if not os.path.exists(self.db_path):
+            return
+        try:
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            backup_path = f"{self.db_path}.corrupted.{ts}.bak"
+            os.rename(self.db_path, backup_path)
+            logger.warning(f"下载队列数据库损坏，已自动重建并备份: {backup_path}")
+        except Exception as e:
+            logger.warning(f"下载队列数据库重建失败: {e}")
+
+    # ==================== 入队 ====================
+
+    def enqueue(self, url: str, filename: str = "", save_path: str = "", kind: str = "file",
+                payload: Optional[Dict[str, Any]] = None) -> int:
+        """
+        添加任务（按 URL 幂等）
+
+        Returns:
+            任务ID（URL 已在队列中时返回原任务ID）
+        """
+        return self.enqueue_many([(url, filename, save_path, payload)], kind=kind)[0]
+
+    def enqueue_many(self, items: Iterable[Tuple[str, str, str, Optional[Dict[str, Any]]]],
+                     kind: str = "file") -> List[int]:
+        """
+        批量添加任务（单个事务）
+
+        Args:
+            items: (url, filename, save_path, payload) 列表
+            kind: 任务类型
+
+        Returns:
+            与 items 顺序对应的任务ID
+        """
+        now = datetime.now().isoformat()
+        ids = []
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                for url, filename, save_path, payload in items:
+                    conn.execute('''
+                        INSERT INTO download_queue (url, kind, filename, save_path, status, payload_json,
+                                                    created_at, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(url) DO NOTHING
+                    ''', (url, kind, filename, save_path, PENDING,
+                          json.dumps(payload or {}, ensure_ascii=False), now, now))
+                    row = conn.execute('SELECT id, status FROM download_queue WHERE url = ?', (url,)).fetchone()
+                    if row[1] in _REQUEUE_STATUSES:
+                        conn.execute('''
+                            UPDATE download_queue SET status = ?, attempts = 0, last_error = '', updated_at = ?
+                            WHERE id = ?
+                        ''', (PENDING, now, row[0]))
+                    ids.append(row[0])
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return ids
+
+    # ==================== 执行 ====================
+
+    def claim_next(self, kind: Optional[str] = None) -> Optional[QueuedDownload]:
+        """取出下一个待下载任务并标记为 downloading（尝试次数少的优先）"""
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                query = f'SELECT {_COLUMNS} FROM download_queue WHERE status = ?'
+                params: List[Any] = [PENDING]
+                if kind:
+                    query += ' AND kind = ?'
+                    params.append(kind)
+                row = conn.execute(query + ' ORDER BY attempts, id LIMIT 1', params).fetchone()
+                if row is None:
+                    conn.execute('COMMIT')
+                    return None
+                conn.execute('''
+                    UPDATE download_queue SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?
+                ''', (DOWNLOADING, now, row[0]))
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        item = _row_to_item(row)
+        item.status = DOWNLOADING
+        item.attempts += 1
+        return item
+
+    def mark_started(self, item_id: int):
+        """标记指定任务开始下载（调用方自行决定执行顺序时使用）"""
+        self._execute('''
+            UPDATE download_queue SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?
+        ''', (DOWNLOADING, datetime.now().isoformat(), item_id))
+
+    def update_progress(self, item_id: int, bytes_done: int, total_bytes: int = 0):
+        self._execute('''
+            UPDATE download_queue SET bytes_done = ?, total_bytes = ?, updated_at = ? WHERE id = ?
+        ''', (bytes_done, total_bytes, datetime.now().isoformat(), item_id))
+
+    def mark_completed(self, item_id: int, file_path: str = "", file_size: Optional[int] = None):
+        now = datetime.now().isoformat()
+        if file_size is None:
+            self._execute('''
+                UPDATE download_queue SET status = ?, file_path = ?, last_error = '', updated_at = ? WHERE id = ?
+            ''', (COMPLETED, file_path, now, item_id))
+        else:
+            self._execute('''
+                UPDATE download_queue SET status = ?, file_path = ?, bytes_done = ?, total_bytes = ?,
+                                          last_error = '', updated_at = ?
+                WHERE id = ?
+            ''', (COMPLETED, file_path, file_size, file_size, now, item_id))
+
+    def mark_failed(self, item_id: int, error: str) -> str:
+        """
+        记录失败（尝试次数未达上限时回到 pending）
+
+        Returns:
+            新状态
+        """
+        with self._connect() as conn:
+            row = conn.execute('SELECT attempts FROM download_queue WHERE id = ?', (item_id,)).fetchone()
+            status = FAILED if row is None or row[0] >= self.max_attempts else PENDING
+            conn.execute('''
+                UPDATE download_queue SET status = ?, last_error = ?, updated_at = ? WHERE id = ?
+            ''', (status, (error or "")[:500], datetime.now().isoformat(), item_id))
+        return status
+
+    def mark_cancelled(self, item_id: int):
+        self._execute('UPDATE download_queue SET status = ?, updated_at = ? WHERE id = ?',
+                      (CANCELLED, datetime.now().isoformat(), item_id))
+
+    def release(self, item_id: int):
+        """下载被中断（程序退出等）：放回 pending，不计入尝试次数"""
+        self._execute('''
+            UPDATE download_queue SET status = ?, attempts = MAX(attempts - 1, 0), updated_at = ? WHERE id = ?
+        ''', (PENDING, datetime.now().isoformat(), item_id))
+
+    def recover_interrupted(self, kind: Optional[str] = None) -> int:
+        """把上次运行中断时仍为 downloading 的任务恢复为 pending，返回恢复数量"""
+        query = 'UPDATE download_queue SET status = ?, updated_at = ? WHERE status = ?'
+        params: List[Any] = [PENDING, datetime.now().isoformat(), DOWNLOADING]
+        if kind:
+            query += ' AND kind = ?'
+            params.append(kind)
+        with self._connect() as conn:
+            count = conn.execute(query, params).rowcount
+        if count:
+            logger.info(f"♻️ 恢复 {count} 个中断的下载任务")
+        return count
+
+    # ==================== 查询 ====================
+
+    def get(self, item_id: int) -> Optional[QueuedDownload]:
+        with self._connect() as conn:
+            row = conn.execute(f'SELECT {_COLUMNS} FROM download_queue WHERE id = ?', (item_id,)).fetchone()
+        return _row_to_item(row) if row else None
+
+    def find(self, url: str) -> Optional[QueuedDownload]:
+        with self._connect() as conn:
+            row = conn.execute(f'SELECT {_COLUMNS} FROM download_queue WHERE url = ?', (url,)).fetchone()
+        return _row_to_item(row) if row else None
+
+    def list(self, statuses: Optional[Iterable[str]] = None, kind: Optional[str] = None) -> List[QueuedDownload]:
+        """按入队顺序列出任务"""
+        query = f'SELECT {_COLUMNS} FROM download_queue WHERE 1 = 1'
+        params: List[Any] = []
+        if statuses:
+            statuses = list(statuses)
+            query += f" AND status IN ({', '.join('?' * len(statuses))})"
+            params.extend(statuses)
+        if kind:
+            query += ' AND kind = ?'
+            params.append(kind)
+        with self._connect() as conn:
+            rows = conn.execute(query + ' ORDER BY id', params).fetchall()
+        return [_row_to_item(row) for row in rows]
+
+    def unfinished(self, kind: Optional[str] = None) -> List[QueuedDownload]:
+        """未完成的任务（pending 与中断的 downloading）"""
+        return self.list((PENDING, DOWNLOADING), kind)
+
+    def counts(self) -> Dict[str, int]:
+        """各状态任务数"""
+        counts = {s: 0 for s in (PENDING, DOWNLOADING, COMPLETED, FAILED, CANCELLED)}
+        with self._connect() as conn:
+            for status, count in conn.execute('SELECT status, COUNT(*) FROM download_queue GROUP BY status'):
+                counts[status] = count
+        return counts
+
+    def clear(self, statuses: Iterable[str] = (COMPLETED,)) -> int:
+        """删除指定状态的任务，返回删除数量"""
+        statuses = list(statuses)
+        with self._connect() as conn:
+            return conn.execute(
+                f"DELETE FROM download_queue WHERE status IN ({', '.join('?' * len(statuses))})", statuses
+            ).rowcount
+
+    # ==================== 任务归档 ====================
+
+    _HISTORY_COLUMNS = ('task_id', 'url', 'filename', 'save_path', 'status', 'bytes_done', 'total_bytes',
+                        'retries', 'last_error', 'started_at', 'finished_at')
+
+    def archive_tasks(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        归档已结束的引擎任务（单个事务，同一 task_id 覆盖写入）
+
+        Args:
+            records: 字段同 download_history 表的字典列表
+
+        Returns:
+            写入数量
+        """
+        rows = [tuple(record.get(col) for col in self._HISTORY_COLUMNS) for record in records]
+        if not rows:
+            return 0
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany(f'''
+                    INSERT OR REPLACE INTO download_history ({', '.join(self._HISTORY_COLUMNS)})
+                    VALUES ({', '.join('?' * len(self._HISTORY_COLUMNS))})
+                ''', rows)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return len(rows)
+
+    def history(self, limit: int = 100, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """最近结束的引擎任务（按结束时间倒序）"""
+        query = f"SELECT {', '.join(self._HISTORY_COLUMNS)} FROM download_history"
+        params: List[Any] = []
+        if status:
+            query += ' WHERE status = ?'
+            params.append(status)
+        query += ' ORDER BY finished_at DESC LIMIT ?'
+        params.append(int(limit))
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [dict(zip(self._HISTORY_COLUMNS, row)) for row in rows]
+
+    def _execute(self, sql: str, params: Tuple):
+        with self._connect() as conn:
+            conn.execute(sql, params)
+
+
+def queue_settings(config: dict = None) -> Dict[str, Any]:
+    """download.queue 配置（补全默认值）"""
+    queue_cfg = ((config or {}).get('download', {}) or {}).get('queue', {}) or {}
+    return {
+        'enabled': bool(queue_cfg.get('enabled', False)),
+        'db_path': queue_cfg.get('db_path', DEFAULT_DB_PATH),
+        'max_attempts': queue_cfg.get('max_attempts', DEFAULT_MAX_ATTEMPTS),
+        'auto_resume': bool(queue_cfg.get('auto_resume', True)),
+    }
+
+
+_queues: Dict[str, DownloadQueueStore] = {}
+_queues_lock = threading.Lock()
+
+
+def get_download_queue(config: dict = None) -> Optional[DownloadQueueStore]:
+    """获取共享的下载队列（未启用时返回 None）"""
+    settings = queue_settings(config)
+    if not settings['enabled']:
+        return None
+    key = os.path.abspath(settings['db_path'])
+    with _queues_lock:
+        store = _queues.get(key)
+        if store is None:
+            store = DownloadQueueStore(settings['db_path'], settings['max_attempts'])
+            _queues[key] = store
+        return store
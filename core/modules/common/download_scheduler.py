@@ -0,0 +1,155 @@
+"""
+并发下载调度器
+完整目录下载与多模特批量下载共用：全局最多 max_workers 个下载同时进行，
+同一站点（host）最多 per_host_limit 个，任务按模特轮转交错提交，
+避免某个视频很多的模特占满所有下载槽位。
+
+任务在工作线程中执行，完成回调（on_complete）在调用 run() 的线程中依次执行，
+因此回调里汇总结果字典无需加锁。
+
+配置（download 段）:
+    max_workers: 全局并发下载数（默认 4，1 即逐个下载）
+    per_host_limit: 单站点并发下载数（默认等于 max_workers）
+"""
+
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass
+class DownloadJob:
+    """一个下载任务"""
+    group: str                    # 分组（模特名），用于轮转交错
+    url: str                      # 下载URL（按 host 限制并发）
+    func: Callable[[], Any]       # 实际执行下载的函数，返回结果字典
+    label: str = ""               # 日志显示用（视频标题）
+    payload: Any = None           # 调用方附带的数据，原样传回 on_complete
+
+
+def interleave_by_group(jobs: List[DownloadJob]) -> List[DownloadJob]:
+    """按分组轮转排列任务：A1, B1, C1, A2, B2, ...（组内保持原顺序）"""
+    groups: 'OrderedDict[str, deque]' = OrderedDict()
+    for job in jobs:
+        groups.setdefault(job.group, deque()).append(job)
+    ordered = []
+    while groups:
+        for group in list(groups):
+            queue = groups[group]
+            ordered.append(queue.popleft())
+            if not queue:
+                del groups[group]
+    return ordered
+
+
+class DownloadScheduler:
+    """全局并发 + 单站点并发限制的下载调度器"""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, per_host_limit: Optional[int] = None):
+        """
+        初始化调度器
+
+        Args:
+            max_workers: 全局并发下载数
+            per_host_limit: 单站点并发下载数（None 表示不单独限制）
+        """
+        self.max_workers = max(1, int(max_workers or 1))
+        self.per_host_limit = max(1, int(per_host_limit)) if per_host_limit else self.max_workers
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_config(cls, config: dict = None) -> 'DownloadScheduler':
+        """从配置字典创建调度器"""
+        download_cfg = (config or {}).get('download', {}) or {}
+        return cls(
+            max_workers=download_cfg.get('max_workers', DEFAULT_MAX_WORKERS),
+            per_host_limit=download_cfg.get('per_host_limit'),
+        )
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return (urlparse(url).hostname or '').lower()
+
+    def stop(self):
+        """停止提交新任务（已开始的下载会继续完成）"""
+        self._stop.set()
+
+    def run(self, jobs: List[DownloadJob],
+            on_start: Optional[Callable[[DownloadJob, int, int], None]] = None,
+            on_complete: Optional[Callable[[DownloadJob, Optional[Dict], Optional[BaseException]], None]] = None,
+            should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, int]:
+        """
+        执行全部任务
+
+        Args:
+            jobs: 任务列表（内部按分组轮转交错）
+            on_start: 任务提交时回调 (job, 序号, 总数)
+            on_complete: 任务完成时回调 (job, 结果, 异常)，在当前线程执行
+            should_stop: 返回 True 时不再提交新任务
+
+        Returns:
+            {'total', 'completed', 'failed', 'not_started'}
+        """
+        pending = deque(interleave_by_group(jobs))
+        total = len(pending)
+        stats = {'total': total, 'completed': 0, 'failed': 0, 'not_started': 0}
+        if not pending:
+            return stats
+
+        host_active: Dict[str, int] = {}
+        running = {}
+        submitted = 0
+        self._stop.clear()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='download') as executor:
+            while pending or running:
+                stopping = self._stop.is_set() or (should_stop is not None and should_stop())
+                if stopping and pending:
+                    stats['not_started'] += len(pending)
+                    logger.info(f"⏹️ 下载已停止，{len(pending)} 个任务未开始")
+                    pending.clear()
+
+                # 填满空闲槽位：跳过已达单站点上限的任务，保持其余顺序
+                skipped = deque()
+                while pending and len(running) < self.max_workers:
+                    job = pending.popleft()
+                    host = self._host(job.url)
+                    if host_active.get(host, 0) >= self.per_host_limit:
+                        skipped.append(job)
+                        continue
+                    host_active[host] = host_active.get(host, 0) + 1
+                    submitted += 1
+                    if on_start:
+                        on_start(job, submitted, total)
+                    running[executor.submit(job.func)] = (job, host)
+                skipped.extend(pending)
+                pending = skipped
+
+                if not running:
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    job, host = running.pop(future)
+                    host_active[host] -= 1
+                    error = future.exception()
+                    result = None if error else future.result()
+                    if error or not (result or {}).get('success', False):
+                        stats['failed'] += 1
+                    else:
+                        stats['completed'] += 1
+                    if on_complete:
+                        try:
+                            on_complete(job, result, error)
+                        except Exception as e:
+                            logger.error(f"下载完成回调失败: {e}")
+
+        return stats
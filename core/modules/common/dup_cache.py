@@ -242,6 +242,60 @@ class DupCacheStore:
             logger.warning(f"写入缓存失败: {e}")
 
 
+    def mark_downloaded(self, model_name: str, urls: List[str]) -> List[Tuple[str, str]]:
+        """
+        下载完成后从该模特所有缓存记录的缺失列表中移除对应视频（单个事务内完成）
+
+        Args:
+            model_name: 模特名称
+            urls: 已下载视频的URL
+
+        Returns:
+            被移除的 (title, url) 列表
+        """
+        wanted = {u.strip() for u in urls if u and u.strip()}
+        if not wanted:
+            return []
+        removed: Dict[str, str] = {}
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                rows = conn.execute('''
+                    SELECT cache_key, local_count, missing_titles_json, missing_with_urls_json
+                    FROM dup_cache WHERE model_name = ?
+                ''', (model_name,)).fetchall()
+                for cache_key, local_count, titles_json, with_urls_json in rows:
+                    missing_with_urls = json.loads(with_urls_json) if with_urls_json else []
+                    hit = {t for t, u in missing_with_urls if (u or '').strip() in wanted}
+                    if not hit:
+                        continue
+                    for t, u in missing_with_urls:
+                        if t in hit:
+                            removed.setdefault(t, u)
+                    missing_titles = [t for t in (json.loads(titles_json) if titles_json else []) if t not in hit]
+                    missing_with_urls = [(t, u) for t, u in missing_with_urls if t not in hit]
+                    conn.execute('''
+                        UPDATE dup_cache
+                        SET local_count = ?, missing_titles_json = ?, missing_with_urls_json = ?
+                        WHERE cache_key = ?
+                    ''', (
+                        (local_count or 0) + len(hit),
+                        json.dumps(missing_titles, ensure_ascii=False),
+                        json.dumps(missing_with_urls, ensure_ascii=False),
+                        cache_key,
+                    ))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            finally:
+                conn.close()
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"更新缓存缺失列表失败: {e}")
+            return []
+        return list(removed.items())
+
     def clear(self, model_name: Optional[str] = None):
         conn = sqlite3.connect(self.db_path)
         cur = conn.cursor()
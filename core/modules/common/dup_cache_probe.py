@@ -7,10 +7,15 @@ import os
 import time
 import hashlib
 from typing import List, Tuple, Dict, Optional
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
+from .html_parser import select_texts
+from .host_scheduler import get_host_scheduler
+from .http_client import http_get, http_head
+
+# 远端探测提取的标题选择器（异步抓取引擎共用）
+PROBE_TITLE_SELECTOR = 'a.thumbnailTitle, a.title, .video-title, h3.title'
+
 
 def compute_local_signature_from_files(folder: str, titles: List[str]) -> str:
     """基于文件数量 + 最近修改时间 + 标题集合生成本地签名"""
@@ -50,17 +55,15 @@ def probe_remote_signature(url: str, headers: Optional[Dict[str, str]] = None, p
     headers = headers or {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
     }
-    resp = requests.get(url, headers=headers, timeout=15, proxies=proxies, verify=False)
+    # 与翻页请求共用站点限速
+    get_host_scheduler().wait(url)
+    resp = http_get(url, headers=headers, timeout=15, proxies=proxies, verify=False)
     resp.raise_for_status()
     if resp.encoding.lower() != 'utf-8':
         resp.encoding = 'utf-8'
 
-    soup = BeautifulSoup(resp.text, 'html.parser')
-    titles = []
-    for elem in soup.select('a.thumbnailTitle, a.title, .video-title, h3.title'):
-        t = elem.get_text(strip=True)
-        if t and len(t) > 3:
-            titles.append(t)
+    # 只需要标题文本，单次解析即可（selectolax/lxml 可用时自动启用）
+    titles = select_texts(resp.text, PROBE_TITLE_SELECTOR, min_length=3)
 
     signature = compute_remote_signature_from_titles(titles)
     return signature, titles
@@ -74,11 +77,11 @@ def check_url_available(url: str, headers: Optional[Dict[str, str]] = None, prox
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
     }
     try:
-        resp = requests.head(url, headers=headers, timeout=timeout, proxies=proxies, allow_redirects=True, verify=False)
+        resp = http_head(url, headers=headers, timeout=timeout, proxies=proxies, allow_redirects=True, verify=False)
         if resp.status_code < 400:
             return True
         if resp.status_code in (403, 405):
-            resp = requests.get(url, headers=headers, timeout=timeout, proxies=proxies, allow_redirects=True, verify=False)
+            resp = http_get(url, headers=headers, timeout=timeout, proxies=proxies, allow_redirects=True, verify=False)
             return resp.status_code < 400
         return False
     except Exception:
@@ -1,12 +1,17 @@
 """
 增强版代理预检模块
 提供全面的代理连接测试和诊断功能
+
+各项检查（TCP连接、HTTP、HTTPS、各目标网站）并发执行，并受总体期限约束：
+基础TCP连接失败时立即结束，其余未完成的检查记为跳过；
+超过期限仍未完成的检查记为超时，最坏情况约为一个超时时间。
 """
 
 import socket
 import time
 import requests
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 import logging
@@ -48,26 +53,68 @@ class EnhancedProxyTester:
         "https://api.ipify.org"
     ]
     
-    def __init__(self, proxy_config: dict, timeout: int = 10):
+    # 总体期限在单项超时之外的余量（秒）
+    DEADLINE_GRACE = 2.0
+    
+    def __init__(self, proxy_config: dict, timeout: int = 10, deadline: Optional[float] = None):
+        """
+        初始化代理测试器
+        
+        Args:
+            proxy_config: 代理配置（整份config或proxy段）
+            timeout: 单项检查超时（秒）
+            deadline: 全部检查的总体期限（秒），默认为 timeout + DEADLINE_GRACE
+        """
         self.proxy_config = proxy_config
         self.timeout = timeout
+        self.deadline = deadline if deadline is not None else timeout + self.DEADLINE_GRACE
         self.results = []
     
     def comprehensive_check(self) -> ComprehensiveProxyCheck:
-        """执行全面的代理检查"""
+        """执行全面的代理检查（各项并发，TCP失败时提前结束）"""
         logger.info("🔍 开始全面代理检查...")
         
-        # 1. 基础连接测试
-        basic_result = self._test_basic_connectivity()
+        proxies = self._build_proxy_dict()
+        target_urls = self.TEST_URLS if proxies else []
         
-        # 2. HTTP访问测试
-        http_result = self._test_http_access()
+        # 1~4. 基础连接、HTTP、HTTPS与各目标网站同时开始
+        executor = ThreadPoolExecutor(max_workers=3 + len(target_urls), thread_name_prefix='proxy-check')
+        futures = {
+            executor.submit(self._test_basic_connectivity): 'basic',
+            executor.submit(self._test_http_access): 'http',
+            executor.submit(self._test_https_access): 'https',
+        }
+        for url in target_urls:
+            futures[executor.submit(self._test_target_website, url, proxies)] = url
         
-        # 3. HTTPS访问测试  
-        https_result = self._test_https_access()
+        results = {}
+        pending = set(futures)
+        end_time = time.time() + self.deadline
+        abort_reason = ""
+        while pending:
+            remaining = end_time - time.time()
+            if remaining <= 0:
+                abort_reason = f"超过总体期限 {self.deadline:.0f}s 未完成"
+                logger.warning(f"⚠️  代理检查{abort_reason}，剩余 {len(pending)} 项按失败处理")
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[futures[future]] = future.result()
+            if 'basic' in results and not results['basic'].success:
+                abort_reason = "基础TCP连接失败，已跳过"
+                break
+        # 不等待未完成的请求线程（它们会在各自超时后结束）；尚未开始的直接取消
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
         
-        # 4. 目标网站测试
-        target_results = self._test_target_websites()
+        def _result(key: str, host: str = "") -> ProxyTestResult:
+            return results.get(key) or ProxyTestResult(success=False, host=host, error_message=abort_reason)
+        
+        basic_result = _result('basic')
+        http_result = _result('http')
+        https_result = _result('https')
+        target_results = [_result(url, urllib.parse.urlparse(url).netloc) for url in target_urls]
         
         # 5. 生成综合结果
         overall_success = all([
@@ -267,52 +314,52 @@ class EnhancedProxyTester:
             )
     
     def _test_target_websites(self) -> List[ProxyTestResult]:
-        """测试目标网站访问"""
+        """测试目标网站访问（逐个执行；comprehensive_check 中为并发）"""
         logger.info("🎯 测试目标网站访问...")
         
-        results = []
         proxies = self._build_proxy_dict()
         
         if not proxies:
             # 如果没有代理配置，返回空结果
-            return results
-        
-        for url in self.TEST_URLS:
-            try:
-                logger.info(f"  测试: {url}")
-                start_time = time.time()
-                response = requests.get(
-                    url,
-                    proxies=proxies,
-                    timeout=self.timeout,
-                    verify=False
-                )
-                response_time = time.time() - start_time
-                
-                result = ProxyTestResult(
-                    success=response.status_code == 200,
-                    host=urllib.parse.urlparse(url).netloc,
-                    response_time=response_time,
-                    details={'status_code': response.status_code}
-                )
-                
-                if result.success:
-                    logger.info(f"    ✅ 成功 ({response_time:.2f}s)")
-                else:
-                    logger.warning(f"    ⚠️  失败 (状态码: {response.status_code})")
-                    result.error_message = f"状态码: {response.status_code}"
-                
-                results.append(result)
-                
-            except Exception as e:
-                logger.warning(f"    ❌ 异常: {str(e)[:50]}")
-                results.append(ProxyTestResult(
-                    success=False,
-                    host=urllib.parse.urlparse(url).netloc,
-                    error_message=str(e)[:100]
-                ))
+            return []
         
-        return results
+        return [self._test_target_website(url, proxies) for url in self.TEST_URLS]
+    
+    def _test_target_website(self, url: str, proxies: Dict[str, str]) -> ProxyTestResult:
+        """测试单个目标网站访问"""
+        host = urllib.parse.urlparse(url).netloc
+        try:
+            start_time = time.time()
+            response = requests.get(
+                url,
+                proxies=proxies,
+                timeout=self.timeout,
+                verify=False
+            )
+            response_time = time.time() - start_time
+            
+            result = ProxyTestResult(
+                success=response.status_code == 200,
+                host=host,
+                response_time=response_time,
+                details={'status_code': response.status_code}
+            )
+            
+            if result.success:
+                logger.info(f"  🎯 {host}: ✅ 成功 ({response_time:.2f}s)")
+            else:
+                logger.warning(f"  🎯 {host}: ⚠️  失败 (状态码: {response.status_code})")
+                result.error_message = f"状态码: {response.status_code}"
+            
+            return result
+            
+        except Exception as e:
+            logger.warning(f"  🎯 {host}: ❌ 异常: {str(e)[:50]}")
+            return ProxyTestResult(
+                success=False,
+                host=host,
+                error_message=str(e)[:100]
+            )
     
     def _extract_proxy_info(self) -> Tuple[str, int, str]:
         """提取代理配置信息（兼容传入整份config或仅proxy段）"""
@@ -0,0 +1,256 @@
+"""
+HLS（M3U8）分片并发下载
+固定数量的线程并发下载分片，每个分片用 iter_content 流式写入独立的分片文件，
+主线程按顺序把已完成的分片追加到输出文件（重排窗口限制提前下载的分片数，内存与临时文件占用都有上限）。
+
+断点续传：输出临时文件旁保存清单（<文件>.tmp.json），记录从头开始连续写入成功的分片数与字节数；
+再次下载同一播放列表时截断到清单记录的位置，从第一个未成功的分片继续。
+
+单个分片失败会按退避重试；重试后仍失败的分片被跳过（与原逻辑一致），
+跳过的分片超过 max_failure_ratio 时放弃本次下载（保留临时文件与清单，续传时重新下载失败的分片）。
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .bandwidth_limiter import BandwidthLimiter, get_bandwidth_limiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEGMENT_WORKERS = 8
+DEFAULT_SEGMENT_RETRIES = 3
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_m3u8_segments(m3u8_content: str, m3u8_url: str, site_base: Optional[str] = None) -> List[str]:
+    """
+    解析媒体播放列表中的分片URL
+
+    Args:
+        m3u8_content: 播放列表文本
+        m3u8_url: 播放列表URL（解析相对路径）
+        site_base: 以 / 开头的路径相对的站点根（默认取播放列表所在站点）
+    """
+    segment_urls = []
+    for line in m3u8_content.split('\n'):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('http'):
+            segment_urls.append(line)
+        elif line.startswith('/'):
+            segment_urls.append(urljoin(site_base or m3u8_url, line))
+        else:
+            # 相对URL
+            base_url = '/'.join(m3u8_url.split('/')[:-1])
+            segment_urls.append(f"{base_url}/{line}")
+    return segment_urls
+
+
+def playlist_key(segment_urls: List[str]) -> str:
+    """播放列表标识（只取路径，签名参数每次请求都会变化）"""
+    return hashlib.sha1('\n'.join(urlparse(u).path for u in segment_urls).encode('utf-8')).hexdigest()
+
+
+class HlsSegmentDownloader:
+    """HLS 分片并发下载器"""
+
+    def __init__(self, session: requests.Session, workers: int = DEFAULT_SEGMENT_WORKERS,
+                 retries: int = DEFAULT_SEGMENT_RETRIES, timeout: float = 15,
+                 max_failure_ratio: float = 0.2, reorder_window: Optional[int] = None,
+                 limiter: Optional[BandwidthLimiter] = None):
+        """
+        初始化下载器
+
+        Args:
+            session: 共享的 requests 会话（会按并发数扩大连接池）
+            workers: 并发下载的分片数
+            retries: 单个分片的重试次数
+            timeout: 单个分片请求超时（秒）
+            max_failure_ratio: 允许跳过的分片比例
+            reorder_window: 最多领先写入位置多少个分片（默认 workers * 4）
+            limiter: 共享带宽限速器（None 不限速）
+        """
+        self.session = session
+        self.workers = max(1, int(workers))
+        self.retries = max(0, int(retries))
+        self.timeout = timeout
+        self.max_failure_ratio = max_failure_ratio
+        self.reorder_window = max(self.workers, int(reorder_window or self.workers * 4))
+        self.limiter = limiter
+
+        # 默认连接池只有 10 个连接，并发分片多于此数时会反复建连
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers * 2)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @classmethod
+    def from_config(cls, session: requests.Session, config: dict = None) -> 'HlsSegmentDownloader':
+        """从配置字典创建（download.v3 段：segment_workers / segment_retries；共享 download.bandwidth 限速）"""
+        v3_cfg = ((config or {}).get('download', {}) or {}).get('v3', {}) or {}
+        return cls(
+            session,
+            workers=v3_cfg.get('segment_workers', DEFAULT_SEGMENT_WORKERS),
+            retries=v3_cfg.get('segment_retries', DEFAULT_SEGMENT_RETRIES),
+            limiter=get_bandwidth_limiter(config),
+        )
+
+    def _fetch_segment(self, index: int, url: str, part_path: Path) -> Optional[Path]:
+        """下载一个分片到分片文件（失败重试，最终失败返回 None）"""
+        for attempt in range(self.retries + 1):
+            try:
+                with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                    response.raise_for_status()
+                    with open(part_path, 'wb') as f:
+                        for chunk in response.iter_content(CHUNK_SIZE):
+                            if chunk:
+                                f.write(chunk)
+                                if self.limiter is not None:
+                                    self.limiter.throttle(len(chunk), url)
+                return part_path
+            except Exception as e:
+                if attempt < self.retries:
+                    time.sleep(min(8.0, 0.5 * (2 ** attempt)))
+                    continue
+                logger.debug(f"片段 {index + 1} 失败（已重试{self.retries}次）: {str(e)[:60]}")
+        try:
+            part_path.unlink()
+        except OSError:
+            pass
+        return None
+
+    @staticmethod
+    def _load_manifest(manifest_path: Path, key: str, total: int, temp_file: Path) -> Dict:
+        """读取可用的续传清单（播放列表不一致或临时文件不完整时从头开始）"""
+        empty = {'playlist': key, 'total': total, 'written': 0, 'bytes': 0}
+        if not manifest_path.exists() or not temp_file.exists():
+            return empty
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except Exception:
+            return empty
+        if manifest.get('playlist') != key or manifest.get('total') != total:
+            return empty
+        if temp_file.stat().st_size < manifest.get('bytes', 0):
+            return empty
+        return manifest
+
+    @staticmethod
+    def _save_manifest(manifest_path: Path, manifest: Dict):
+        tmp_path = Path(str(manifest_path) + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+
+    def download(self, segment_urls: List[str], file_path: Path,
+                 progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
+        """
+        下载全部分片并按顺序合并为 file_path
+
+        Args:
+            segment_urls: 分片URL列表
+            file_path: 输出文件
+            progress_callback: 进度回调 (已写入分片数, 总数)
+
+        Returns:
+            是否成功
+        """
+        total = len(segment_urls)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = Path(str(file_path) + '.tmp')
+        manifest_path = Path(str(file_path) + '.tmp.json')
+        parts_dir = Path(str(file_path) + '.parts')
+        parts_dir.mkdir(exist_ok=True)
+
+        manifest = self._load_manifest(manifest_path, playlist_key(segment_urls), total, temp_file)
+        start = manifest['written']
+        if start:
+            logger.info(f"♻️ 从第 {start + 1}/{total} 个片段续传")
+
+        failed = set()
+        max_failed = total * self.max_failure_ratio
+        next_write = start
+        next_submit = start
+        completed: Dict[int, Optional[Path]] = {}
+        # 续传点：从头开始连续成功写入的位置（出现跳过的分片后不再前进）
+        resume_at = {'written': start, 'bytes': manifest['bytes']}
+        running = {}
+        report_every = max(1, total // 10)
+        last_saved = time.time()
+        aborted = False
+
+        with open(temp_file, 'r+b' if start else 'wb') as out, \
+                ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='hls') as executor:
+            out.seek(manifest['bytes'])
+            out.truncate()
+            try:
+                while next_write < total:
+                    # 提交新分片（不超过重排窗口，避免积压过多已下载但未写入的分片）
+                    while next_submit < total and len(running) < self.workers \
+                            and next_submit < next_write + self.reorder_window:
+                        part_path = parts_dir / f"{next_submit:06d}.ts"
+                        future = executor.submit(self._fetch_segment, next_submit, segment_urls[next_submit], part_path)
+                        running[future] = next_submit
+                        next_submit += 1
+
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        completed[running.pop(future)] = future.result()
+
+                    # 按顺序写入已完成的分片
+                    while next_write in completed:
+                        part_path = completed.pop(next_write)
+                        if part_path is None:
+                            failed.add(next_write)
+                        else:
+                            with open(part_path, 'rb') as part:
+                                shutil.copyfileobj(part, out, CHUNK_SIZE)
+                            part_path.unlink()
+                        next_write += 1
+                        if not failed:
+                            resume_at = {'written': next_write, 'bytes': out.tell()}
+                        if next_write % report_every == 0:
+                            logger.info(f"进度: {next_write / total * 100:.1f}% ({next_write}/{total})")
+                        if progress_callback:
+                            progress_callback(next_write, total)
+
+                    if len(failed) > max_failed:
+                        logger.error(f"❌ 片段下载失败率过高 ({len(failed)}/{total})")
+                        aborted = True
+                        break
+
+                    if time.time() - last_saved >= 2.0:
+                        out.flush()
+                        manifest.update(resume_at)
+                        self._save_manifest(manifest_path, manifest)
+                        last_saved = time.time()
+            finally:
+                out.flush()
+                manifest.update(resume_at)
+                self._save_manifest(manifest_path, manifest)
+
+        # 未写入的分片文件不参与续传（续传从清单记录的位置重新下载）
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        if aborted:
+            return False
+
+        if failed:
+            logger.warning(f"⚠️ {len(failed)} 个片段下载失败，已跳过")
+        os.replace(temp_file, file_path)
+        try:
+            manifest_path.unlink()
+        except OSError:
+            pass
+        return True
@@ -0,0 +1,152 @@
+"""
+按站点限速的请求调度器
+所有抓取线程共享同一个调度器，按站点（host）统一控制翻页请求速率，
+替代每个线程各自 time.sleep 的做法：工作线程数增加时，单站点请求速率保持不变。
+
+实现为带随机间隔的令牌桶（GCRA 形式）：每个站点维护下一个可用时间点，
+请求按到达顺序预约时间片，间隔取 delay_between_pages 的 [min, max] 随机值，
+burst 表示允许的突发请求数。
+
+配置（delay_between_pages 段）:
+    min / max: 同一站点相邻请求的最小/最大间隔（秒）
+    burst: 允许的突发请求数（默认 1，即严格按间隔）
+    hosts: 按站点覆盖 {host: {min, max, burst}}，host 按后缀匹配
+"""
+
+import time
+import random
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_DELAY = 1.5
+DEFAULT_MAX_DELAY = 2.5
+
+
+class HostRateScheduler:
+    """按站点限速的请求调度器（线程安全）"""
+
+    def __init__(self, min_delay: float = DEFAULT_MIN_DELAY, max_delay: float = DEFAULT_MAX_DELAY,
+                 burst: int = 1, host_overrides: Optional[Dict[str, dict]] = None):
+        """
+        初始化调度器
+
+        Args:
+            min_delay: 相邻请求最小间隔（秒）
+            max_delay: 相邻请求最大间隔（秒）
+            burst: 允许的突发请求数
+            host_overrides: 按站点覆盖的限速参数 {host: {min, max, burst}}
+        """
+        self.default_policy = self._make_policy(min_delay, max_delay, burst)
+        self.host_policies = {
+            self._normalize_host(host): self._make_policy(
+                policy.get('min', min_delay), policy.get('max', max_delay), policy.get('burst', burst)
+            )
+            for host, policy in (host_overrides or {}).items()
+        }
+
+        self._lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def from_config(cls, config: dict = None) -> 'HostRateScheduler':
+        """从配置字典创建调度器"""
+        delay_config = (config or {}).get('delay_between_pages', {}) or {}
+        return cls(
+            min_delay=delay_config.get('min', DEFAULT_MIN_DELAY),
+            max_delay=delay_config.get('max', DEFAULT_MAX_DELAY),
+            burst=delay_config.get('burst', 1),
+            host_overrides=delay_config.get('hosts') or {},
+        )
+
+    @staticmethod
+    def _make_policy(min_delay: float, max_delay: float, burst: int) -> Tuple[float, float, int]:
+        min_delay = max(0.0, float(min_delay))
+        max_delay = max(min_delay, float(max_delay))
+        return min_delay, max_delay, max(1, int(burst))
+
+    @staticmethod
+    def _normalize_host(host: str) -> str:
+        host = (host or '').lower().strip()
+        return host[4:] if host.startswith('www.') else host
+
+    def host_key(self, url: str) -> str:
+        """URL 对应的站点键（忽略 www. 前缀）"""
+        return self._normalize_host(urlparse(url).netloc)
+
+    def _policy_for(self, host: str) -> Tuple[float, float, int]:
+        for suffix, policy in self.host_policies.items():
+            if host == suffix or host.endswith('.' + suffix):
+                return policy
+        return self.default_policy
+
+    def reserve(self, url: str) -> float:
+        """
+        为一次请求预约时间片（不阻塞）
+
+        Args:
+            url: 请求URL
+
+        Returns:
+            需要等待的秒数
+        """
+        host = self.host_key(url)
+        min_delay, max_delay, burst = self._policy_for(host)
+        mean_interval = (min_delay + max_delay) / 2
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot.get(host, now), now)
+            # 突发容量：允许提前 (burst-1) 个平均间隔发出
+            wait = max(0.0, slot - (burst - 1) * mean_interval - now)
+            self._next_slot[host] = slot + random.uniform(min_delay, max_delay)
+
+            stats = self._stats.setdefault(host, {'requests': 0, 'waited': 0.0})
+            stats['requests'] += 1
+            stats['waited'] += wait
+        return wait
+
+    def wait(self, url: str) -> float:
+        """
+        阻塞直到该站点允许发出下一个请求
+
+        Args:
+            url: 请求URL
+
+        Returns:
+            实际等待的秒数
+        """
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """各站点的请求数与累计等待时间"""
+        with self._lock:
+            return {host: dict(stats) for host, stats in self._stats.items()}
+
+
+_scheduler: Optional[HostRateScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def configure_host_scheduler(config: dict = None) -> HostRateScheduler:
+    """按配置重建全局调度器（每次任务开始时调用）"""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = HostRateScheduler.from_config(config)
+        return _scheduler
+
+
+def get_host_scheduler(config: dict = None) -> HostRateScheduler:
+    """获取全局调度器，尚未创建时按传入配置创建"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = HostRateScheduler.from_config(config)
+        return _scheduler
@@ -0,0 +1,130 @@
+"""
+HTML 解析后端模块 - 列表页解析的统一入口
+优先使用 lxml 构建解析树（比 html.parser 快数倍），纯文本提取可走 selectolax，
+依赖不可用时自动回退到 html.parser
+"""
+
+import logging
+from functools import lru_cache
+from typing import List, Optional
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401  仅用于探测是否可用
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    try:
+        # 旧版 selectolax 只提供 Modest 引擎
+        from selectolax.parser import HTMLParser as SelectolaxParser
+        SELECTOLAX_AVAILABLE = True
+    except ImportError:
+        SelectolaxParser = None
+        SELECTOLAX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 可选后端（按优先级）；selectolax 只用于纯文本提取，构建解析树时跳过
+PARSER_BACKENDS = ('selectolax', 'lxml', 'html.parser')
+
+_warned_backends = set()
+
+
+def available_backends() -> List[str]:
+    """返回当前环境可用的解析后端（按优先级）"""
+    available = []
+    if SELECTOLAX_AVAILABLE:
+        available.append('selectolax')
+    if LXML_AVAILABLE:
+        available.append('lxml')
+    available.append('html.parser')
+    return available
+
+
+def resolve_backend(config: dict = None, tree: bool = True) -> str:
+    """
+    根据配置确定解析后端
+
+    Args:
+        config: 配置字典（读取 html_parser.backend，默认 auto）
+        tree: 是否需要 BeautifulSoup 解析树（True 时不会返回 selectolax）
+
+    Returns:
+        后端名称
+    """
+    wanted = (config or {}).get('html_parser', {}).get('backend', 'auto')
+    candidates = [b for b in available_backends() if not (tree and b == 'selectolax')]
+
+    if wanted in (None, '', 'auto'):
+        return candidates[0]
+    if wanted in candidates:
+        return wanted
+    if wanted == 'selectolax' and tree:
+        # selectolax 不提供 BeautifulSoup 解析树，退到下一个最快的后端
+        return candidates[0]
+
+    if wanted not in _warned_backends:
+        _warned_backends.add(wanted)
+        logger.warning(f"HTML 解析后端 {wanted} 不可用，回退到 {candidates[0]}")
+    return candidates[0]
+
+
+def make_soup(markup, config: dict = None, backend: Optional[str] = None) -> BeautifulSoup:
+    """
+    构建 BeautifulSoup 解析树（替代 BeautifulSoup(markup, 'html.parser')）
+
+    Args:
+        markup: HTML 文本
+        config: 配置字典
+        backend: 显式指定后端（优先于配置）
+
+    Returns:
+        BeautifulSoup 实例
+    """
+    if backend is None or backend == 'selectolax' or backend not in available_backends():
+        backend = resolve_backend(config, tree=True)
+    return BeautifulSoup(markup, backend)
+
+
+@lru_cache(maxsize=128)
+def compile_selector(css: str) -> soupsieve.SoupSieve:
+    """
+    预编译 CSS 选择器（模块级常量使用，避免每页重复解析选择器）
+
+    用法: SELECTOR.select(soup) / SELECTOR.select_one(tag) / SELECTOR.match(tag)
+    """
+    return soupsieve.compile(css)
+
+
+def select_texts(markup, css: str, config: dict = None, min_length: int = 0) -> List[str]:
+    """
+    单次解析提取匹配元素的文本（无需遍历父节点时使用）
+
+    selectolax 可用时直接用其 CSS 引擎，否则回退到 BeautifulSoup。
+
+    Args:
+        markup: HTML 文本
+        css: CSS 选择器
+        config: 配置字典
+        min_length: 文本最小长度（不超过该长度的文本会被丢弃）
+
+    Returns:
+        文本列表（保持文档顺序）
+    """
+    backend = resolve_backend(config, tree=False)
+
+    if backend == 'selectolax':
+        nodes = SelectolaxParser(markup).css(css)
+        texts = (node.text(deep=True, separator='', strip=True) for node in nodes)
+    else:
+        soup = make_soup(markup, config, backend)
+        texts = (elem.get_text(strip=True) for elem in compile_selector(css).select(soup))
+
+    return [t for t in texts if t and len(t) > min_length]
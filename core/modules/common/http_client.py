@@ -0,0 +1,207 @@
+"""
+共享 HTTP 客户端 - 列表页抓取、远端探测与链接校验的统一出口
+支持把响应录制到本地 fixture 目录，之后离线回放（用于基准测试与正确性回归，不访问真实站点）。
+
+模式（http_replay 段，环境变量 SCRAPER_HTTP_MODE / SCRAPER_FIXTURES_DIR 优先）:
+    off:    直接请求（默认）
+    record: 正常请求，并把 GET 响应保存到 fixtures_dir
+    replay: 只从 fixtures_dir 读取；未录制的URL返回 404（翻页自然结束），
+            带 If-None-Match / If-Modified-Since 且与录制内容一致时返回 304
+
+fixture 目录结构:
+    index.json      {key: {url, status, content_type, etag, last_modified, file, recorded_at}}
+    <key>.html      响应正文
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import urldefrag
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+HTTP_MODES = ('off', 'record', 'replay')
+DEFAULT_FIXTURES_DIR = 'fixtures/http'
+
+
+class FixtureStore:
+    """录制响应的本地存储（线程安全）"""
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, fixtures_dir: str = DEFAULT_FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self.index_path = os.path.join(fixtures_dir, self.INDEX_FILE)
+        self._lock = threading.Lock()
+        self._index: Dict[str, dict] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'recorded': 0}
+
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except Exception as e:
+                logger.warning(f"fixture 索引读取失败，将重新录制: {self.index_path} ({e})")
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        """URL 对应的 fixture 键（忽略片段）"""
+        return hashlib.sha1(urldefrag(url)[0].encode('utf-8')).hexdigest()[:20]
+
+    def urls(self):
+        """已录制的URL列表"""
+        with self._lock:
+            return [entry['url'] for entry in self._index.values()]
+
+    def lookup(self, url: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._index.get(self.key_for(url))
+            return dict(entry) if entry else None
+
+    def read_body(self, entry: dict) -> bytes:
+        with open(os.path.join(self.fixtures_dir, entry['file']), 'rb') as f:
+            return f.read()
+
+    def record(self, url: str, status: int, headers, body: bytes):
+        """保存一次响应（无 ETag 时按内容生成弱 ETag，回放时可用于 304）"""
+        key = self.key_for(url)
+        headers = headers or {}
+        entry = {
+            'url': url,
+            'status': int(status),
+            'content_type': headers.get('Content-Type', 'text/html; charset=utf-8'),
+            'etag': headers.get('ETag') or f'W/"{hashlib.sha1(body).hexdigest()}"',
+            'last_modified': headers.get('Last-Modified', ''),
+            'file': f'{key}.html',
+            'recorded_at': datetime.now().isoformat(),
+        }
+
+        with self._lock:
+            os.makedirs(self.fixtures_dir, exist_ok=True)
+            with open(os.path.join(self.fixtures_dir, entry['file']), 'wb') as f:
+                f.write(body)
+            self._index[key] = entry
+            tmp_path = self.index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._index, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.index_path)
+            self.stats['recorded'] += 1
+
+    def replay(self, method: str, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        用录制内容构造响应
+
+        Args:
+            method: 请求方法（HEAD 不返回正文）
+            url: 请求URL
+            headers: 请求头（用于条件请求）
+
+        Returns:
+            requests.Response
+        """
+        entry = self.lookup(url)
+        resp = requests.Response()
+        resp.url = url
+        resp.encoding = 'utf-8'
+        resp.headers = CaseInsensitiveDict()
+
+        if entry is None:
+            with self._lock:
+                self.stats['misses'] += 1
+            resp.status_code, resp.reason, resp._content = 404, 'Not Recorded', b''
+            return resp
+
+        resp.headers['Content-Type'] = entry.get('content_type', 'text/html; charset=utf-8')
+        resp.headers['ETag'] = entry.get('etag', '')
+        if entry.get('last_modified'):
+            resp.headers['Last-Modified'] = entry['last_modified']
+
+        request_headers = CaseInsensitiveDict(headers or {})
+        if_none_match = request_headers.get('If-None-Match')
+        if_modified_since = request_headers.get('If-Modified-Since')
+        if (if_none_match and if_none_match == entry.get('etag')) or \
+                (if_modified_since and if_modified_since == entry.get('last_modified')):
+            with self._lock:
+                self.stats['not_modified'] += 1
+            resp.status_code, resp.reason, resp._content = 304, 'Not Modified', b''
+            return resp
+
+        with self._lock:
+            self.stats['hits'] += 1
+        resp.status_code, resp.reason = entry.get('status', 200), 'OK'
+        resp._content = b'' if method.upper() == 'HEAD' else self.read_body(entry)
+        return resp
+
+
+_mode = 'off'
+_store: Optional[FixtureStore] = None
+_config_lock = threading.Lock()
+
+
+def configure_http_client(config: dict = None) -> str:
+    """
+    按配置设置录制/回放模式（每次任务开始时调用）
+
+    Returns:
+        生效的模式
+    """
+    global _mode, _store
+    replay_cfg = (config or {}).get('http_replay', {}) or {}
+    mode = os.environ.get('SCRAPER_HTTP_MODE') or replay_cfg.get('mode', 'off') or 'off'
+    fixtures_dir = os.environ.get('SCRAPER_FIXTURES_DIR') or replay_cfg.get('fixtures_dir', DEFAULT_FIXTURES_DIR)
+
+    if mode not in HTTP_MODES:
+        logger.warning(f"未知的 HTTP 模式 {mode}，按 off 处理")
+        mode = 'off'
+
+    with _config_lock:
+        _mode = mode
+        if mode == 'off':
+            _store = None
+        elif _store is None or _store.fixtures_dir != fixtures_dir:
+            _store = FixtureStore(fixtures_dir)
+    if mode != 'off':
+        logger.info(f"HTTP {mode} 模式，fixture 目录: {fixtures_dir}")
+    return mode
+
+
+def get_http_mode() -> str:
+    return _mode
+
+
+def get_fixture_store() -> Optional[FixtureStore]:
+    """当前的 fixture 存储（off 模式下为 None）"""
+    return _store
+
+
+def http_request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    发送请求（参数同 requests.request），按当前模式直连、录制或回放
+
+    回放模式下不访问网络，网络相关参数（timeout/proxies/verify）被忽略。
+    """
+    store = _store
+    if _mode == 'replay' and store is not None:
+        return store.replay(method, url, kwargs.get('headers'))
+
+    resp = requests.request(method, url, **kwargs)
+    if _mode == 'record' and store is not None and method.upper() == 'GET':
+        store.record(url, resp.status_code, resp.headers, resp.content)
+    return resp
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """GET 请求（替代 requests.get）"""
+    return http_request('GET', url, **kwargs)
+
+
+def http_head(url: str, **kwargs) -> requests.Response:
+    """HEAD 请求（替代 requests.head）"""
+    return http_request('HEAD', url, **kwargs)
@@ -0,0 +1,189 @@
+"""
+启动导入耗时基准（python -X importtime 汇总）
+在子进程中冷启动导入指定入口模块，统计总耗时、耗时最多的模块，
+并检查 selenium / aiohttp / pandas / yt-dlp 等重量级依赖是否被加载。
+
+场景:
+    core - import core.core（命令行查重入口，requests 模式不应加载 selenium/aiohttp）
+    gui  - import gui.gui（GUI 冷启动，不应加载 pandas/下载器）
+
+用法:
+    python -m core.modules.common.import_benchmark --repeat 5
+    python -m core.modules.common.import_benchmark --json docs/import_time_baseline.json
+    python -m core.modules.common.import_benchmark --baseline docs/import_time_baseline.json
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+SCENARIOS = {
+    'core': 'core.core',
+    'gui': 'gui.gui',
+}
+
+# 启动路径上不应出现的重量级依赖（按需导入）
+HEAVY_MODULES = ('selenium', 'aiohttp', 'aiofiles', 'pandas', 'yt_dlp', 'psutil',
+                 'core.modules.common.async_downloader', 'core.modules.common.enhanced_proxy_checker',
+                 'core.modules.common.chrome_driver_manager', 'core.modules.porn.downloader')
+
+_LINE_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """解析 -X importtime 输出为 [{'module', 'self_us', 'cumulative_us', 'depth'}, ...]"""
+    entries = []
+    for line in stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            entries.append({
+                'module': m.group(4),
+                'self_us': int(m.group(1)),
+                'cumulative_us': int(m.group(2)),
+                'depth': len(m.group(3)) // 2,
+            })
+    return entries
+
+
+def measure_import(module: Optional[str], python: str = sys.executable) -> Dict[str, Any]:
+    """在新进程中导入模块一次，返回解析后的导入记录（module 为 None 时只启动解释器）"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    proc = subprocess.run(
+        [python, '-X', 'importtime', '-c', f'import {module}' if module else 'pass'],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, encoding='utf-8', errors='replace'
+    )
+    entries = parse_importtime(proc.stderr)
+    error = ''
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f'exit {proc.returncode}'
+    return {'entries': entries, 'error': error}
+
+
+def interpreter_modules() -> set:
+    """解释器启动时（site 等）已加载的模块，不计入场景"""
+    return {e['module'] for e in measure_import(None)['entries']}
+
+
+def benchmark_scenario(name: str, module: str, repeat: int = 5, top: int = 15,
+                       startup: Optional[set] = None) -> Dict[str, Any]:
+    """
+    多次冷启动导入，取总耗时最小的一次作为结果（排除磁盘缓存等噪声）
+
+    Returns:
+        {'scenario', 'module', 'total_ms', 'modules', 'top_cumulative', 'top_self', 'heavy_loaded', 'error'}
+    """
+    best = None
+    totals = []
+    for _ in range(max(1, repeat)):
+        run = measure_import(module)
+        total = next((e['cumulative_us'] for e in run['entries'] if e['module'] == module), 0)
+        totals.append(total)
+        if best is None or (total and total < best[0]):
+            best = (total, run)
+
+    total_us, run = best
+    entries = run['entries']
+    loaded = {e['module'] for e in entries}
+    startup = startup or set()
+    project = [e for e in entries if e['module'] != module and e['module'] not in startup]
+    return {
+        'scenario': name,
+        'module': module,
+        'total_ms': round(total_us / 1000, 1),
+        'runs_ms': [round(t / 1000, 1) for t in totals],
+        'modules': len(project) + 1,
+        'top_cumulative': [
+            {'module': e['module'], 'ms': round(e['cumulative_us'] / 1000, 1)}
+            for e in sorted((e for e in project if e['depth'] <= 2), key=lambda e: -e['cumulative_us'])[:top]
+        ],
+        'top_self': [
+            {'module': e['module'], 'ms': round(e['self_us'] / 1000, 1)}
+            for e in sorted(project, key=lambda e: -e['self_us'])[:top]
+        ],
+        'heavy_loaded': sorted(h for h in HEAVY_MODULES if h in loaded),
+        'error': run['error'],
+    }
+
+
+def run_import_benchmark(scenarios: List[str], repeat: int = 5, top: int = 15) -> Dict[str, Any]:
+    """运行所有场景"""
+    startup = interpreter_modules()
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': [benchmark_scenario(name, SCENARIOS[name], repeat, top, startup) for name in scenarios],
+    }
+
+
+def print_import_benchmark_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    """打印导入耗时报告（提供基线时显示变化）"""
+    base = {r['scenario']: r for r in (baseline or {}).get('results', [])}
+    print("=" * 72)
+    print(f"启动导入耗时（-X importtime，{report['repeat']} 次取最小）  Python {report['python']}")
+    print("=" * 72)
+
+    for r in report['results']:
+        line = f"\n[{r['scenario']}] import {r['module']}: {r['total_ms']:.1f} ms, {r['modules']} 个模块"
+        if r['scenario'] in base:
+            old = base[r['scenario']]
+            delta = r['total_ms'] - old['total_ms']
+            line += f"（基线 {old['total_ms']:.1f} ms, {'+' if delta >= 0 else ''}{delta:.1f} ms）"
+        print(line)
+        if r['error']:
+            print(f"  ⚠️ 导入失败: {r['error']}")
+
+        heavy = r['heavy_loaded']
+        print(f"  重量级依赖: {', '.join(heavy) if heavy else '无'}")
+        if r['scenario'] in base:
+            added = sorted(set(heavy) - set(base[r['scenario']]['heavy_loaded']))
+            if added:
+                print(f"  ❌ 相比基线新增: {', '.join(added)}")
+
+        print(f"  {'累计耗时最多的模块':<40}{'ms':>10}")
+        for item in r['top_cumulative'][:10]:
+            print(f"  {item['module']:<40}{item['ms']:>10.1f}")
+    print()
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='启动导入耗时基准（-X importtime 汇总）')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='逗号分隔的场景: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--repeat', type=int, default=5, help='每个场景冷启动次数')
+    parser.add_argument('--top', type=int, default=15, help='记录耗时最多的模块数')
+    parser.add_argument('--baseline', help='与基线JSON对比')
+    parser.add_argument('--json', dest='json_path', help='将结果写入JSON文件')
+    args = parser.parse_args(argv)
+
+    scenarios = [s for s in args.scenarios.split(',') if s in SCENARIOS]
+    if not scenarios:
+        print(f"未知场景: {args.scenarios}")
+        sys.exit(1)
+
+    report = run_import_benchmark(scenarios, args.repeat, args.top)
+
+    baseline = None
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_import_benchmark_report(report, baseline)
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
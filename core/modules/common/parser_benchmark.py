@@ -0,0 +1,198 @@
+"""
+HTML 解析后端基准测试
+在保存下来的列表页上比较 html.parser / lxml / selectolax 的单页解析耗时
+
+两类场景：
+1. listing - 构建解析树 + 抓取器的提取路径（容器选择、标题查找、find_parent 回溯）
+2. probe   - 远端轻量探测的纯标题文本提取（select_texts）
+
+用法:
+    python -m core.modules.common.parser_benchmark --pages-dir saved_pages --repeat 5
+    python -m core.modules.common.parser_benchmark --synthetic 10 --videos 60 --json parser_bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .html_parser import available_backends, compile_selector, make_soup, select_texts
+
+PROBE_SELECTOR = 'a.thumbnailTitle, a.title, .video-title, h3.title'
+
+_CONTAINER_SELECTOR = compile_selector('div.videoContainer, div.video, div.videoBrick, .nf-video-item')
+_CONTAINER_TITLE_SELECTOR = compile_selector('a.title, span.title, a.nf-video-hover-title, .videoTitle')
+_THUMBNAIL_TITLE_SELECTOR = compile_selector('a.thumbnailTitle')
+
+
+def load_listing_pages(pages_dir: str) -> List[Tuple[str, str]]:
+    """读取目录下保存的列表页（*.html / *.htm）"""
+    pages = []
+    for path in sorted(Path(pages_dir).glob('*.htm*')):
+        pages.append((path.name, path.read_text(encoding='utf-8', errors='replace')))
+    return pages
+
+
+def generate_listing_page(videos: int = 60, seed: int = 0, model_slug: str = 'sample-model') -> str:
+    """生成结构接近真实模特列表页的合成页面（含推荐区块等干扰内容）"""
+    rng = random.Random(seed)
+    words = ['hot', 'night', 'session', 'amateur', 'teaser', 'full', 'scene', 'private', 'live', 'best']
+
+    def _title() -> str:
+        return ' '.join(rng.choice(words) for _ in range(rng.randint(3, 8))).title()
+
+    def _item(slug: str) -> str:
+        key = ''.join(rng.choice('0123456789abcdef') for _ in range(13))
+        return (
+            f'<li class="pcVideoListItem"><div class="videoBrick videoContainer">'
+            f'<div class="phimage"><a href="/view_video.php?viewkey={key}"><img src="/t/{key}.jpg" alt=""></a></div>'
+            f'<div class="thumbnailInfo"><span class="title">'
+            f'<a class="thumbnailTitle" href="/view_video.php?viewkey={key}">{_title()}</a></span>'
+            f'<div class="usernameWrap"><a href="/model/{slug}">{slug}</a></div>'
+            f'<var class="duration">{rng.randint(1, 59)}:{rng.randint(10, 59)}</var></div></div></li>'
+        )
+
+    own = ''.join(_item(model_slug) for _ in range(videos))
+    related = ''.join(_item(f'other-{i}') for i in range(videos // 3))
+    filler = ''.join(f'<script>var x{i} = {{"k": {i}}};</script><div class="ad"><p>{_title()}</p></div>'
+                     for i in range(40))
+    return (
+        '<!DOCTYPE html><html><head><title>listing</title></head><body>'
+        f'<nav class="pagination"><a href="?page=2">2</a><a class="next" href="?page=2">Next</a></nav>'
+        f'<ul class="videos row-5-thumbs">{own}</ul>'
+        f'<div class="recommended"><ul>{related}</ul></div>{filler}'
+        '</body></html>'
+    )
+
+
+def _exercise_listing(soup) -> int:
+    """按抓取器的访问模式遍历一页，返回提取到的条目数"""
+    count = 0
+    for container in _CONTAINER_SELECTOR.select(soup):
+        model_links = [a.get('href', '') for a in container.find_all('a', href=True) if '/model/' in a.get('href', '')]
+        title_elem = _CONTAINER_TITLE_SELECTOR.select_one(container)
+        if title_elem and model_links and title_elem.get_text(strip=True):
+            count += 1
+    for elem in _THUMBNAIL_TITLE_SELECTOR.select(soup):
+        if elem.find_parent('div', class_=['videoContainer', 'video', 'videoBrick']) is not None:
+            count += 1
+    soup.select('a.next, a[rel="next"], li.next a, .pagination_next, .orangeButton')
+    return count
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    n = len(ordered)
+    return {
+        'mean_ms': round(sum(ordered) / n * 1000, 3) if n else 0.0,
+        'p50_ms': round(ordered[n // 2] * 1000, 3) if n else 0.0,
+        'p95_ms': round(ordered[min(n - 1, int(n * 0.95))] * 1000, 3) if n else 0.0,
+    }
+
+
+def benchmark_backend(backend: str, pages: List[Tuple[str, str]], repeat: int = 3) -> Dict[str, Any]:
+    """
+    测试单个后端的单页解析耗时
+
+    Args:
+        backend: 后端名称
+        pages: [(名称, HTML), ...]
+        repeat: 每页重复次数
+
+    Returns:
+        {'backend', 'listing': {...} 或 None, 'probe': {...}}
+    """
+    config = {'html_parser': {'backend': backend}}
+    result: Dict[str, Any] = {'backend': backend, 'listing': None, 'probe': None}
+
+    if backend != 'selectolax':
+        samples, entries = [], 0
+        for _ in range(repeat):
+            for _, html in pages:
+                start = time.perf_counter()
+                entries = _exercise_listing(make_soup(html, backend=backend))
+                samples.append(time.perf_counter() - start)
+        result['listing'] = dict(_summarize(samples), entries_last_page=entries)
+
+    samples, titles = [], 0
+    for _ in range(repeat):
+        for _, html in pages:
+            start = time.perf_counter()
+            titles = len(select_texts(html, PROBE_SELECTOR, config, min_length=3))
+            samples.append(time.perf_counter() - start)
+    result['probe'] = dict(_summarize(samples), titles_last_page=titles)
+    return result
+
+
+def run_parser_benchmark(pages: List[Tuple[str, str]], backends: Optional[List[str]] = None,
+                         repeat: int = 3) -> Dict[str, Any]:
+    """对所有可用后端运行基准测试"""
+    backends = [b for b in (backends or available_backends()) if b in available_backends()]
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pages': len(pages),
+        'page_bytes': sum(len(html) for _, html in pages),
+        'repeat': repeat,
+        'results': [benchmark_backend(b, pages, repeat) for b in backends],
+    }
+
+
+def print_parser_benchmark_report(report: Dict[str, Any]):
+    """打印解析后端基准报告"""
+    print("=" * 72)
+    print(f"HTML 解析后端基准: {report['pages']} 页, 共 {report['page_bytes'] / 1024:.0f} KB, 每页重复 {report['repeat']} 次")
+    print("=" * 72)
+
+    for scenario, label in (('listing', '列表页提取（解析树 + 选择器 + 父节点回溯）'), ('probe', '轻量探测（纯标题文本）')):
+        rows = [r for r in report['results'] if r.get(scenario)]
+        if not rows:
+            continue
+        baseline = next((r[scenario]['mean_ms'] for r in rows if r['backend'] == 'html.parser'), None)
+        print(f"\n{label}")
+        print(f"{'后端':<14}{'平均(ms/页)':>12}{'p50':>10}{'p95':>10}{'加速比':>10}")
+        for r in rows:
+            stats = r[scenario]
+            speedup = f"{baseline / stats['mean_ms']:.1f}x" if baseline and stats['mean_ms'] else '-'
+            print(f"{r['backend']:<14}{stats['mean_ms']:>12.2f}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{speedup:>10}")
+    print()
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='HTML 解析后端基准测试')
+    parser.add_argument('--pages-dir', help='保存的列表页目录（*.html）')
+    parser.add_argument('--synthetic', type=int, default=0, help='生成的合成列表页数量（未指定目录时默认 5）')
+    parser.add_argument('--videos', type=int, default=60, help='合成页面每页视频数')
+    parser.add_argument('--repeat', type=int, default=3, help='每页重复次数')
+    parser.add_argument('--backends', help='逗号分隔的后端列表（默认全部可用后端）')
+    parser.add_argument('--json', dest='json_path', help='将结果写入JSON文件')
+    args = parser.parse_args(argv)
+
+    pages = load_listing_pages(args.pages_dir) if args.pages_dir else []
+    synthetic = args.synthetic or (0 if pages else 5)
+    pages += [(f'synthetic_{i}.html', generate_listing_page(args.videos, seed=i)) for i in range(synthetic)]
+    if not pages:
+        print(f"未找到列表页: {args.pages_dir}")
+        sys.exit(1)
+
+    backends = args.backends.split(',') if args.backends else None
+    report = run_parser_benchmark(pages, backends, args.repeat)
+    print_parser_benchmark_report(report)
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+启动预检结果缓存
+配置验证、ChromeDriver 检查与代理全面检测在每次 main() 都会执行，耗时从数秒到数分钟。
+预检通过后按「指纹」记录结果，有效期内且指纹未变化时直接跳过：
+
+    config:       config.yaml 内容哈希 + 验证器源码修改时间
+    chromedriver: Chrome 可执行文件路径/修改时间 + ChromeDriver 修改时间
+    proxy:        代理配置哈希
+
+只缓存通过的结果，失败的检查下次仍会完整执行。
+
+配置（preflight 段）:
+    cache_enabled: 是否启用（默认 true）
+    cache_ttl_minutes: 有效期（分钟，默认 60）
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_MINUTES = 60
+PREFLIGHT_CACHE_FILE = 'preflight_cache.json'
+
+
+def _file_stamp(path: Optional[str]) -> str:
+    """文件路径 + 修改时间 + 大小（不存在时为空串）"""
+    if not path or not os.path.exists(path):
+        return ''
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+
+
+def _digest(payload: str) -> str:
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def config_fingerprint(config_path: str = "config.yaml") -> str:
+    """配置文件指纹（内容变化或验证规则更新时失效）"""
+    from . import config_validator
+    try:
+        with open(config_path, 'rb') as f:
+            content_hash = hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        content_hash = ''
+    return _digest(f"{content_hash}|{_file_stamp(config_validator.__file__)}")
+
+
+def chromedriver_fingerprint(driver_dir: str = "drivers") -> str:
+    """Chrome 与 ChromeDriver 指纹（Chrome 自动更新或驱动被替换时失效）"""
+    from .chrome_driver_manager import ChromeVersionDetector, ChromeDriverManager
+    chrome_path = ChromeVersionDetector.find_chrome_binary()
+    driver_path = str(ChromeDriverManager(driver_dir).get_driver_path())
+    return _digest(f"{_file_stamp(chrome_path)}|{_file_stamp(driver_path)}")
+
+
+def proxy_fingerprint(proxy_config: dict) -> str:
+    """代理配置指纹"""
+    return _digest(json.dumps(proxy_config or {}, sort_keys=True, ensure_ascii=False, default=str))
+
+
+class PreflightCache:
+    """启动预检结果缓存（JSON 文件）"""
+
+    def __init__(self, cache_path: str, ttl_minutes: float = DEFAULT_TTL_MINUTES, enabled: bool = True):
+        """
+        初始化预检缓存
+
+        Args:
+            cache_path: 缓存文件路径
+            ttl_minutes: 有效期（分钟）
+            enabled: 是否启用
+        """
+        self.cache_path = cache_path
+        self.ttl_seconds = max(0.0, float(ttl_minutes)) * 60
+        self.enabled = enabled and self.ttl_seconds > 0
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, Any]] = self._load() if self.enabled else {}
+
+    @classmethod
+    def from_config(cls, config: dict = None) -> 'PreflightCache':
+        """从配置字典创建（缓存文件放在 output_dir 下）"""
+        config = config or {}
+        preflight_cfg = config.get('preflight', {}) or {}
+        return cls(
+            os.path.join(config.get('output_dir', 'output'), PREFLIGHT_CACHE_FILE),
+            ttl_minutes=preflight_cfg.get('cache_ttl_minutes', DEFAULT_TTL_MINUTES),
+            enabled=preflight_cfg.get('cache_enabled', True),
+        )
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.debug(f"预检缓存读取失败，忽略: {e}")
+            return {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.debug(f"预检缓存保存失败: {e}")
+
+    def get(self, check: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        读取有效的预检结果
+
+        Args:
+            check: 检查项名称（config / chromedriver / proxy）
+            fingerprint: 当前指纹
+
+        Returns:
+            记录的结果（含 age_minutes），过期、指纹不符或未启用时返回 None
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._data.get(check)
+        if not entry or entry.get('fingerprint') != fingerprint:
+            return None
+        age = time.time() - entry.get('checked_at', 0)
+        if age < 0 or age > self.ttl_seconds:
+            return None
+        return dict(entry.get('result') or {}, age_minutes=round(age / 60, 1))
+
+    def put(self, check: str, fingerprint: str, result: Optional[Dict[str, Any]] = None):
+        """记录一次通过的预检结果"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[check] = {
+                'fingerprint': fingerprint,
+                'checked_at': time.time(),
+                'result': result or {},
+            }
+            self._save()
+
+    def invalidate(self, check: Optional[str] = None):
+        """清除某项（或全部）预检结果"""
+        with self._lock:
+            if check is None:
+                self._data.clear()
+            else:
+                self._data.pop(check, None)
+            if self.enabled:
+                self._save()
@@ -0,0 +1,319 @@
+"""
+抓取器离线基准测试
+基于录制的列表页（http_client 的 fixture 目录）回放运行 requests 抓取器，不访问真实站点
+
+两类场景：
+1. fetch - fetch_with_requests_only_porn / fetch_with_requests_only_javdb 整体翻页抓取
+2. e2e   - ModelProcessor.process_single_model 端到端（首次为完整抓取，之后走查重缓存快速路径）
+
+报告 pages/s、解析耗时（make_soup）、提取耗时（extract_*_listing_page）与内存分配（tracemalloc 峰值/净分配）。
+
+用法:
+    # 录制（访问真实站点，按 delay_between_pages 限速）
+    python -m core.modules.common.scraper_benchmark --record --fixtures fixtures/http --model NAME=URL
+    # 回放
+    python -m core.modules.common.scraper_benchmark --fixtures fixtures/http --repeat 3 --e2e --json scraper_bench.json
+"""
+
+import os
+import sys
+import copy
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+import yaml
+
+from .host_scheduler import configure_host_scheduler
+from .http_client import configure_http_client, get_fixture_store
+
+# 站点 -> (模块, 抓取函数, 提取函数, 模块类型)
+SITE_FETCHERS = {
+    'PORN': ('core.modules.porn.porn', 'fetch_with_requests_only_porn', 'extract_porn_listing_page', 1),
+    'JAVDB': ('core.modules.javdb.javdb', 'fetch_with_requests_only_javdb', 'extract_javdb_listing_page', 2),
+}
+
+
+def detect_site(url: str) -> str:
+    """按URL判断站点"""
+    return 'JAVDB' if 'javdb' in urlparse(url).netloc.lower() else 'PORN'
+
+
+def discover_models(store) -> Dict[str, str]:
+    """从已录制的URL中找出模特首页（不带 page= 参数），模特名取路径最后一段"""
+    models = {}
+    for url in sorted(store.urls()):
+        parsed = urlparse(url)
+        if 'page=' in parsed.query:
+            continue
+        name = unquote(parsed.path.rstrip('/').rsplit('/', 1)[-1]) or parsed.netloc
+        models.setdefault(name, url)
+    return models
+
+
+def _load_site_module(site: str):
+    import importlib
+    module_name, fetch_name, extract_name, module_type = SITE_FETCHERS[site]
+    module = importlib.import_module(module_name)
+    return module, getattr(module, fetch_name), extract_name, module_type
+
+
+@contextmanager
+def _instrument(module, names: List[str], timings: Dict[str, List[float]]):
+    """临时包装站点模块中的函数，累计调用次数与耗时"""
+    originals = {name: getattr(module, name) for name in names}
+
+    def _wrap(name, func):
+        def _timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                slot = timings.setdefault(name, [0, 0.0])
+                slot[0] += 1
+                slot[1] += time.perf_counter() - start
+        return _timed
+
+    for name, func in originals.items():
+        setattr(module, name, _wrap(name, func))
+    try:
+        yield timings
+    finally:
+        for name, func in originals.items():
+            setattr(module, name, func)
+
+
+def _served_pages(store) -> int:
+    stats = store.stats
+    return stats['hits'] + stats['misses'] + stats['not_modified']
+
+
+def _run_fetch_pass(models: Dict[str, str], config: dict, log: logging.Logger,
+                    timings: Optional[Dict[str, List[float]]] = None) -> Tuple[int, int]:
+    """对所有模特跑一轮抓取，返回 (标题总数, 页面数)"""
+    store = get_fixture_store()
+    pages_before = _served_pages(store)
+    total_titles = 0
+    for model_name, url in models.items():
+        module, fetch, extract_name, _ = _load_site_module(detect_site(url))
+        if timings is None:
+            titles, _ = fetch(url, log, -1, config, None, model_name)
+        else:
+            with _instrument(module, ['make_soup', extract_name], timings):
+                titles, _ = fetch(url, log, -1, config, None, model_name)
+        total_titles += len(titles)
+    return total_titles, _served_pages(store) - pages_before
+
+
+def benchmark_fetch(models: Dict[str, str], config: dict, repeat: int, log: logging.Logger) -> Dict[str, Any]:
+    """
+    回放运行 requests 抓取器
+
+    Returns:
+        {'titles', 'pages', 'wall_s', 'pages_per_s', 'parse_ms_per_page', 'extract_ms_per_page', 'alloc': {...}}
+    """
+    timings: Dict[str, List[float]] = {}
+    titles = pages = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        titles, run_pages = _run_fetch_pass(models, config, log, timings)
+        pages += run_pages
+    wall = time.perf_counter() - start
+
+    def _per_page(name_prefix: str) -> float:
+        calls, seconds = 0, 0.0
+        for name, (n, s) in timings.items():
+            if name.startswith(name_prefix):
+                calls, seconds = calls + n, seconds + s
+        return round(seconds / calls * 1000, 3) if calls else 0.0
+
+    # 内存分配单独跑一轮（tracemalloc 会拖慢计时）
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    _run_fetch_pass(models, config, log)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    diff = after.compare_to(before, 'filename')
+
+    return {
+        'titles': titles,
+        'pages': pages,
+        'wall_s': round(wall, 3),
+        'pages_per_s': round(pages / wall, 1) if wall else 0.0,
+        'parse_ms_per_page': _per_page('make_soup'),
+        'extract_ms_per_page': _per_page('extract_'),
+        'alloc': {
+            'peak_kb': round(peak / 1024, 1),
+            'net_kb': round(sum(d.size_diff for d in diff) / 1024, 1),
+            'net_blocks': sum(d.count_diff for d in diff),
+        },
+    }
+
+
+def benchmark_end_to_end(models: Dict[str, str], config: dict, repeat: int, log: logging.Logger) -> Dict[str, Any]:
+    """
+    在临时工作目录中端到端运行 process_single_model
+
+    第一轮为完整抓取（cold），之后各轮命中查重缓存（warm，只做远端探测）。
+    """
+    from core.core import ModelProcessor
+    from .model_database import ModelDatabase
+    from .smart_cache import SmartCache
+
+    workdir = tempfile.mkdtemp(prefix='scraper_bench_')
+    old_cwd = os.getcwd()
+    rounds: List[Dict[str, Any]] = []
+    try:
+        os.chdir(workdir)
+        e2e_config = copy.deepcopy(config)
+        e2e_config.setdefault('cache', {})['dup_cache_path'] = os.path.join(workdir, 'dup_cache.db')
+        smart_cache = SmartCache(os.path.join(workdir, 'cache'), e2e_config)
+
+        db = ModelDatabase('models.db')
+        model_infos = []
+        for model_name, url in models.items():
+            site = detect_site(url)
+            db.add_model(model_name, url, site)
+            folder = os.path.join(workdir, 'local', model_name)
+            os.makedirs(folder, exist_ok=True)
+            model_infos.append((SITE_FETCHERS[site][3], (model_name, folder, model_name, '欧美')))
+
+        processors = {}
+        for round_index in range(repeat + 1):
+            store = get_fixture_store()
+            pages_before = _served_pages(store)
+            start = time.perf_counter()
+            sources: Dict[str, int] = {}
+            for module_type, model_info in model_infos:
+                if module_type not in processors:
+                    processors[module_type] = ModelProcessor(
+                        e2e_config, module_type, log, log, os.path.join(workdir, 'countries'), smart_cache
+                    )
+                result = processors[module_type].process_single_model(model_info)
+                source = getattr(result, 'source', '') or ('ok' if result.success else 'failed')
+                sources[source] = sources.get(source, 0) + 1
+            wall = time.perf_counter() - start
+            rounds.append({
+                'round': 'cold' if round_index == 0 else 'warm',
+                'models': len(model_infos),
+                'pages': _served_pages(store) - pages_before,
+                'wall_s': round(wall, 3),
+                'models_per_s': round(len(model_infos) / wall, 1) if wall else 0.0,
+                'sources': sources,
+            })
+        for processor in processors.values():
+            processor.close()
+    finally:
+        os.chdir(old_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {'rounds': rounds}
+
+
+def build_config(fixtures_dir: str, mode: str, config_path: Optional[str] = None,
+                 backend: Optional[str] = None) -> dict:
+    """构建基准配置：requests 模式，回放时不限速"""
+    config: Dict[str, Any] = {}
+    if config_path:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+
+    config['scraper'] = 'requests'
+    config['use_selenium'] = False
+    config.setdefault('filename_clean_patterns', [])
+    config.setdefault('video_extensions', ['.mp4', '.mkv', '.avi', '.wmv', '.mov'])
+    config['http_replay'] = {'mode': mode, 'fixtures_dir': os.path.abspath(fixtures_dir)}
+    config.setdefault('async_crawler', {})['enabled'] = False
+    if mode == 'replay':
+        config['delay_between_pages'] = {'min': 0, 'max': 0}
+    if backend:
+        config['html_parser'] = {'backend': backend}
+    return config
+
+
+def print_scraper_benchmark_report(report: Dict[str, Any]):
+    """打印抓取器基准报告"""
+    print("=" * 72)
+    print(f"抓取器离线基准: {report['models']} 个模特, fixture {report['fixtures']}, 重复 {report['repeat']} 次")
+    print("=" * 72)
+
+    fetch = report['fetch']
+    print("\n抓取（fetch_with_requests_only_*）")
+    print(f"  页面: {fetch['pages']}  标题: {fetch['titles']}  耗时: {fetch['wall_s']:.2f}s  吞吐: {fetch['pages_per_s']} 页/秒")
+    print(f"  解析: {fetch['parse_ms_per_page']:.2f} ms/页  提取: {fetch['extract_ms_per_page']:.2f} ms/页")
+    alloc = fetch['alloc']
+    print(f"  内存: 峰值 {alloc['peak_kb']:.0f} KB  净分配 {alloc['net_kb']:.0f} KB / {alloc['net_blocks']} 块")
+
+    if report.get('e2e'):
+        print("\n端到端（process_single_model）")
+        print(f"{'轮次':<8}{'模特':>6}{'页面':>8}{'耗时(s)':>10}{'模特/秒':>10}  来源")
+        for r in report['e2e']['rounds']:
+            sources = ', '.join(f"{k}={v}" for k, v in r['sources'].items())
+            print(f"{r['round']:<8}{r['models']:>6}{r['pages']:>8}{r['wall_s']:>10.2f}{r['models_per_s']:>10}  {sources}")
+    print()
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='抓取器离线基准测试（录制/回放）')
+    parser.add_argument('--fixtures', default='fixtures/http', help='fixture 目录')
+    parser.add_argument('--record', action='store_true', help='录制模式：访问真实站点并保存列表页')
+    parser.add_argument('--model', action='append', default=[], help='NAME=URL，可重复（回放时默认取 fixture 中的全部模特）')
+    parser.add_argument('--config', help='基础配置文件（如 config.yaml）')
+    parser.add_argument('--backend', help='HTML 解析后端（覆盖配置）')
+    parser.add_argument('--repeat', type=int, default=3, help='回放重复次数')
+    parser.add_argument('--e2e', action='store_true', help='同时运行 process_single_model 端到端基准')
+    parser.add_argument('--json', dest='json_path', help='将结果写入JSON文件')
+    parser.add_argument('--verbose', action='store_true', help='输出抓取日志')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    log = logging.getLogger('scraper_benchmark')
+
+    mode = 'record' if args.record else 'replay'
+    config = build_config(args.fixtures, mode, args.config, args.backend)
+    configure_host_scheduler(config)
+    configure_http_client(config)
+
+    models = dict(item.split('=', 1) for item in args.model if '=' in item)
+    if not models and not args.record:
+        models = discover_models(get_fixture_store())
+    if not models:
+        print(f"没有可用的模特（录制时用 --model NAME=URL 指定）: {args.fixtures}")
+        sys.exit(1)
+
+    if args.record:
+        titles, pages = _run_fetch_pass(models, config, log)
+        print(f"已录制 {get_fixture_store().stats['recorded']} 个页面（{len(models)} 个模特, {titles} 个标题）到 {args.fixtures}")
+        return
+
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'fixtures': os.path.abspath(args.fixtures),
+        'models': len(models),
+        'repeat': args.repeat,
+        'fetch': benchmark_fetch(models, config, args.repeat, log),
+        'e2e': benchmark_end_to_end(models, config, args.repeat, log) if args.e2e else None,
+    }
+    print_scraper_benchmark_report(report)
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
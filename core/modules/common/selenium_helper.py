@@ -4,8 +4,9 @@ Selenium 辅助模块 - 用于网页抓取
 """
 
 import logging
+import threading
 import time
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options as ChromeOptions
@@ -277,6 +278,103 @@ class SeleniumHelper:
         self.close()
 
 
+class SeleniumBrowserPool:
+    """
+    Selenium 浏览器池 - 每个工作线程一个常驻浏览器
+    
+    浏览器在线程内跨模特复用，Chrome 启动开销每个线程只付一次：
+    1. 健康检查 - 取用前探测浏览器是否存活，失效则重建
+    2. 定期回收 - 每个浏览器加载 N 页后关闭重启，避免内存持续增长
+    3. 统一关闭 - shutdown() 关闭所有线程创建的浏览器
+    
+    配置项（selenium 段）:
+        browser_recycle_pages: 单个浏览器最多加载的页数（<=0 表示不回收，默认 200）
+    """
+    
+    def __init__(self, config: dict = None, local: threading.local = None):
+        """
+        初始化浏览器池
+        
+        Args:
+            config: 配置字典
+            local: 线程本地存储（可复用调用方已有的 threading.local）
+        """
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+        self.recycle_pages = int(self.config.get('selenium', {}).get('browser_recycle_pages', 200))
+        
+        self._local = local if local is not None else threading.local()
+        self._helpers: List[SeleniumHelper] = []
+        self._lock = threading.Lock()
+        self._closed = False
+    
+    def _is_healthy(self, helper: SeleniumHelper) -> bool:
+        """探测浏览器会话是否仍然可用"""
+        if not helper.driver:
+            return True  # 尚未启动，get_page 时会自动启动
+        try:
+            _ = helper.driver.window_handles
+            return True
+        except Exception as e:
+            self.logger.warning(f"Selenium - 浏览器健康检查失败，将重建: {e}")
+            return False
+    
+    def acquire(self) -> SeleniumHelper:
+        """
+        获取当前线程的浏览器助手（不存在或失效时创建）
+        
+        Returns:
+            SeleniumHelper 实例（已启动浏览器）
+        """
+        if self._closed:
+            raise RuntimeError("浏览器池已关闭")
+        
+        helper = getattr(self._local, 'selenium', None)
+        if helper is None:
+            helper = SeleniumHelper(self.config)
+            self._local.selenium = helper
+            self._local.pages_loaded = 0
+            with self._lock:
+                self._helpers.append(helper)
+        elif not self._is_healthy(helper):
+            helper.close()
+            self._local.pages_loaded = 0
+        
+        if not helper.driver:
+            helper.driver = helper.setup_driver()
+        return helper
+    
+    def record_page(self):
+        """记录当前线程浏览器加载了一页，达到回收阈值时关闭（下次访问自动重启）"""
+        helper = getattr(self._local, 'selenium', None)
+        if helper is None:
+            return
+        
+        self._local.pages_loaded = getattr(self._local, 'pages_loaded', 0) + 1
+        if self.recycle_pages > 0 and self._local.pages_loaded >= self.recycle_pages:
+            self.logger.info(f"Selenium - 浏览器已加载 {self._local.pages_loaded} 页，回收重启")
+            helper.close()
+            self._local.pages_loaded = 0
+    
+    def discard(self):
+        """关闭当前线程的浏览器（抓取出错后调用，下次取用时重建）"""
+        helper = getattr(self._local, 'selenium', None)
+        if helper is not None:
+            helper.close()
+            self._local.pages_loaded = 0
+    
+    def shutdown(self):
+        """关闭池中所有浏览器"""
+        with self._lock:
+            self._closed = True
+            helpers, self._helpers = self._helpers, []
+        
+        for helper in helpers:
+            helper.close()
+        if helpers:
+            self.logger.info(f"Selenium - 浏览器池已关闭 ({len(helpers)} 个浏览器)")
+
+
 def create_selenium_helper(config: dict) -> Optional[SeleniumHelper]:
     """
     创建 Selenium 助手实例的工厂函数
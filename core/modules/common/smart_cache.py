@@ -5,15 +5,31 @@
 
 import os
 import json
+import hashlib
 import time
 import logging
 import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Set, Dict, List, Optional, Tuple, Any
+from typing import Set, Dict, List, Optional, Tuple, Any, Callable
 from pathlib import Path
 import re
 
 
+def compute_page_hash(videos: List[Tuple[str, str, int]]) -> str:
+    """
+    计算一页抓取结果的内容哈希（与顺序无关）
+    
+    Args:
+        videos: 视频列表 [(title, url, page_num), ...]
+        
+    Returns:
+        标题/URL 列表的 SHA-1 摘要
+    """
+    entries = sorted(f"{title}\t{url or ''}" for title, url, _ in videos)
+    return hashlib.sha1("\n".join(entries).encode('utf-8')).hexdigest()
+
+
 class SmartCache:
     """
     智能缓存管理器
@@ -52,6 +68,12 @@ class SmartCache:
         
         # 内存中的缓存数据（减少磁盘IO）
         self._memory_cache: Dict[str, dict] = {}
+        
+        # 批量写入：事务内的 save 只更新内存，退出时统一落盘
+        self._tx_depth = 0
+        self._dirty_models: Set[str] = set()
+        # 只在内存中更新、等待 flush() 写入的模特（未变化页面的时间戳）
+        self._pending_models: Set[str] = set()
     
     def _get_cache_path(self, model_name: str) -> str:
         """获取模特缓存文件路径"""
@@ -104,6 +126,7 @@ class SmartCache:
             'video_titles': [],  # 兼容旧版本
             'videos': {},  # 新的视频数据结构 {title: {url, page, timestamp}}
             'page_timestamps': {},  # 每页最后抓取时间 {page_num: timestamp}
+            'page_hashes': {},  # 每页内容哈希 {page_num: sha1}
             'last_page_fetched': 0,  # 最后抓取的页码
             'total_pages': 0,  # 总页数
             'last_updated': None,
@@ -148,6 +171,8 @@ class SmartCache:
                 data['videos'] = {}
             if 'page_timestamps' not in data:
                 data['page_timestamps'] = {}
+            if 'page_hashes' not in data:
+                data['page_hashes'] = {}
             
             # 将旧格式视频标题迁移到新格式
             if data['video_titles'] and not data['videos']:
@@ -188,14 +213,59 @@ class SmartCache:
             # 同步 video_titles（兼容旧版本）
             data['video_titles'] = list(data.get('videos', {}).keys())
             
-            # 保存到文件
-            self._save_cache_file(cache_path, data)
-            
             # 更新内存缓存
             self._memory_cache[model_name] = data.copy()
             
+            # 事务内延迟落盘
+            if self._tx_depth:
+                self._dirty_models.add(model_name)
+                return
+            
+            # 保存到文件
+            self._save_cache_file(cache_path, data)
+            self._pending_models.discard(model_name)
+            
             self.logger.debug(f"缓存已保存: {model_name} ({len(data['videos'])} 个视频)")
     
+    @contextmanager
+    def transaction(self):
+        """
+        批量写入上下文（与 DatabaseCacheAdapter.transaction 接口一致）
+        
+        块内多次 add_videos / update_page_timestamp 只修改内存缓存，
+        退出时每个模特的缓存文件只写一次。
+        """
+        with self._lock:
+            self._tx_depth += 1
+            try:
+                yield self
+            finally:
+                self._tx_depth -= 1
+                if self._tx_depth == 0 and self._dirty_models:
+                    for model_name in self._dirty_models:
+                        data = self._memory_cache.get(model_name)
+                        if data is not None:
+                            self._save_cache_file(self._get_cache_path(model_name), data)
+                    self._pending_models -= self._dirty_models
+                    self._dirty_models.clear()
+    
+    def flush(self, model_name: Optional[str] = None):
+        """
+        写入只在内存中更新的缓存（save_page 对未变化页面只刷新内存中的时间戳）
+        
+        Args:
+            model_name: 模特名称，为 None 时写入所有待写入的模特
+        """
+        with self._lock:
+            models = [model_name] if model_name else list(self._pending_models)
+            for name in models:
+                if name not in self._pending_models:
+                    continue
+                self._pending_models.discard(name)
+                data = self._memory_cache.get(name)
+                if data is not None:
+                    self._save_cache_file(self._get_cache_path(name), data)
+    
     def get_last_page(self, model_name: str) -> int:
         """
         获取模特最后抓取的页码
@@ -267,6 +337,53 @@ class SmartCache:
         
         self.save(model_name, data)
     
+    def save_page(self, model_name: str, page_num: int, videos: List[Tuple[str, str, int]]) -> bool:
+        """
+        保存一页的抓取结果
+        
+        内容变化时合并视频并写入文件；未变化时只在内存中刷新时间戳，
+        不重写整个缓存文件，由模特抓取结束时的 flush() 统一写入一次。
+        
+        Args:
+            model_name: 模特名称
+            page_num: 页码
+            videos: 该页视频列表 [(title, url, page_num), ...]
+            
+        Returns:
+            页面内容是否有变化（False 表示跳过了 add_videos）
+        """
+        page_hash = compute_page_hash(videos)
+        
+        with self.transaction():
+            page_hashes = self.load(model_name).get('page_hashes', {})
+            changed = page_hashes.get(str(page_num)) != page_hash
+            
+            if changed:
+                self.add_videos(model_name, videos)
+                data = self.load(model_name)
+                data.setdefault('page_hashes', {})[str(page_num)] = page_hash
+                self.save(model_name, data)
+                self.update_page_timestamp(model_name, page_num)
+        
+        if not changed:
+            self.logger.debug(f"第 {page_num} 页内容未变化，仅刷新时间戳: {model_name}")
+            self._touch_page(model_name, page_num)
+        
+        return changed
+    
+    def _touch_page(self, model_name: str, page_num: int):
+        """只在内存中刷新页面时间戳与最后抓取页码（等待 flush() 写入）"""
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            data = self.load(model_name)
+            data.setdefault('page_timestamps', {})[str(page_num)] = datetime.now().isoformat()
+            if page_num > data.get('last_page_fetched', 0):
+                data['last_page_fetched'] = page_num
+            self._memory_cache[model_name] = data
+            self._pending_models.add(model_name)
+    
     def add_videos(self, model_name: str, videos: List[Tuple[str, str, int]]):
         """
         添加视频到缓存
@@ -326,6 +443,19 @@ class SmartCache:
         video = data.get('videos', {}).get(title)
         return video.get('url') if video else None
     
+    def get_video_urls(self, model_name: str) -> Dict[str, str]:
+        """
+        获取 标题 -> URL 映射
+        
+        Args:
+            model_name: 模特名称
+            
+        Returns:
+            {title: url}
+        """
+        data = self.load(model_name)
+        return {title: (info or {}).get('url') or '' for title, info in data.get('videos', {}).items()}
+    
     def is_cache_valid(self, model_name: str) -> bool:
         """
         检查缓存是否有效（未过期）
@@ -391,6 +521,8 @@ class SmartCache:
                 
                 if model_name in self._memory_cache:
                     del self._memory_cache[model_name]
+                self._dirty_models.discard(model_name)
+                self._pending_models.discard(model_name)
             else:
                 # 清除所有缓存
                 for filename in os.listdir(self.cache_dir):
@@ -398,6 +530,8 @@ class SmartCache:
                         os.remove(os.path.join(self.cache_dir, filename))
                 
                 self._memory_cache.clear()
+                self._dirty_models.clear()
+                self._pending_models.clear()
                 self.logger.info("已清除所有缓存")
     
     def get_incremental_fetch_range(self, model_name: str, max_pages: int = -1) -> Tuple[int, int]:
@@ -507,16 +641,35 @@ class SmartCache:
         
         return result
     
-    def mark_video_downloaded(self, model_name: str, title: str):
+    def get_downloaded_titles(self, model_name: str) -> Set[str]:
+        """
+        获取已标记为下载完成的视频标题集合
+        
+        Args:
+            model_name: 模特名称
+            
+        Returns:
+            视频标题集合
+        """
+        data = self.load(model_name)
+        return {
+            title for title, info in data.get('missing_videos', {}).items()
+            if info.get('status') == 'downloaded'
+        }
+    
+    def mark_video_downloaded(self, model_name: str, title: str, url: str = ''):
         """
         标记视频已下载（后续不再出现在缺失列表中）
         
         Args:
             model_name: 模特名称
             title: 视频标题
+            url: 视频URL（缺失列表中没有该标题时据此新增一条已下载记录）
         """
         data = self.load(model_name)
-        missing_data = data.get('missing_videos', {})
+        missing_data = data.setdefault('missing_videos', {})
+        if title not in missing_data and url:
+            missing_data[title] = {'url': url, 'last_missing': datetime.now().isoformat()}
         
         if title in missing_data:
             missing_data[title]['status'] = 'downloaded'
@@ -530,6 +683,131 @@ class SmartCache:
             
             self.save(model_name, data)
             self.logger.debug(f"已标记视频为已下载: {model_name} - {title}")
+    
+    def remove_videos(self, model_name: str, titles: List[str]) -> int:
+        """
+        从缓存中移除指定视频，并使其所在页面的内容哈希失效
+        
+        Args:
+            model_name: 模特名称
+            titles: 要移除的视频标题列表
+            
+        Returns:
+            实际移除的数量
+        """
+        data = self.load(model_name)
+        videos = data.get('videos', {})
+        page_hashes = data.get('page_hashes', {})
+        
+        removed = 0
+        for title in titles:
+            info = videos.pop(title, None)
+            if info is None:
+                continue
+            removed += 1
+            page_hashes.pop(str(info.get('page', 0)), None)
+        
+        if removed:
+            data['videos'] = videos
+            data['page_hashes'] = page_hashes
+            self.save(model_name, data)
+        return removed
+    
+    def reconcile_model_cache(self, model_name: str, schema_version: int,
+                              entry_validator: Optional[Callable[[str, dict], bool]] = None) -> Dict[str, Any]:
+        """
+        校验模特缓存，只剔除不可信的条目，保留其余条目供增量抓取使用
+        
+        1. 缓存版本与 schema_version 不一致（旧规则写入的缓存）时整体重建
+        2. 否则逐条用 entry_validator(title, video_info) 校验，剔除不通过的条目
+        
+        Args:
+            model_name: 模特名称
+            schema_version: 当前抓取规则对应的缓存版本号
+            entry_validator: 条目校验函数，返回 False 表示剔除
+            
+        Returns:
+            {'reset': 是否整体重建, 'removed': 剔除条目数, 'kept': 保留条目数}
+        """
+        with self.transaction():
+            data = self.load(model_name)
+            cached_version = data.get('metadata', {}).get('cache_schema_version', 0)
+            
+            if cached_version != schema_version:
+                removed = len(data.get('videos', {}))
+                self.clear_cache(model_name)
+                data = self.load(model_name)
+                data.setdefault('metadata', {})['cache_schema_version'] = schema_version
+                self.save(model_name, data)
+                return {'reset': True, 'removed': removed, 'kept': 0}
+            
+            invalid = []
+            if entry_validator:
+                invalid = [title for title, info in data.get('videos', {}).items()
+                           if not entry_validator(title, info)]
+            removed = self.remove_videos(model_name, invalid)
+            kept = len(self.load(model_name).get('videos', {}))
+        
+        return {'reset': False, 'removed': removed, 'kept': kept}
+
+
+class IncrementalStopTracker:
+    """
+    增量翻页提前停止判定
+
+    列表页按最新优先排序时，一旦连续若干页的标题全部已在缓存中，
+    后续页面必然也是已知内容，可以停止翻页并用缓存补全结果。
+    仅在该模特曾完成过完整抓取时启用（否则缓存可能只覆盖了部分页面）。
+
+    配置项（cache 段）:
+        early_stop_enabled: 是否启用（默认 True）
+        early_stop_overlap_pages: 需要连续出现的全已知页数（安全余量，默认 1）
+    """
+
+    def __init__(self, smart_cache, model_name: str, config: dict = None):
+        cache_config = (config or {}).get('cache', {})
+        self.required_pages = max(1, int(cache_config.get('early_stop_overlap_pages', 1)))
+        self.consecutive_known = 0
+        self.known_titles: Set[str] = set()
+        self.enabled = False
+
+        if not (smart_cache and model_name and smart_cache.enabled):
+            return
+        if not cache_config.get('early_stop_enabled', True):
+            return
+
+        self.smart_cache = smart_cache
+        self.model_name = model_name
+        # 只有完成过完整抓取（total_pages > 0）的缓存才能代表完整目录
+        if smart_cache.get_cache_stats(model_name).get('total_pages', 0) > 0:
+            self.known_titles = smart_cache.get_cached_titles(model_name)
+            self.enabled = bool(self.known_titles)
+
+    def observe_page(self, page_titles: Set[str]) -> bool:
+        """
+        记录一页的抓取结果
+
+        Args:
+            page_titles: 该页提取到的标题集合
+
+        Returns:
+            是否应停止翻页
+        """
+        if not self.enabled or not page_titles:
+            return False
+
+        if page_titles <= self.known_titles:
+            self.consecutive_known += 1
+        else:
+            self.consecutive_known = 0
+        return self.consecutive_known >= self.required_pages
+
+    def merge_cached(self, all_titles: Set[str], title_to_url: Dict[str, str]):
+        """提前停止后，用缓存中的标题和链接补全未抓取页面的内容"""
+        all_titles.update(self.known_titles)
+        for title, url in self.smart_cache.get_video_urls(self.model_name).items():
+            if url and not title_to_url.get(title):
+                title_to_url[title] = url
 
 
 # 便捷函数
@@ -1,19 +1,47 @@
 """
 存储方案性能对比测试
 比较JSON、SQLite、混合存储的性能差异
+
+缓存后端基准测试（run_cache_backend_benchmark）：
+用 N 个模特 × M 页 × K 个视频的抓取工作负载，多线程驱动真实的
+SmartCache、DatabaseCacheAdapter 与 DupCacheStore，统计吞吐量、
+p50/p99 延迟、文件/数据库大小和峰值内存，可输出JSON用于跨版本回归对比。
+
+用法:
+    python -m core.modules.common.storage_benchmark --models 50 --pages 5 --videos 40 --threads 4 --json bench.json
+    python -m core.modules.common.storage_benchmark --legacy   # 旧版配置存储对比
 """
 
 import time
 import json
 import tempfile
 import os
+import sys
+import shutil
+import random
 import logging
-from typing import Dict, List
+import platform
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from pathlib import Path
+import multiprocessing
 
 # 导入我们的存储模块
 from .model_database import DatabaseModelAdapter
 from .enhanced_config import create_config_manager
+from .smart_cache import SmartCache
+from .database_storage import create_database_cache_adapter
+from .dup_cache import DupCacheStore, DupCacheEntry, compute_remote_signature
+
+# 基准结果格式版本（结构变化时递增）
+BENCHMARK_SCHEMA_VERSION = 1
+
+CACHE_BACKENDS = ('smart_cache', 'database', 'dup_cache')
 
 
 def generate_test_data(count: int) -> Dict[str, Dict]:
@@ -270,5 +298,383 @@ def run_performance_comparison():
     print("• 高性能要求: 考虑混合存储方案")
 
 
+# ==================== 缓存后端基准测试 ====================
+
+def generate_cache_workload(models: int, pages: int, videos: int, seed: int = 42) -> Dict[str, Any]:
+    """
+    生成抓取工作负载（与抓取器调用缓存的顺序一致）
+    
+    Args:
+        models: 模特数量
+        pages: 每个模特的页数
+        videos: 每页视频数量
+        seed: 随机种子（保证可复现）
+        
+    Returns:
+        工作负载字典，可直接保存为JSON后重放
+    """
+    rng = random.Random(seed)
+    words = ['hot', 'new', 'scene', 'part', 'full', 'night', 'story', 'summer', 'home', 'special']
+    workload_models = []
+    for m in range(models):
+        name = f"BenchModel_{m:04d}"
+        model_pages = []
+        for p in range(1, pages + 1):
+            page_videos = []
+            for v in range(videos):
+                title = f"{name} {' '.join(rng.sample(words, 3))} {p:03d}-{v:03d}"
+                url = f"https://example.com/view_video.php?viewkey={m:04d}{p:03d}{v:03d}"
+                page_videos.append([title, url])
+            model_pages.append({'page': p, 'videos': page_videos})
+        workload_models.append({
+            'name': name,
+            'url': f"https://example.com/model/{name.lower()}",
+            'pages': model_pages
+        })
+    return {
+        'params': {'models': models, 'pages': pages, 'videos': videos, 'seed': seed},
+        'models': workload_models
+    }
+
+
+class _LatencyRecorder:
+    """线程安全的操作延迟记录器"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+    
+    @contextmanager
+    def measure(self, op: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._samples.setdefault(op, []).append(elapsed)
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """按操作汇总 count / p50 / p99 / mean（毫秒）"""
+        result = {}
+        all_samples = []
+        with self._lock:
+            items = list(self._samples.items())
+        for op, samples in sorted(items):
+            all_samples.extend(samples)
+            result[op] = _latency_stats(samples)
+        result['_all'] = _latency_stats(all_samples)
+        return result
+
+
+def _percentile(sorted_samples: List[float], pct: float) -> float:
+    """最近秩百分位数"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_samples) + 0.5)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def _latency_stats(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'p50_ms': _percentile(ordered, 50) * 1000,
+        'p99_ms': _percentile(ordered, 99) * 1000,
+        'mean_ms': (sum(ordered) / len(ordered) * 1000) if ordered else 0.0
+    }
+
+
+def _peak_rss_bytes() -> int:
+    """当前进程的峰值常驻内存（字节），无法获取时返回0"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为KB，macOS 为字节
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    except Exception:
+        return 0
+
+
+def _path_size_bytes(path: str) -> int:
+    """文件或目录的总大小（SQLite 包含 -wal/-shm）"""
+    if os.path.isdir(path):
+        total = 0
+        for root, _, files in os.walk(path):
+            for f in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, f))
+                except OSError:
+                    pass
+        return total
+    total = 0
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            total += os.path.getsize(path + suffix)
+    return total
+
+
+def _replay_model_on_cache(cache, model: Dict[str, Any], recorder: _LatencyRecorder) -> int:
+    """按抓取器的调用顺序在 SmartCache 接口上重放一个模特，返回操作数"""
+    name = model['name']
+    ops = 0
+    
+    with recorder.measure('get_incremental_fetch_range'):
+        cache.get_incremental_fetch_range(name)
+    ops += 1
+    
+    all_videos = []
+    for page in model['pages']:
+        page_num = page['page']
+        with recorder.measure('should_update_page'):
+            cache.should_update_page(name, page_num)
+        videos = [(title, url, page_num) for title, url in page['videos']]
+        all_videos.extend(videos)
+        with recorder.measure('save_page'):
+            with cache.transaction():
+                cache.add_videos(name, videos)
+                cache.update_page_timestamp(name, page_num)
+        ops += 2
+    
+    with recorder.measure('mark_full_fetch_completed'):
+        cache.mark_full_fetch_completed(name, len(model['pages']))
+    with recorder.measure('get_cached_titles'):
+        cache.get_cached_titles(name)
+    with recorder.measure('get_downloaded_titles'):
+        cache.get_downloaded_titles(name)
+    with recorder.measure('get_video_urls'):
+        cache.get_video_urls(name)
+    ops += 4
+    
+    # 每5个视频中有1个缺失，其中第一个随后被标记为已下载
+    missing = [(title, url) for title, url, _ in all_videos[::5]]
+    with recorder.measure('update_missing_videos'):
+        cache.update_missing_videos(name, missing)
+    ops += 1
+    if missing:
+        with recorder.measure('mark_video_downloaded'):
+            cache.mark_video_downloaded(name, missing[0][0])
+        ops += 1
+    return ops
+
+
+def _replay_model_on_dup_cache(store: DupCacheStore, model: Dict[str, Any], recorder: _LatencyRecorder) -> int:
+    """按 process_single_model 的调用顺序在 DupCacheStore 上重放一个模特"""
+    titles = [title for page in model['pages'] for title, _ in page['videos']]
+    urls = dict(title_url for page in model['pages'] for title_url in page['videos'])
+    missing = titles[::5]
+    cache_key = store.build_cache_key(model['name'], 'PORN', model['url'])
+    
+    with recorder.measure('dup_get'):
+        store.get(cache_key)
+    entry = DupCacheEntry(
+        cache_key=cache_key,
+        model_name=model['name'],
+        module='PORN',
+        url=model['url'],
+        remote_signature=compute_remote_signature(titles[:40], len(titles)),
+        remote_signature_full=compute_remote_signature(titles, len(titles)),
+        online_count=len(titles),
+        local_count=len(titles) - len(missing),
+        missing_titles=missing,
+        missing_with_urls=[(t, urls[t]) for t in missing],
+        invalid_titles=[]
+    )
+    with recorder.measure('dup_upsert'):
+        store.upsert(entry)
+    with recorder.measure('dup_get'):
+        store.get(cache_key)
+    return 3
+
+
+def run_cache_backend_benchmark(backend: str, workload: Dict[str, Any], threads: int = 4,
+                                work_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    在单个缓存后端上多线程重放工作负载
+    
+    Args:
+        backend: 'smart_cache' | 'database' | 'dup_cache'
+        workload: generate_cache_workload() 生成或从文件加载的工作负载
+        threads: 并发线程数（每个线程一次处理一个模特，与 ModelWorker 一致）
+        work_dir: 数据目录，默认使用临时目录并在结束后删除
+        
+    Returns:
+        结果字典（吞吐量、延迟分布、存储大小、峰值内存）
+    """
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"未知的缓存后端: {backend}，可选: {CACHE_BACKENDS}")
+    
+    owns_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix=f"bench_{backend}_")
+    config = {'cache': {'enabled': True, 'incremental_update': True, 'page_expiry_hours': 24}}
+    rss_before = _peak_rss_bytes()
+    
+    try:
+        if backend == 'smart_cache':
+            storage_path = os.path.join(work_dir, 'cache')
+            target = SmartCache(storage_path, config)
+            replay = _replay_model_on_cache
+        elif backend == 'database':
+            storage_path = os.path.join(work_dir, 'cache.db')
+            target = create_database_cache_adapter(storage_path, config)
+            replay = _replay_model_on_cache
+        else:
+            storage_path = os.path.join(work_dir, 'dup_cache.db')
+            target = DupCacheStore(storage_path)
+            replay = _replay_model_on_dup_cache
+        
+        recorder = _LatencyRecorder()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="BenchWorker") as executor:
+            total_ops = sum(executor.map(lambda m: replay(target, m, recorder), workload['models']))
+        elapsed = time.perf_counter() - start
+        
+        if backend == 'database':
+            target.db.close()
+        
+        total_videos = sum(len(p['videos']) for m in workload['models'] for p in m['pages'])
+        return {
+            'backend': backend,
+            'threads': threads,
+            'elapsed_s': elapsed,
+            'operations': total_ops,
+            'ops_per_s': total_ops / elapsed if elapsed > 0 else 0.0,
+            'models_per_s': len(workload['models']) / elapsed if elapsed > 0 else 0.0,
+            'videos_per_s': total_videos / elapsed if elapsed > 0 else 0.0,
+            'latency': recorder.summary(),
+            'storage_bytes': _path_size_bytes(storage_path),
+            'peak_rss_bytes': _peak_rss_bytes(),
+            'rss_growth_bytes': max(0, _peak_rss_bytes() - rss_before)
+        }
+    finally:
+        if owns_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _run_backend_isolated(backend: str, workload: Dict[str, Any], threads: int) -> Dict[str, Any]:
+    """在独立子进程中运行单个后端，保证峰值内存互不干扰"""
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+        return executor.submit(run_cache_backend_benchmark, backend, workload, threads).result()
+
+
+def _git_revision() -> str:
+    """当前代码版本（用于跨版本对比），获取失败返回空字符串"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def run_cache_benchmark_suite(workload: Dict[str, Any], backends=CACHE_BACKENDS,
+                              threads: int = 4, isolate: bool = True) -> Dict[str, Any]:
+    """
+    依次运行多个缓存后端并汇总为机器可读的报告
+    
+    Args:
+        workload: 工作负载
+        backends: 要测试的后端列表
+        threads: 并发线程数
+        isolate: 是否每个后端使用独立子进程（峰值内存更准确）
+        
+    Returns:
+        报告字典
+    """
+    results = {}
+    for backend in backends:
+        print(f"运行缓存后端基准: {backend} ...")
+        if isolate:
+            results[backend] = _run_backend_isolated(backend, workload, threads)
+        else:
+            results[backend] = run_cache_backend_benchmark(backend, workload, threads)
+    
+    return {
+        'schema_version': BENCHMARK_SCHEMA_VERSION,
+        'generated_at': datetime.now().isoformat(),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'workload': workload['params'],
+        'threads': threads,
+        'isolated': isolate,
+        'results': results
+    }
+
+
+def print_cache_benchmark_report(report: Dict[str, Any]):
+    """打印缓存后端基准报告"""
+    params = report['workload']
+    print("\n" + "=" * 78)
+    print(f"缓存后端基准: {params['models']} 模特 × {params['pages']} 页 × {params['videos']} 视频, "
+          f"{report['threads']} 线程")
+    print("=" * 78)
+    print(f"{'后端':<14}{'耗时(s)':>10}{'ops/s':>12}{'p50(ms)':>10}{'p99(ms)':>10}"
+          f"{'存储(MB)':>11}{'峰值RSS(MB)':>13}")
+    for backend, r in report['results'].items():
+        overall = r['latency']['_all']
+        print(f"{backend:<14}{r['elapsed_s']:>10.2f}{r['ops_per_s']:>12.1f}"
+              f"{overall['p50_ms']:>10.2f}{overall['p99_ms']:>10.2f}"
+              f"{r['storage_bytes'] / 1048576:>11.2f}{r['peak_rss_bytes'] / 1048576:>13.1f}")
+    
+    print("\n按操作的延迟 (p50 / p99 ms):")
+    for backend, r in report['results'].items():
+        print(f"  [{backend}]")
+        for op, stats in r['latency'].items():
+            if op == '_all':
+                continue
+            print(f"    {op:<28}{stats['count']:>7} 次  {stats['p50_ms']:>8.2f} / {stats['p99_ms']:.2f}")
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='缓存后端基准测试')
+    parser.add_argument('--models', type=int, default=50, help='模特数量 N')
+    parser.add_argument('--pages', type=int, default=5, help='每个模特页数 M')
+    parser.add_argument('--videos', type=int, default=40, help='每页视频数 K')
+    parser.add_argument('--threads', type=int, default=4, help='并发线程数')
+    parser.add_argument('--seed', type=int, default=42, help='工作负载随机种子')
+    parser.add_argument('--backends', default=','.join(CACHE_BACKENDS), help='逗号分隔的后端列表')
+    parser.add_argument('--workload', help='从JSON文件加载已录制的工作负载')
+    parser.add_argument('--record', help='将生成的工作负载保存到JSON文件')
+    parser.add_argument('--json', dest='json_path', help='将结果写入JSON文件')
+    parser.add_argument('--no-isolate', action='store_true', help='所有后端在同一进程内运行')
+    parser.add_argument('--legacy', action='store_true', help='运行旧版配置存储对比测试')
+    args = parser.parse_args(argv)
+    
+    if args.legacy:
+        run_performance_comparison()
+        return
+    
+    logging.basicConfig(level=logging.WARNING)
+    
+    if args.workload:
+        with open(args.workload, 'r', encoding='utf-8') as f:
+            workload = json.load(f)
+    else:
+        workload = generate_cache_workload(args.models, args.pages, args.videos, args.seed)
+    if args.record:
+        with open(args.record, 'w', encoding='utf-8') as f:
+            json.dump(workload, f, ensure_ascii=False)
+    
+    backends = [b.strip() for b in args.backends.split(',') if b.strip()]
+    report = run_cache_benchmark_suite(workload, backends, args.threads, isolate=not args.no_isolate)
+    print_cache_benchmark_report(report)
+    
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.json_path}")
+
+
 if __name__ == "__main__":
-    run_performance_comparison()
\ No newline at end of file
+    main()
@@ -0,0 +1,109 @@
+"""
+视频信息缓存
+按视频URL缓存 yt-dlp 提取的信息字典（带有效期），供同一视频的信息查询、已存在检查与
+V1→V3 降级（标题）复用，避免重复打开视频页、重复运行提取器。
+
+流地址带签名且会过期：PornDownloader 只把缓存用于标题与已存在检查，实际下载前重新提取，
+下载失败时清除该URL的缓存。有效期较短（默认 5 分钟），超过容量时淘汰最久未使用的条目。
+
+配置（porn.download_options 段）:
+    info_cache_ttl: 有效期（秒，默认 300，0 表示不缓存）
+    info_cache_size: 最多缓存的视频数（默认 128）
+"""
+
+import copy
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urldefrag
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 128
+
+
+class VideoInfoCache:
+    """视频信息字典的 TTL + LRU 缓存（线程安全）"""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        初始化缓存
+
+        Args:
+            ttl_seconds: 有效期（秒），<= 0 时不缓存
+            max_entries: 最多缓存条目数
+        """
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    @classmethod
+    def from_config(cls, config: dict = None) -> 'VideoInfoCache':
+        """从配置字典创建缓存"""
+        options = ((config or {}).get('porn', {}) or {}).get('download_options', {}) or {}
+        return cls(
+            ttl_seconds=options.get('info_cache_ttl', DEFAULT_TTL_SECONDS),
+            max_entries=options.get('info_cache_size', DEFAULT_MAX_ENTRIES),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return urldefrag(url.strip())[0]
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """读取未过期的信息字典（返回副本，调用方可随意修改）"""
+        if not self.enabled:
+            return None
+        key = self._key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            info = entry[1]
+        return copy.deepcopy(info)
+
+    def put(self, url: str, info: Optional[Dict[str, Any]]):
+        """记录一次提取结果（None 不缓存）"""
+        if not self.enabled or not info:
+            return
+        snapshot = copy.deepcopy(info)
+        with self._lock:
+            self._entries[self._key(url)] = (time.time(), snapshot)
+            self._entries.move_to_end(self._key(url))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url: Optional[str] = None):
+        """清除某个URL（或全部）的缓存"""
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self._key(url), None)
+
+
+_cache: Optional[VideoInfoCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_video_info_cache(config: dict = None) -> VideoInfoCache:
+    """获取全局视频信息缓存，尚未创建时按传入配置创建"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = VideoInfoCache.from_config(config)
+        return _cache
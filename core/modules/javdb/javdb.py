@@ -1,62 +1,103 @@
 import os
-import time
-import random
 import re
+import time
 import requests
 from typing import Set, Dict, List, Tuple
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
+from ..common.html_parser import make_soup, compile_selector
+from ..common.host_scheduler import get_host_scheduler
+from ..common.http_client import http_get
+from ..common.smart_cache import IncrementalStopTracker
 
-def _is_javdb_video_belong_to_model(container, model_name: str, model_url: str, logger) -> bool:
-    """验证JAVDB视频是否属于指定模特（演员页严格过滤）"""
-    try:
-        if not model_name or not model_url:
-            return True
-        if '/actor' not in model_url and '/actors/' not in model_url:
-            return True
+# 预编译的列表页选择器（每页都会用到）
+_VIDEO_TITLE_SELECTOR = compile_selector('a.video-title, .movie-title a, .film-title a')
+_ACTOR_INDICATOR_SELECTOR = compile_selector('.actor, .actors, .cast, .actor-name, .actor-name a, .cast a, .actors a')
 
-        def _norm(s: str) -> str:
-            return (s or "").lower().strip()
-
-        def _norm_compact(s: str) -> str:
-            return _norm(s).replace(' ', '').replace('_', '').replace('-', '')
-
-        m = re.search(r"/actors?/([^/?#]+)/?", model_url)
-        target_slug = _norm(m.group(1)) if m else ""
-        target_compact = _norm_compact(model_name)
-
-        # 证据1：容器内出现指向该演员的链接
-        actor_links = []
-        for a in container.find_all('a', href=True):
-            href = a.get('href', '')
-            if '/actor' in href or '/actors/' in href:
-                actor_links.append(href)
-        if actor_links:
-            if target_slug and any(target_slug in _norm(l) for l in actor_links):
-                return True
-            if target_compact and any(target_compact in _norm_compact(l) for l in actor_links):
-                return True
-            return False
 
-        # 证据2：容器内有演员姓名文本
-        indicators = container.select('.actor, .actors, .cast, .actor-name, .actor-name a, .cast a, .actors a')
-        if indicators:
+_COMPACT_TABLE = str.maketrans('', '', ' _-')
+_ACTOR_SLUG_RE = re.compile(r"/actors?/([^/?#]+)/?")
+
+
+def _norm(s: str) -> str:
+    return (s or "").lower().strip()
+
+
+def _norm_compact(s: str) -> str:
+    return _norm(s).translate(_COMPACT_TABLE)
+
+
+class JavdbOwnershipMatcher:
+    """
+    JAVDB 演员归属判定器（每次演员页抓取构建一次）
+
+    目标 slug、紧凑名在构建时计算一次，链接判定结果按 href 缓存。
+    非演员页不做过滤。
+    """
+
+    def __init__(self, model_name: str, model_url: str, logger=None):
+        self.logger = logger
+        model_url = model_url or ""
+        self.enabled = bool(model_name and model_url) and ('/actor' in model_url or '/actors/' in model_url)
+
+        m = _ACTOR_SLUG_RE.search(model_url)
+        self.target_slug = _norm(m.group(1)) if m else ""
+        self.compact = _norm_compact(model_name)
+
+        self._link_verdicts: Dict[str, bool] = {}
+
+    def _link_matches(self, link: str) -> bool:
+        verdict = self._link_verdicts.get(link)
+        if verdict is None:
+            link_l = _norm(link)
+            verdict = bool(
+                (self.target_slug and self.target_slug in link_l)
+                or (self.compact and self.compact in link_l.translate(_COMPACT_TABLE))
+            )
+            self._link_verdicts[link] = verdict
+        return verdict
+
+    def matches(self, container) -> bool:
+        """验证JAVDB视频是否属于目标演员（演员页严格过滤）"""
+        if not self.enabled:
+            return True
+        try:
+            # 证据1：容器内出现指向该演员的链接
+            actor_links = [a['href'] for a in container.find_all('a', href=True) if '/actor' in a['href']]
+            if actor_links:
+                return any(self._link_matches(link) for link in actor_links)
+
+            # 证据2：容器内有演员姓名文本
+            indicators = _ACTOR_INDICATOR_SELECTOR.select(container)
             for indicator in indicators:
                 t = indicator.get_text(strip=True)
-                if t and (target_compact in _norm_compact(t) or _norm_compact(t) in target_compact):
-                    return True
+                if t:
+                    compact = _norm_compact(t)
+                    if self.compact in compact or compact in self.compact:
+                        return True
             return False
+        except Exception as e:
+            if self.logger:
+                self.logger.debug(f"  JAVDB - 演员归属校验异常: {e}")
+            return True
+
+    def filter(self, containers) -> List:
+        """批量过滤视频容器，只保留属于目标演员的容器（保持原顺序）"""
+        if not self.enabled:
+            return list(containers)
+        return [container for container in containers if self.matches(container)]
+
+
+def _is_javdb_video_belong_to_model(container, model_name: str, model_url: str, logger) -> bool:
+    """验证JAVDB视频是否属于指定模特（单次调用的兼容接口，批量判定请复用 JavdbOwnershipMatcher）"""
+    return JavdbOwnershipMatcher(model_name, model_url, logger).matches(container)
 
-        return False
-    except Exception as e:
-        logger.debug(f"  JAVDB - 演员归属校验异常: {e}")
-        return True
 
 # --- JAVDB特定功能 ---
 
 def fetch_with_requests_javdb(url: str, logger, max_pages: int = -1, config: dict = None,
-                              smart_cache=None, model_name: str = None) -> Tuple[Set[str], Dict[str, str]]:
+                              smart_cache=None, model_name: str = None,
+                              browser_pool=None) -> Tuple[Set[str], Dict[str, str]]:
     """JAVDB专用的抓取，支持requests和Selenium，抓取视频标题和链接，支持翻页（支持增量更新）"""
     if config is None:
         config = {}
@@ -67,7 +108,7 @@ def fetch_with_requests_javdb(url: str, logger, max_pages: int = -1, config: dic
     
     if use_selenium or scraper == 'selenium':
         try:
-            return fetch_with_selenium_javdb(url, logger, max_pages, config, smart_cache, model_name)
+            return fetch_with_selenium_javdb(url, logger, max_pages, config, smart_cache, model_name, browser_pool)
         except Exception as e:
             logger.warning(f"  JAVDB - Selenium 抓取失败，回退到 requests: {e}")
             # 回退到 requests
@@ -77,7 +118,8 @@ def fetch_with_requests_javdb(url: str, logger, max_pages: int = -1, config: dic
 
 
 def fetch_with_selenium_javdb(url: str, logger, max_pages: int = -1, config: dict = None,
-                              smart_cache=None, model_name: str = None) -> Tuple[Set[str], Dict[str, str]]:
+                              smart_cache=None, model_name: str = None,
+                              browser_pool=None) -> Tuple[Set[str], Dict[str, str]]:
     """使用 Selenium 抓取 JAVDB 视频（支持增量更新）"""
     try:
         from ..common.selenium_helper import SeleniumHelper
@@ -98,14 +140,26 @@ def fetch_with_selenium_javdb(url: str, logger, max_pages: int = -1, config: dic
             all_titles.update(cached_titles)
             logger.info(f"  JAVDB - 增量模式，已加载 {len(cached_titles)} 个缓存标题")
     
+    # 最新优先排序下，遇到全部已缓存的页面即可提前停止
+    early_stop = IncrementalStopTracker(smart_cache, model_name, config)
+    # 演员归属判定器：目标slug等只计算一次
+    ownership = JavdbOwnershipMatcher(model_name, url, logger)
+    page_scheduler = get_host_scheduler(config)
+    # 页面加载后等待懒加载内容渲染（与站点限速无关）
+    settle_seconds = float(((config or {}).get('selenium', {}) or {}).get('page_settle_seconds', 2.0))
+    
     page_num = start_page
     consecutive_empty_pages = 0
     
     selenium = None
     try:
-        # 创建 Selenium 助手
-        selenium = SeleniumHelper(config)
-        selenium.driver = selenium.setup_driver()
+        if browser_pool:
+            # 复用当前工作线程的常驻浏览器
+            selenium = browser_pool.acquire()
+        else:
+            # 创建 Selenium 助手
+            selenium = SeleniumHelper(config)
+            selenium.driver = selenium.setup_driver()
         
         logger.info("  JAVDB - 使用 Selenium 模式抓取")
         
@@ -127,28 +181,34 @@ def fetch_with_selenium_javdb(url: str, logger, max_pages: int = -1, config: dic
             
             logger.info(f"  JAVDB - Selenium 抓取第 {page_num} 页: {page_url}")
             
+            # 按站点限速（所有工作线程共享）
+            page_scheduler.wait(page_url)
+            
             # 访问页面
             if not selenium.get_page(page_url, wait_element='a.video-title, .movie-title a, .film-title a, .title', wait_timeout=15):
                 logger.warning(f"  JAVDB - Selenium 页面加载失败")
                 break
             
-            # 随机延时
-            time.sleep(random.uniform(2.5, 4.5))
+            # 等待页面渲染完成
+            if settle_seconds > 0:
+                time.sleep(settle_seconds)
             
             # 获取页面源码
             page_source = selenium.get_page_source()
-            soup = BeautifulSoup(page_source, 'html.parser')
+            if browser_pool:
+                browser_pool.record_page()
+            soup = make_soup(page_source, config)
             
             # 提取标题
             page_titles = set()
             page_videos = []  # 用于智能缓存
             
             # 选择器1: JAVDB特有的视频标题选择器
-            for elem in soup.select('a.video-title, .movie-title a, .film-title a'):
+            for elem in _VIDEO_TITLE_SELECTOR.select(soup):
                 title = elem.get_text(strip=True)
                 if title and len(title) > 3:
                     container = elem.find_parent(['div', 'article', 'li']) or elem
-                    if not _is_javdb_video_belong_to_model(container, model_name, url, logger):
+                    if not ownership.matches(container):
                         continue
                     cleaned_title = clean_javdb_title(title, config.get('filename_clean_patterns', []))
                     page_titles.add(cleaned_title)
@@ -165,7 +225,7 @@ def fetch_with_selenium_javdb(url: str, logger, max_pages: int = -1, config: dic
                     title = elem.get_text(strip=True)
                     if title and len(title) > 3:
                         container = elem.find_parent(['div', 'article', 'li']) or elem
-                        if not _is_javdb_video_belong_to_model(container, model_name, url, logger):
+                        if not ownership.matches(container):
                             continue
                         cleaned_title = clean_javdb_title(title, config.get('filename_clean_patterns', []))
                         page_titles.add(cleaned_title)
@@ -189,8 +249,8 @@ def fetch_with_selenium_javdb(url: str, logger, max_pages: int = -1, config: dic
                 # 更新智能缓存
                 if smart_cache and model_name:
                     videos_with_page = [(title, url, page_num) for title, url in page_videos]
-                    smart_cache.add_videos(model_name, videos_with_page)
-                    smart_cache.update_page_timestamp(model_name, page_num)
+                    # 内容哈希未变化时只刷新时间戳
+                    smart_cache.save_page(model_name, page_num, videos_with_page)
                 
                 if page_num == 1 or page_num == start_page:
                     sample = list(page_titles)[:5]
@@ -198,6 +258,11 @@ def fetch_with_selenium_javdb(url: str, logger, max_pages: int = -1, config: dic
                         logger.info(f"    样本{i}: {title[:80]}{'...' if len(title) > 80 else ''}")
                 
                 consecutive_empty_pages = 0
+                
+                if early_stop.observe_page(page_titles):
+                    logger.info(f"  JAVDB - Selenium 第 {page_num} 页内容均已缓存，提前停止翻页")
+                    early_stop.merge_cached(all_titles, title_to_url)
+                    break
             else:
                 logger.warning(f"  JAVDB - Selenium 第 {page_num} 页未找到视频标题")
                 consecutive_empty_pages += 1
@@ -230,15 +295,124 @@ def fetch_with_selenium_javdb(url: str, logger, max_pages: int = -1, config: dic
         
     except Exception as e:
         logger.error(f"  JAVDB - Selenium 抓取失败: {e}")
+        if browser_pool:
+            browser_pool.discard()
         raise
     finally:
-        if selenium:
+        if selenium and not browser_pool:
             selenium.close()
+        # 写入只在内存中刷新的页面时间戳（未变化的页面不逐页重写缓存文件）
+        if smart_cache and model_name:
+            smart_cache.flush(model_name)
     
     logger.info(f"  JAVDB - Selenium 总共提取到 {len(all_titles)} 个视频标题")
     return all_titles, title_to_url
 
 
+def extract_javdb_listing_page(soup, url: str, config: dict, ownership, logger) -> Tuple[Set[str], List[Tuple[str, str]]]:
+    """
+    从列表页中提取属于目标模特的视频（requests 模式与异步抓取引擎共用）
+
+    Args:
+        soup: 列表页解析树
+        url: 模特主页URL（用于补全相对链接）
+        config: 配置字典
+        ownership: 归属判定器
+        logger: 日志记录器
+
+    Returns:
+        (页面标题集合, [(标题, 链接), ...])
+    """
+    clean_patterns = config.get('filename_clean_patterns', [])
+    # JAVDB特定的选择器
+    page_titles = set()
+    page_videos = []  # 用于智能缓存
+
+    # 选择器1: JAVDB特有的视频标题选择器
+    for elem in _VIDEO_TITLE_SELECTOR.select(soup):
+        title = elem.get_text(strip=True)
+        if title and len(title) > 3:
+            container = elem.find_parent(['div', 'article', 'li']) or elem
+            if not ownership.matches(container):
+                continue
+            # 对在线标题应用清理流程
+            cleaned_title = clean_javdb_title(title, clean_patterns)
+            page_titles.add(cleaned_title)
+            video_url = elem.get('href')
+            if video_url:
+                if not video_url.startswith('http'):
+                    video_url = urljoin(url, video_url)
+                page_videos.append((cleaned_title, video_url))
+
+    # 选择器2: 通用标题选择器
+    if not page_titles:
+        for elem in soup.select('.title, .video-title, h3.title'):
+            title = elem.get_text(strip=True)
+            if title and len(title) > 3:
+                container = elem.find_parent(['div', 'article', 'li']) or elem
+                if not ownership.matches(container):
+                    continue
+                cleaned_title = clean_javdb_title(title, clean_patterns)
+                page_titles.add(cleaned_title)
+                # 尝试找到父链接
+                link_elem = elem.find_parent('a')
+                if link_elem:
+                    video_url = link_elem.get('href')
+                    if video_url:
+                        if not video_url.startswith('http'):
+                            video_url = urljoin(url, video_url)
+                        page_videos.append((cleaned_title, video_url))
+    
+    return page_titles, page_videos
+
+
+def javdb_has_next_page(soup, page_num: int, logger) -> bool:
+    """判断列表页是否还有下一页（requests 模式与异步抓取引擎共用）"""
+    # 检查是否有下一页
+    has_next = False
+
+    # JAVDB特定的分页检查
+    next_buttons = soup.select('a.next, a[rel="next"], .pagination-next, .page-item.next a')
+    if next_buttons:
+        for button in next_buttons:
+            text = button.get_text(strip=True).lower()
+            href = button.get('href', '')
+            if text in ['next', '>', '下一页', '下一頁'] or 'page=' in href:
+                # 检查是否是最后一页
+                if 'page=' in href:
+                    # 提取page参数值
+                    page_param = href.split('page=')[-1].split('&')[0]
+                    if page_param.isdigit():
+                        # 如果page参数值小于等于当前页，说明是最后一页
+                        if int(page_param) <= page_num:
+                            continue
+                # 检查按钮是否可见或可用
+                style = button.get('style', '')
+                if 'display: none' in style or 'visibility: hidden' in style:
+                    continue
+                has_next = True
+                break
+
+    # 尝试通用分页检查
+    if not has_next:
+        pagination = soup.select_one('.pagination, .pages, .pageNumbers, .pagination.pagination-themed')
+        if pagination:
+            # 查找当前页和最大页
+            page_links = pagination.select('a')
+            page_numbers = []
+            for link in page_links:
+                text = link.get_text(strip=True)
+                if text.isdigit():
+                    page_numbers.append(int(text))
+
+            if page_numbers:
+                max_page = max(page_numbers)
+                if page_num < max_page:
+                    has_next = True
+    
+    return has_next
+
+
 def fetch_with_requests_only_javdb(url: str, logger, max_pages: int = -1, config: dict = None,
                                    smart_cache=None, model_name: str = None) -> Tuple[Set[str], Dict[str, str]]:
     """使用 requests 抓取 JAVDB 视频（支持增量更新）"""
@@ -278,6 +452,12 @@ def fetch_with_requests_only_javdb(url: str, logger, max_pages: int = -1, config
             all_titles.update(cached_titles)
             logger.info(f"  JAVDB - 增量模式，已加载 {len(cached_titles)} 个缓存标题")
     
+    # 最新优先排序下，遇到全部已缓存的页面即可提前停止
+    early_stop = IncrementalStopTracker(smart_cache, model_name, config)
+    # 演员归属判定器：目标slug等只计算一次
+    ownership = JavdbOwnershipMatcher(model_name, url, logger)
+    page_scheduler = get_host_scheduler(config)
+    
     page_num = start_page
     consecutive_empty_pages = 0
     
@@ -302,60 +482,21 @@ def fetch_with_requests_only_javdb(url: str, logger, max_pages: int = -1, config
             page_url = page_url.replace(' ', '%20')
             logger.info(f"  JAVDB - 抓取第 {page_num} 页: {page_url}")
             
-            # 随机延时
-            time.sleep(random.uniform(2.0, 4.0))  # JAVDB可能需要更长的延时
+            # 按站点限速（所有工作线程共享，间隔由 delay_between_pages 决定）
+            page_scheduler.wait(page_url)
             
             try:
-                resp = requests.get(page_url, headers=headers, timeout=20, proxies=proxies, verify=False)
+                resp = http_get(page_url, headers=headers, timeout=20, proxies=proxies, verify=False)
                 resp.raise_for_status()
                 
                 # 检查编码
                 if resp.encoding.lower() != 'utf-8':
                     resp.encoding = 'utf-8'
                 
-                soup = BeautifulSoup(resp.text, 'html.parser')
-                
-                # JAVDB特定的选择器
-                page_titles = set()
-                page_videos = []  # 用于智能缓存
-                
-                # 选择器1: JAVDB特有的视频标题选择器
-                for elem in soup.select('a.video-title, .movie-title a, .film-title a'):
-                    title = elem.get_text(strip=True)
-                    if title and len(title) > 3:
-                        container = elem.find_parent(['div', 'article', 'li']) or elem
-                        if not _is_javdb_video_belong_to_model(container, model_name, url, logger):
-                            continue
-                        # 对在线标题应用清理流程
-                        cleaned_title = clean_javdb_title(title, config.get('filename_clean_patterns', []))
-                        page_titles.add(cleaned_title)
-                        video_url = elem.get('href')
-                        if video_url:
-                            if not video_url.startswith('http'):
-                                video_url = urljoin(url, video_url)
-                            title_to_url[cleaned_title] = video_url
-                            page_videos.append((cleaned_title, video_url))
+                soup = make_soup(resp.text, config)
                 
-                # 选择器2: 通用标题选择器
-                if not page_titles:
-                    for elem in soup.select('.title, .video-title, h3.title'):
-                        title = elem.get_text(strip=True)
-                        if title and len(title) > 3:
-                            container = elem.find_parent(['div', 'article', 'li']) or elem
-                            if not _is_javdb_video_belong_to_model(container, model_name, url, logger):
-                                continue
-                            cleaned_title = clean_javdb_title(title, config.get('filename_clean_patterns', []))
-                            page_titles.add(cleaned_title)
-                            # 尝试找到父链接
-                            link_elem = elem.find_parent('a')
-                            if link_elem:
-                                video_url = link_elem.get('href')
-                                if video_url:
-                                    if not video_url.startswith('http'):
-                                        video_url = urljoin(url, video_url)
-                                    title_to_url[cleaned_title] = video_url
-                                    page_videos.append((cleaned_title, video_url))
-
+                page_titles, page_videos = extract_javdb_listing_page(soup, url, config, ownership, logger)
+                title_to_url.update(page_videos)
                 
                 if page_titles:
                     prev_count = len(all_titles)
@@ -367,8 +508,8 @@ def fetch_with_requests_only_javdb(url: str, logger, max_pages: int = -1, config
                     # 更新智能缓存
                     if smart_cache and model_name:
                         videos_with_page = [(title, url, page_num) for title, url in page_videos]
-                        smart_cache.add_videos(model_name, videos_with_page)
-                        smart_cache.update_page_timestamp(model_name, page_num)
+                        # 内容哈希未变化时只刷新时间戳
+                        smart_cache.save_page(model_name, page_num, videos_with_page)
                     
                     # 显示样本
                     if page_num == 1 or page_num == start_page:
@@ -377,6 +518,11 @@ def fetch_with_requests_only_javdb(url: str, logger, max_pages: int = -1, config
                             logger.info(f"    样本{i}: {title[:80]}{'...' if len(title) > 80 else ''}")
                     
                     consecutive_empty_pages = 0
+                    
+                    if early_stop.observe_page(page_titles):
+                        logger.info(f"  JAVDB - 第 {page_num} 页内容均已缓存，提前停止翻页")
+                        early_stop.merge_cached(all_titles, title_to_url)
+                        break
                 else:
                     logger.warning(f"  JAVDB - 第 {page_num} 页未找到视频标题")
                     consecutive_empty_pages += 1
@@ -385,46 +531,7 @@ def fetch_with_requests_only_javdb(url: str, logger, max_pages: int = -1, config
                         break
                 
                 # 检查是否有下一页
-                has_next = False
-                
-                # JAVDB特定的分页检查
-                next_buttons = soup.select('a.next, a[rel="next"], .pagination-next, .page-item.next a')
-                if next_buttons:
-                    for button in next_buttons:
-                        text = button.get_text(strip=True).lower()
-                        href = button.get('href', '')
-                        if text in ['next', '>', '下一页', '下一頁'] or 'page=' in href:
-                            # 检查是否是最后一页
-                            if 'page=' in href:
-                                # 提取page参数值
-                                page_param = href.split('page=')[-1].split('&')[0]
-                                if page_param.isdigit():
-                                    # 如果page参数值小于等于当前页，说明是最后一页
-                                    if int(page_param) <= page_num:
-                                        continue
-                            # 检查按钮是否可见或可用
-                            style = button.get('style', '')
-                            if 'display: none' in style or 'visibility: hidden' in style:
-                                continue
-                            has_next = True
-                            break
-                
-                # 尝试通用分页检查
-                if not has_next:
-                    pagination = soup.select_one('.pagination, .pages, .pageNumbers, .pagination.pagination-themed')
-                    if pagination:
-                        # 查找当前页和最大页
-                        page_links = pagination.select('a')
-                        page_numbers = []
-                        for link in page_links:
-                            text = link.get_text(strip=True)
-                            if text.isdigit():
-                                page_numbers.append(int(text))
-                        
-                        if page_numbers:
-                            max_page = max(page_numbers)
-                            if page_num < max_page:
-                                has_next = True
+                has_next = javdb_has_next_page(soup, page_num, logger)
                 
                 if not has_next:
                     logger.info("  JAVDB - 没有下一页，停止抓取")
@@ -447,6 +554,10 @@ def fetch_with_requests_only_javdb(url: str, logger, max_pages: int = -1, config
     except Exception as e:
         logger.error(f"  JAVDB - Requests抓取失败: {e}")
     
+    # 写入只在内存中刷新的页面时间戳（未变化的页面不逐页重写缓存文件）
+    if smart_cache and model_name:
+        smart_cache.flush(model_name)
+    
     logger.info(f"  JAVDB - 总共提取到 {len(all_titles)} 个视频标题")
     return all_titles, title_to_url
 
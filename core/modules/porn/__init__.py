@@ -1,23 +1,31 @@
 # PORN module initialization
+# 下载器依赖 yt-dlp 等重量级模块，按需导入：只做查重抓取（porn.porn）时不会加载
 
-# 统一下载器（推荐使用）
-from .unified_downloader import (
-    UnifiedDownloader,
-    download_porn_video,
-    download_porn_videos
-)
+import importlib
 
-# V1-Standard下载器（直接使用）
-from .downloader import (
-    PornDownloader,
-    download_porn_video as download_porn_video_v1,
-    download_porn_urls as download_porn_urls_v1
-)
+# 导出名 -> (子模块, 属性名)
+_LAZY_EXPORTS = {
+    # 统一下载器（推荐使用）
+    'UnifiedDownloader': ('unified_downloader', 'UnifiedDownloader'),
+    'download_porn_video': ('unified_downloader', 'download_porn_video'),
+    'download_porn_videos': ('unified_downloader', 'download_porn_videos'),
+    # V1-Standard下载器（直接使用）
+    'PornDownloader': ('downloader', 'PornDownloader'),
+    'download_porn_video_v1': ('downloader', 'download_porn_video'),
+    'download_porn_urls_v1': ('downloader', 'download_porn_urls'),
+    # V3-Advanced下载器（直接使用）
+    'PornHubDownloaderV3Fixed': ('downloader_v3_fixed', 'PornHubDownloaderV3Fixed'),
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = _LAZY_EXPORTS[name]
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), attr)
+    globals()[name] = value
+    return value
 
-# V3-Advanced下载器（直接使用）
-from .downloader_v3_fixed import (
-    PornHubDownloaderV3Fixed
-)
 
 __all__ = [
     'UnifiedDownloader',          # 推荐的统一调度器
@@ -27,4 +35,4 @@ __all__ = [
     'download_porn_video_v1',     # V1直接函数
     'download_porn_videos_v1',    # V1直接函数
     'PornHubDownloaderV3Fixed',   # V3原始类
-]
\ No newline at end of file
+]
@@ -7,8 +7,10 @@ import os
 import re
 import json
 import logging
+import threading
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse, parse_qs
 
 import requests
@@ -17,6 +19,11 @@ from bs4 import BeautifulSoup
 
 # 导入项目通用模块
 from core.modules.common.common import get_config, get_session, ensure_dir_exists
+from core.modules.common.video_info_cache import get_video_info_cache
+from core.modules.common.bandwidth_limiter import get_bandwidth_limiter
+from core.modules.common.download_scheduler import DownloadScheduler, DownloadJob
+from core.modules.common.download_index import get_download_index
+from core.modules.common.download_feedback import record_download_success
 
 
 # 设置日志
@@ -37,6 +44,12 @@ class PornDownloader:
         self.config = config or get_config()
         self.session = get_session()
         self.progress_callback = progress_callback
+        # 视频信息缓存（重试/降级时复用提取结果）
+        self.info_cache = get_video_info_cache(self.config)
+        # 共享带宽限速（与异步下载引擎、V3 分片下载共用）
+        self.bandwidth = get_bandwidth_limiter(self.config)
+        self._bandwidth_seen: Dict[str, int] = {}
+        self._bandwidth_lock = threading.Lock()
         
         # 配置代理
         if self.config.get('network', {}).get('proxy', {}).get('enabled', False):
@@ -99,8 +112,22 @@ class PornDownloader:
             if os.path.exists(self.cookies_file):
                 self.download_options['cookiefile'] = self.cookies_file
     
+    def _throttle_bandwidth(self, d: Dict) -> None:
+        """按共享限速器限制 yt-dlp 的下载速度（进度回调在读取循环中同步调用，在此等待即可限速）"""
+        key = d.get('tmpfilename') or d.get('filename') or ''
+        with self._bandwidth_lock:
+            if d['status'] != 'downloading':
+                self._bandwidth_seen.pop(key, None)
+                return
+            downloaded = d.get('downloaded_bytes') or 0
+            delta = downloaded - self._bandwidth_seen.get(key, 0)
+            self._bandwidth_seen[key] = downloaded
+        if delta > 0:
+            self.bandwidth.throttle(delta, (d.get('info_dict') or {}).get('url', ''))
+    
     def _progress_hook(self, d: Dict) -> None:
         """下载进度回调"""
+        self._throttle_bandwidth(d)
         if d['status'] == 'downloading':
             percent_str = d.get('_percent_str', 'N/A')
             speed_str = d.get('_speed_str', 'N/A')
@@ -207,6 +234,25 @@ class PornDownloader:
             logger.warning(f"提取视频信息失败: {e}")
             return "Unknown_Title", "Unknown_Model"
     
+    def _extract_info_once(self, url: str, ydl_opts: Dict) -> Optional[Dict]:
+        """提取视频信息（不下载），优先使用缓存，同一视频只运行一次提取器"""
+        info = self.info_cache.get(url)
+        if info is not None:
+            logger.info(f"♻️ 使用缓存的视频信息，跳过重复提取: {url}")
+            return info
+        
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            return self._extract_fresh_info(ydl, url)
+    
+    def _extract_fresh_info(self, ydl, url: str) -> Optional[Dict]:
+        """运行提取器并更新缓存"""
+        info = ydl.extract_info(url, download=False)
+        if info:
+            # 清理为可序列化的字典，之后可直接交给 process_ie_result 下载
+            info = ydl.sanitize_info(info)
+            self.info_cache.put(url, info)
+        return info
+    
     def download_video(self, url: str, save_dir: Optional[str] = None) -> Dict:
         """
         下载单个视频
@@ -220,69 +266,101 @@ class PornDownloader:
         """
         logger.info(f"开始下载视频: {url}")
         
-        # 提取视频信息
-        title, model_name = self._extract_video_info(url)
-        
-        # 确定保存目录
-        if save_dir:
-            save_path = Path(save_dir)
-            ensure_dir_exists(save_path)
-        else:
-            save_path = self._get_model_dir(model_name)
-        
-        # 配置yt-dlp选项
-        ydl_opts = self.download_options.copy()
-        # 使用PRON标准命名格式：[Channel] 模特名/视频标题.扩展名
-        ydl_opts['outtmpl'] = str(save_path / '%(title)s.%(ext)s')
-        
-        # 配置代理
-        if self.proxies:
-            ydl_opts['proxy'] = self.proxies['http']
-        
         # 执行下载
         result = {
             'success': False,
             'url': url,
-            'title': title,
-            'model': model_name,
-            'save_path': str(save_path),
+            'title': None,
+            'model': None,
+            'save_path': None,
             'filename': None,
             'file_path': None,
             'error': None,
             'file_size': 0
         }
         
+        # 配置yt-dlp选项
+        ydl_opts = self.download_options.copy()
+        
+        # 配置代理
+        if self.proxies:
+            ydl_opts['proxy'] = self.proxies['http']
+        
         try:
+            # 提取一次视频信息（不下载），标题、模特名与实际下载都复用这份结果；
+            # 来自缓存的信息只用于标题与已存在检查（流地址带签名，可能已过期）
+            info = self.info_cache.get(url)
+            from_cache = info is not None
+            if from_cache:
+                logger.info(f"♻️ 使用缓存的视频信息检查标题与已存在文件: {url}")
+            else:
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    info = self._extract_fresh_info(ydl, url)
+            if not info:
+                raise Exception("无法提取视频信息")
+            
+            title = self._clean_title(info.get('title', ''))
+            uploader = info.get('uploader') or info.get('channel') or ''
+            if uploader or save_dir:
+                model_name = self._clean_title(uploader)
+            else:
+                # 提取器未给出上传者时才回退到解析页面
+                _, model_name = self._extract_video_info(url)
+            
+            # 确定保存目录
+            if save_dir:
+                save_path = Path(save_dir)
+                ensure_dir_exists(save_path)
+            else:
+                save_path = self._get_model_dir(model_name)
+            result.update({'title': title, 'model': model_name, 'save_path': str(save_path)})
+            
+            # 使用PRON标准命名格式：[Channel] 模特名/视频标题.扩展名
+            ydl_opts['outtmpl'] = str(save_path / '%(title)s.%(ext)s')
+            
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # 获取视频信息（不下载）
-                info = ydl.extract_info(url, download=False)
-                
                 # 格式化文件名 - PRON标准格式
-                safe_title = self._clean_title(info.get('title', title))
+                safe_title = title
                 ext = info.get('ext', 'mp4')
                 # PRON标准命名：直接使用标题，不添加ID
                 filename = f"{safe_title}.{ext}"
-                file_path = save_path / filename
                 
-                # 检查文件是否已存在
-                if file_path.exists():
+                # 检查文件是否已存在（目录索引，按对比规则归一化后匹配）
+                index = get_download_index(save_path, self.config)
+                file_path = index.find(filename, info.get('title', ''))
+                if file_path is not None:
                     logger.info(f"文件已存在，跳过下载: {file_path}")
                     result.update({
                         'success': True,
-                        'filename': filename,
+                        'filename': file_path.name,
                         'file_path': str(file_path),
                         'file_size': file_path.stat().st_size,
                         'message': '文件已存在'
                     })
                     return result
                 
-                # 实际下载
-                info = ydl.extract_info(url, download=True)
+                # 缓存的信息来自之前的查询或失败的尝试，下载前重新提取流地址
+                if from_cache:
+                    info = self._extract_fresh_info(ydl, url)
+                    if not info:
+                        raise Exception("无法提取视频信息")
+                
+                # 实际下载（直接处理已提取的信息，不再重新提取）
+                try:
+                    info = ydl.process_ie_result(info, download=True)
+                except Exception:
+                    # 流地址过期或被拒绝（403 等）时不能复用，重试时重新提取
+                    self.info_cache.invalidate(url)
+                    raise
+                if not info:
+                    self.info_cache.invalidate(url)
+                    raise Exception("下载失败，未返回视频信息")
                 
                 # 获取下载后的文件路径
                 downloaded_file = ydl.prepare_filename(info)
                 
                 if os.path.exists(downloaded_file):
+                    index.add(downloaded_file)
                     result.update({
                         'success': True,
                         'filename': os.path.basename(downloaded_file),
@@ -370,25 +448,27 @@ class PornDownloader:
             ydl_opts['cookiefile'] = self.cookies_file
         
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
-                return {
-                    'success': True,
-                    'id': info.get('id'),
-                    'title': info.get('title'),
-                    'description': info.get('description'),
-                    'duration': info.get('duration'),
-                    'view_count': info.get('view_count'),
-                    'like_count': info.get('like_count'),
-                    'uploader': info.get('uploader'),
-                    'upload_date': info.get('upload_date'),
-                    'formats': info.get('formats', []),
-                    'thumbnail': info.get('thumbnail'),
-                    'webpage_url': info.get('webpage_url'),
-                    'is_live': info.get('is_live', False),
-                    'was_live': info.get('was_live', False)
-                }
+            # 与 download_video 共用缓存：先查询信息再下载时不会重复提取
+            info = self._extract_info_once(url, ydl_opts)
+            if not info:
+                raise Exception("无法提取视频信息")
+            
+            return {
+                'success': True,
+                'id': info.get('id'),
+                'title': info.get('title'),
+                'description': info.get('description'),
+                'duration': info.get('duration'),
+                'view_count': info.get('view_count'),
+                'like_count': info.get('like_count'),
+                'uploader': info.get('uploader'),
+                'upload_date': info.get('upload_date'),
+                'formats': info.get('formats', []),
+                'thumbnail': info.get('thumbnail'),
+                'webpage_url': info.get('webpage_url'),
+                'is_live': info.get('is_live', False),
+                'was_live': info.get('was_live', False)
+            }
                 
         except Exception as e:
             return {
@@ -446,31 +526,28 @@ def get_porn_video_info(url: str, config: Optional[Dict] = None) -> Dict:
     return downloader.get_video_info_only(url)
 
 
-def download_model_complete_directory(model_url: str, model_name: str, 
-                                 base_save_dir: Optional[str] = None, 
-                                 config: Optional[Dict] = None,
-                                 max_videos: Optional[int] = None,
-                                 log_callback: Optional[callable] = None,
-                                 progress_callback: Optional[callable] = None) -> Dict:
+def _tag_progress_callback(progress_callback: Optional[callable], model_name: str) -> Optional[callable]:
+    """并发下载时为进度字典附加模特名（_model）；GUI 按 (模特, 文件名) 汇总各文件的进度"""
+    if not progress_callback:
+        return None
+    
+    def wrapper(d):
+        if isinstance(d, dict):
+            d['_model'] = model_name
+        progress_callback(d)
+    return wrapper
+
+
+def _prepare_model_download(downloader: 'PornDownloader', model_url: str, model_name: str,
+                            base_save_dir: Optional[str], config: Optional[Dict],
+                            max_videos: Optional[int], log_callback: Optional[callable]) -> Tuple[Dict, List[Tuple[str, str]]]:
     """
-    完整下载模特目录的所有视频
+    准备单个模特的完整目录下载：获取视频列表、应用数量限制、跳过已存在的文件
     
-    Args:
-        model_url: 模特页面URL
-        model_name: 模特名称
-        base_save_dir: 基础保存目录（可选）
-        config: 配置字典（可选）
-        max_videos: 最大下载数量限制（可选）
-        log_callback: 日志回调函数（可选），接收字符串消息
-        progress_callback: 进度回调函数（可选），接收yt-dlp进度字典
-        
     Returns:
-        下载结果字典，包含统计信息
+        (结果字典, 待下载的 (标题, URL) 列表)
     """
-    logger.info(f"开始完整下载模特目录: {model_name}")
-    logger.info(f"模特URL: {model_url}")
-    
-    downloader = PornDownloader(config, progress_callback=progress_callback)
+    from datetime import datetime
     
     # 确定保存目录
     if base_save_dir:
@@ -492,102 +569,180 @@ def download_model_complete_directory(model_url: str, model_name: str,
         'total_size': 0,
         'download_details': [],
         'errors': [],
-        'start_time': None,
+        'start_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'end_time': None
     }
     
-    try:
-        from datetime import datetime
-        result['start_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
+    if log_callback:
+        log_callback(f"开始获取 {model_name} 的视频列表...")
+    
+    # 获取模特的所有视频URL
+    video_urls = _get_model_all_videos(model_url, config)
+    
+    if not video_urls:
+        result['errors'].append("无法获取模特视频列表")
+        result['message'] = "无法获取模特视频列表"
+        return result, []
+    
+    # 应用数量限制
+    if max_videos and len(video_urls) > max_videos:
+        video_urls = video_urls[:max_videos]
         if log_callback:
-            log_callback(f"开始获取 {model_name} 的视频列表...")
-        
-        # 获取模特的所有视频URL
-        video_urls = _get_model_all_videos(model_url, config)
-        
-        if not video_urls:
-            result['errors'].append("无法获取模特视频列表")
-            result['message'] = "无法获取模特视频列表"
-            return result
+            log_callback(f"限制下载数量为: {max_videos}")
+    
+    result['total_videos'] = len(video_urls)
+    
+    # 目录只扫描一次，之后每个视频 O(1) 判断是否已下载
+    index = get_download_index(save_dir, config or downloader.config)
+    
+    pending = []
+    for title, url in video_urls:
+        # 检查文件是否已存在（download_video 保存为清理后的标题，同时按原标题归一化匹配）
+        existing = index.find(downloader._clean_title(title), title)
         
-        # 应用数量限制
-        if max_videos and len(video_urls) > max_videos:
-            video_urls = video_urls[:max_videos]
+        if existing is not None:
+            result['skipped_downloads'] += 1
             if log_callback:
-                log_callback(f"限制下载数量为: {max_videos}")
-        
-        result['total_videos'] = len(video_urls)
-        
+                log_callback(f"跳过已存在: {title[:50]}...")
+            result['download_details'].append({
+                'title': title,
+                'url': url,
+                'status': 'skipped',
+                'reason': 'file_exists',
+                'file_path': str(existing)
+            })
+            continue
+        pending.append((title, url))
+    
+    if log_callback:
+        log_callback(f"找到 {len(video_urls)} 个视频，待下载 {len(pending)} 个，开始下载...")
+    
+    return result, pending
+
+
+def _record_video_result(result: Dict, title: str, url: str, download_result: Optional[Dict],
+                         error: Optional[BaseException], log_callback: Optional[callable]) -> None:
+    """把单个视频的下载结果计入模特结果字典"""
+    if error is not None:
+        result['failed_downloads'] += 1
+        error_msg = str(error)
+        result['errors'].append(f"处理视频时异常: {error_msg}")
         if log_callback:
-            log_callback(f"找到 {len(video_urls)} 个视频，开始下载...")
-        
-        # 批量下载
-        for i, (title, url) in enumerate(video_urls, 1):
-            try:
-                if log_callback:
-                    log_callback(f"下载进度: {i}/{len(video_urls)} - {title[:50]}...")
-                
-                # 检查文件是否已存在
-                safe_title = downloader._clean_title(title)
-                potential_files = list(save_dir.glob(f"{safe_title}_*.*"))
-                
-                if potential_files:
-                    result['skipped_downloads'] += 1
-                    if log_callback:
-                        log_callback(f"跳过已存在: {title[:50]}...")
-                    result['download_details'].append({
-                        'title': title,
-                        'url': url,
-                        'status': 'skipped',
-                        'reason': 'file_exists'
-                    })
-                    continue
-                
-                # 下载视频
-                download_result = downloader.download_video(url, str(save_dir))
-                
-                if download_result['success']:
-                    result['successful_downloads'] += 1
-                    result['total_size'] += download_result.get('file_size', 0)
-                    if log_callback:
-                        log_callback(f"✅ 下载成功: {title[:50]}...")
-                    result['download_details'].append({
-                        'title': title,
-                        'url': url,
-                        'status': 'success',
-                        'file_path': download_result.get('file_path'),
-                        'file_size': download_result.get('file_size', 0)
-                    })
-                else:
-                    result['failed_downloads'] += 1
-                    error_msg = download_result.get('message', download_result.get('error', 'Unknown error'))
-                    result['errors'].append(f"{title}: {error_msg}")
-                    if log_callback:
-                        log_callback(f"❌ 下载失败: {title[:50]}... - {error_msg}")
-                    result['download_details'].append({
-                        'title': title,
-                        'url': url,
-                        'status': 'failed',
-                        'error': error_msg
-                    })
-                    
-            except Exception as e:
-                result['failed_downloads'] += 1
-                error_msg = str(e)
-                result['errors'].append(f"处理视频时异常: {error_msg}")
-                if log_callback:
-                    log_callback(f"❌ 处理异常: {error_msg}")
+            log_callback(f"❌ 处理异常: {error_msg}")
+        return
+    
+    if download_result['success']:
+        result['successful_downloads'] += 1
+        result['total_size'] += download_result.get('file_size', 0)
+        if log_callback:
+            log_callback(f"✅ 下载成功: {title[:50]}...")
+        result['download_details'].append({
+            'title': title,
+            'url': url,
+            'status': 'success',
+            'file_path': download_result.get('file_path'),
+            'file_size': download_result.get('file_size', 0)
+        })
+    else:
+        result['failed_downloads'] += 1
+        error_msg = download_result.get('message', download_result.get('error', 'Unknown error'))
+        result['errors'].append(f"{title}: {error_msg}")
+        if log_callback:
+            log_callback(f"❌ 下载失败: {title[:50]}... - {error_msg}")
+        result['download_details'].append({
+            'title': title,
+            'url': url,
+            'status': 'failed',
+            'error': error_msg
+        })
+
+
+def _finish_model_result(result: Dict) -> Dict:
+    """填写结束时间与汇总信息"""
+    from datetime import datetime
+    result['end_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    # 判断整体成功
+    result['success'] = result['successful_downloads'] > 0
+    result['message'] = f"下载完成: 成功 {result['successful_downloads']}, 失败 {result['failed_downloads']}, 跳过 {result['skipped_downloads']}"
+    return result
+
+
+def _run_download_jobs(jobs: List[DownloadJob], config: Optional[Dict],
+                       log_callback_for: Callable[[str], Optional[callable]]) -> Dict[str, int]:
+    """
+    用共享调度器并发执行下载任务（下载成功的视频立即回写目录索引与查重状态）
+    
+    Args:
+        jobs: 下载任务（payload 为 (模特结果字典, 标题)）
+        config: 配置字典（download.max_workers / per_host_limit）
+        log_callback_for: 按模特名返回日志回调
+    """
+    config = config or get_config()
+    scheduler = DownloadScheduler.from_config(config)
+    
+    def on_start(job: DownloadJob, index: int, total: int):
+        log_callback = log_callback_for(job.group)
+        if log_callback:
+            log_callback(f"下载进度: {index}/{total} - {job.label[:50]}...")
+    
+    def on_complete(job: DownloadJob, download_result: Optional[Dict], error: Optional[BaseException]):
+        model_result, title = job.payload
+        _record_video_result(model_result, title, job.url, download_result, error, log_callback_for(job.group))
+        if error is None and download_result.get('success'):
+            record_download_success(config, job.group, job.url, download_result.get('file_path'),
+                                    save_dir=model_result['save_dir'], title=title)
+    
+    return scheduler.run(jobs, on_start=on_start, on_complete=on_complete)
+
+
+def download_model_complete_directory(model_url: str, model_name: str, 
+                                 base_save_dir: Optional[str] = None, 
+                                 config: Optional[Dict] = None,
+                                 max_videos: Optional[int] = None,
+                                 log_callback: Optional[callable] = None,
+                                 progress_callback: Optional[callable] = None) -> Dict:
+    """
+    完整下载模特目录的所有视频（按 download.max_workers 并发下载）
+    
+    Args:
+        model_url: 模特页面URL
+        model_name: 模特名称
+        base_save_dir: 基础保存目录（可选）
+        config: 配置字典（可选）
+        max_videos: 最大下载数量限制（可选）
+        log_callback: 日志回调函数（可选），接收字符串消息
+        progress_callback: 进度回调函数（可选），接收yt-dlp进度字典
         
-        result['end_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    Returns:
+        下载结果字典，包含统计信息
+    """
+    logger.info(f"开始完整下载模特目录: {model_name}")
+    logger.info(f"模特URL: {model_url}")
+    
+    downloader = PornDownloader(config, progress_callback=progress_callback)
+    result = None
+    
+    try:
+        result, pending = _prepare_model_download(
+            downloader, model_url, model_name, base_save_dir, config, max_videos, log_callback
+        )
+        if result.get('message'):
+            return result
         
-        # 判断整体成功
-        result['success'] = result['successful_downloads'] > 0
-        result['message'] = f"下载完成: 成功 {result['successful_downloads']}, 失败 {result['failed_downloads']}, 跳过 {result['skipped_downloads']}"
+        jobs = [
+            DownloadJob(group=model_name, url=url, label=title,
+                        func=partial(downloader.download_video, url, result['save_dir']),
+                        payload=(result, title))
+            for title, url in pending
+        ]
+        _run_download_jobs(jobs, config, lambda _model: log_callback)
         
-        return result
+        return _finish_model_result(result)
         
     except Exception as e:
+        if result is None:
+            result = {'success': False, 'model_name': model_name, 'model_url': model_url, 'errors': []}
         result['errors'].append(f"批量下载异常: {str(e)}")
         result['message'] = f"批量下载失败: {str(e)}"
         return result
@@ -638,6 +793,9 @@ def batch_download_models(models_info: List[Tuple[str, str, str]],
     """
     批量下载多个模特的完整目录
     
+    先依次获取各模特的视频列表，再把所有待下载视频交给同一个调度器：
+    全局并发受 download.max_workers 限制，各模特的视频轮转交错下载。
+    
     Args:
         models_info: [(model_name, model_url, save_dir)] 的列表
         base_save_dir: 基础保存目录（可选）
@@ -664,10 +822,16 @@ def batch_download_models(models_info: List[Tuple[str, str, str]],
         'end_time': None
     }
     
+    def model_log_callback(model_name: str) -> Optional[callable]:
+        return (lambda msg: log_callback(f"  [{model_name}] {msg}")) if log_callback else None
+    
     try:
         from datetime import datetime
         results['start_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
+        # 1. 获取各模特的视频列表
+        prepared = []
+        jobs = []
         for i, (model_name, model_url, custom_save_dir) in enumerate(models_info, 1):
             try:
                 if log_callback:
@@ -676,31 +840,25 @@ def batch_download_models(models_info: List[Tuple[str, str, str]],
                 # 确定保存目录
                 save_dir = custom_save_dir or base_save_dir
                 
-                # 下载单个模特的完整目录
-                model_result = download_model_complete_directory(
-                    model_url=model_url,
-                    model_name=model_name,
-                    base_save_dir=save_dir,
-                    config=config,
-                    max_videos=max_videos_per_model,
-                    log_callback=lambda msg: log_callback(f"  {msg}") if log_callback else None,
-                    progress_callback=progress_callback
+                downloader = PornDownloader(
+                    config, progress_callback=_tag_progress_callback(progress_callback, model_name)
                 )
+                model_result, pending = _prepare_model_download(
+                    downloader, model_url, model_name, save_dir, config,
+                    max_videos_per_model, model_log_callback(model_name)
+                )
+                prepared.append(model_result)
                 
-                results['model_results'].append(model_result)
-                
-                if model_result['success']:
-                    results['successful_models'] += 1
-                    results['total_videos'] += model_result['total_videos']
-                    results['total_downloaded'] += model_result['successful_downloads']
-                    results['total_size'] += model_result['total_size']
-                else:
-                    results['failed_models'] += 1
+                for title, url in pending:
+                    jobs.append(DownloadJob(
+                        group=model_name, url=url, label=title,
+                        func=partial(downloader.download_video, url, model_result['save_dir']),
+                        payload=(model_result, title)
+                    ))
                     
             except Exception as e:
-                results['failed_models'] += 1
                 error_msg = str(e)
-                results['model_results'].append({
+                prepared.append({
                     'model_name': model_name,
                     'success': False,
                     'error': error_msg,
@@ -709,6 +867,25 @@ def batch_download_models(models_info: List[Tuple[str, str, str]],
                 if progress_callback:
                     progress_callback(f"❌ 模特 {model_name} 处理失败: {error_msg}")
         
+        # 2. 所有模特的视频统一调度下载
+        if jobs and log_callback:
+            log_callback(f"共 {len(jobs)} 个视频待下载，开始并发下载...")
+        _run_download_jobs(jobs, config, model_log_callback)
+        
+        # 3. 汇总各模特结果
+        for model_result in prepared:
+            if 'download_details' in model_result and not model_result.get('message'):
+                _finish_model_result(model_result)
+            results['model_results'].append(model_result)
+            
+            if model_result['success']:
+                results['successful_models'] += 1
+                results['total_videos'] += model_result['total_videos']
+                results['total_downloaded'] += model_result['successful_downloads']
+                results['total_size'] += model_result['total_size']
+            else:
+                results['failed_models'] += 1
+        
         results['end_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         results['success'] = results['successful_models'] > 0
         
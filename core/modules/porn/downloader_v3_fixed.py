@@ -21,6 +21,8 @@ import threading
 from bs4 import BeautifulSoup
 
 from core.modules.common.common import get_config, ensure_dir_exists
+from core.modules.common.video_info_cache import get_video_info_cache
+from core.modules.common.hls_downloader import HlsSegmentDownloader, parse_m3u8_segments
 
 logger = logging.getLogger(__name__)
 
@@ -370,58 +372,19 @@ class PornHubDownloaderV3Fixed:
             logger.debug(f"M3U8内容行数: {len(m3u8_content.split(chr(10)))}")
             
             # 解析片段URL
-            segment_urls = []
-            for line in m3u8_content.split('\n'):
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    if line.startswith('http'):
-                        segment_urls.append(line)
-                    elif line.startswith('/'):
-                        segment_urls.append(urljoin(self.api_base, line))
-                    else:
-                        # 相对URL
-                        base_url = '/'.join(m3u8_url.split('/')[:-1])
-                        segment_urls.append(f"{base_url}/{line}")
+            segment_urls = parse_m3u8_segments(m3u8_content, m3u8_url, self.api_base)
             
             if not segment_urls:
                 logger.error(f"❌ 未找到M3U8片段")
                 return False
             
-            logger.info(f"📦 发现 {len(segment_urls)} 个片段，开始下载...")
+            segment_downloader = HlsSegmentDownloader.from_config(self.session, self.config)
+            logger.info(f"📦 发现 {len(segment_urls)} 个片段，开始下载（并发 {segment_downloader.workers}）...")
             
-            # 确保保存目录存在
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # 下载并组装片段
-            temp_file = Path(str(file_path) + '.tmp')
-            downloaded = 0
-            failed_count = 0
-            
-            with open(temp_file, 'wb') as f:
-                for i, segment_url in enumerate(segment_urls):
-                    try:
-                        response = self.session.get(segment_url, timeout=15)
-                        response.raise_for_status()
-                        f.write(response.content)
-                        downloaded += 1
-                        
-                        if (i + 1) % max(1, len(segment_urls) // 10) == 0:
-                            progress = ((i + 1) / len(segment_urls)) * 100
-                            logger.info(f"进度: {progress:.1f}% ({i+1}/{len(segment_urls)})")
-                    
-                    except Exception as e:
-                        failed_count += 1
-                        logger.debug(f"片段 {i+1}/{len(segment_urls)} 失败: {str(e)[:60]}")
-                        
-                        # 如果失败过多，放弃
-                        if failed_count > len(segment_urls) * 0.2:  # 20%失败率
-                            logger.error(f"❌ 片段下载失败率过高 ({failed_count}/{len(segment_urls)})")
-                            return False
-                        
-                        continue
+            # 并发下载片段并按顺序组装（支持断点续传）
+            if not segment_downloader.download(segment_urls, file_path):
+                return False
             
-            # 重命名临时文件
-            temp_file.rename(file_path)
             logger.info(f"✅ M3U8下载完成: {file_path.name} ({file_path.stat().st_size / (1024*1024):.2f}MB)")
             
             return True
@@ -477,12 +440,17 @@ class PornHubDownloaderV3Fixed:
             
             logger.info(f"✅ M3U8 URL: {m3u8_url[:100]}")
             
+            # V1 降级过来时复用其已提取的视频信息（标题/上传者），无需再解析页面
+            cached_info = get_video_info_cache(self.config).get(url) or {}
+            
             # 计算保存路径 - PRON标准目录结构
             if save_dir:
                 save_path = Path(save_dir)
             else:
                 # 提取模特名创建标准目录结构
                 model_name = self._extract_model_name(video_id, html if 'html' in locals() else None)
+                if model_name == "Unknown_Model" and cached_info.get('uploader'):
+                    model_name = cached_info['uploader']
                 safe_model_name = self._clean_title(model_name)
                 save_path = self.output_dir / f"[Channel] {safe_model_name}"
             
@@ -491,7 +459,7 @@ class PornHubDownloaderV3Fixed:
             # 生成文件名 - PRON标准命名
             title = self._extract_title(html) if 'html' in locals() else None
             if not title:
-                title = f"Video_{video_id}"
+                title = cached_info.get('title') or f"Video_{video_id}"
             safe_title = self._clean_title(title)
             file_path = save_path / f"{safe_title}.mp4"
             
@@ -1,15 +1,71 @@
 import os
-import time
-import random
 import re
+import time
 import requests
 from typing import Set, Dict, List, Tuple
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
+
+from ..common.html_parser import make_soup, compile_selector
+from ..common.host_scheduler import get_host_scheduler
+from ..common.http_client import http_get
+from ..common.smart_cache import IncrementalStopTracker
+
+# 预编译的列表页选择器（每页都会用到）
+_VIDEO_CONTAINER_SELECTOR = compile_selector('div.videoContainer, div.video, div.videoBrick, .nf-video-item')
+_CONTAINER_TITLE_SELECTOR = compile_selector('a.title, span.title, a.nf-video-hover-title, .videoTitle')
+_THUMBNAIL_TITLE_SELECTOR = compile_selector('a.thumbnailTitle')
+
+# 模特页缓存版本：严格归属规则（ModelOwnershipMatcher）变化时递增，
+# 旧版本缓存会在下次抓取时整体重建
+MODEL_PAGE_CACHE_VERSION = 1
+
+
+def _is_cached_video_valid(title: str, video_info: dict, model_url: str) -> bool:
+    """校验模特页缓存条目：标题有效、链接为同站点的视频链接"""
+    if not title or len(title) <= 3:
+        return False
+    
+    video_url = (video_info or {}).get('url') or ''
+    if not video_url.startswith(('http://', 'https://')):
+        return False
+    
+    def _host(u: str) -> str:
+        host = urlparse(u).netloc.lower()
+        return host[4:] if host.startswith('www.') else host
+    
+    if _host(video_url) != _host(model_url):
+        return False
+    # 指向模特/频道主页的链接不是视频条目
+    return '/model/' not in video_url and '/channels/' not in video_url
+
+
+def reconcile_model_page_cache(smart_cache, model_name: str, url: str, logger):
+    """模特页缓存校验：只剔除不可信条目，保留其余缓存以支持增量抓取"""
+    try:
+        stats = smart_cache.reconcile_model_cache(
+            model_name, MODEL_PAGE_CACHE_VERSION,
+            lambda title, info: _is_cached_video_valid(title, info, url)
+        )
+    except Exception as e:
+        logger.warning(f"  ⚠️ 缓存校验失败，清理 {model_name} 的缓存: {e}")
+        try:
+            smart_cache.clear_cache(model_name)
+        except Exception as e:
+            logger.warning(f"  ⚠️ 缓存清除失败: {e}")
+        return
+    
+    if stats['reset']:
+        logger.info(f"  🚨 {model_name} 的缓存版本过旧，已重建（移除 {stats['removed']} 条）")
+    elif stats['removed']:
+        logger.info(f"  🧹 {model_name} 缓存校验：剔除 {stats['removed']} 条无效记录，保留 {stats['kept']} 条")
+    else:
+        logger.info(f"  ✅ {model_name} 缓存校验通过，保留 {stats['kept']} 条记录")
+
 
 # --- PORN特定功能 ---
 def fetch_with_requests_porn(url: str, logger, max_pages: int = -1, config: dict = None,
-                                smart_cache=None, model_name: str = None) -> Tuple[Set[str], Dict[str, str]]:
+                                smart_cache=None, model_name: str = None,
+                                browser_pool=None) -> Tuple[Set[str], Dict[str, str]]:
     """PORN专用的抓取，支持requests和Selenium，抓取视频标题和链接，支持翻页（支持增量更新）"""
     if config is None:
         config = {}
@@ -21,17 +77,13 @@ def fetch_with_requests_porn(url: str, logger, max_pages: int = -1, config: dict
     # 🚨 关键修复：对于模特页面，强制使用更严格的抓取模式
     if model_name and '/model/' in url:
         logger.info(f"  🎯 检测到模特专属页面，启用严格抓取模式")
-        # 模特页：强制清理该模特缓存，避免历史误抓导致的“视频数暴涨”
+        # 模特页：校验缓存而不是整体清理，旧规则写入的缓存（历史误抓导致“视频数暴涨”）会被重建
         if smart_cache and smart_cache.enabled:
-            logger.info(f"  🚨 模特页启用严格模式：清理 {model_name} 的缓存")
-            try:
-                smart_cache.clear_cache(model_name)
-            except Exception as e:
-                logger.warning(f"  ⚠️ 缓存清除失败: {e}")
+            reconcile_model_page_cache(smart_cache, model_name, url, logger)
     
     if use_selenium or scraper == 'selenium':
         try:
-            return fetch_with_selenium_porn(url, logger, max_pages, config, smart_cache, model_name)
+            return fetch_with_selenium_porn(url, logger, max_pages, config, smart_cache, model_name, browser_pool)
         except Exception as e:
             logger.warning(f"  PORN - Selenium 抓取失败，回退到 requests: {e}")
             # 回退到 requests
@@ -41,7 +93,8 @@ def fetch_with_requests_porn(url: str, logger, max_pages: int = -1, config: dict
 
 
 def fetch_with_selenium_porn(url: str, logger, max_pages: int = -1, config: dict = None,
-                                smart_cache=None, model_name: str = None) -> Tuple[Set[str], Dict[str, str]]:
+                                smart_cache=None, model_name: str = None,
+                                browser_pool=None) -> Tuple[Set[str], Dict[str, str]]:
     """使用 Selenium 抓取 PORN 视频（支持增量更新）"""
     try:
         from ..common.selenium_helper import SeleniumHelper
@@ -62,14 +115,26 @@ def fetch_with_selenium_porn(url: str, logger, max_pages: int = -1, config: dict
             all_titles.update(cached_titles)
             logger.info(f"  PORN - 增量模式，已加载 {len(cached_titles)} 个缓存标题")
     
+    # 最新优先排序下，遇到全部已缓存的页面即可提前停止
+    early_stop = IncrementalStopTracker(smart_cache, model_name, config)
+    # 归属判定器：目标slug等只计算一次
+    ownership = ModelOwnershipMatcher(model_name, url, logger)
+    page_scheduler = get_host_scheduler(config)
+    # 页面加载后等待懒加载内容渲染（与站点限速无关）
+    settle_seconds = float(((config or {}).get('selenium', {}) or {}).get('page_settle_seconds', 2.0))
+    
     page_num = start_page
     consecutive_empty_pages = 0
     
     selenium = None
     try:
-        # 创建 Selenium 助手
-        selenium = SeleniumHelper(config)
-        selenium.driver = selenium.setup_driver()
+        if browser_pool:
+            # 复用当前工作线程的常驻浏览器
+            selenium = browser_pool.acquire()
+        else:
+            # 创建 Selenium 助手
+            selenium = SeleniumHelper(config)
+            selenium.driver = selenium.setup_driver()
         
         logger.info("  PORN - 使用 Selenium 模式抓取")
         
@@ -91,17 +156,23 @@ def fetch_with_selenium_porn(url: str, logger, max_pages: int = -1, config: dict
             
             logger.info(f"  PORN - Selenium 抓取第 {page_num} 页: {page_url}")
             
+            # 按站点限速（所有工作线程共享）
+            page_scheduler.wait(page_url)
+            
             # 访问页面
             if not selenium.get_page(page_url, wait_element='a.thumbnailTitle, .title, .video-title', wait_timeout=15):
                 logger.warning(f"  PORN - Selenium 页面加载失败")
                 break
             
-            # 随机延时
-            time.sleep(random.uniform(2.0, 4.0))
+            # 等待页面渲染完成
+            if settle_seconds > 0:
+                time.sleep(settle_seconds)
             
             # 获取页面源码
             page_source = selenium.get_page_source()
-            soup = BeautifulSoup(page_source, 'html.parser')
+            if browser_pool:
+                browser_pool.record_page()
+            soup = make_soup(page_source, config)
             
             # 提取标题
             page_titles = set()
@@ -109,19 +180,16 @@ def fetch_with_selenium_porn(url: str, logger, max_pages: int = -1, config: dict
             
             # 选择器1: 严格限定在模特视频容器内
             # 只从明确的视频容器中提取，避免抓取页面其他内容
-            video_containers = soup.select('div.videoContainer, div.video, div.videoBrick, .nf-video-item')
+            video_containers = _VIDEO_CONTAINER_SELECTOR.select(soup)
             page_titles = set()
             page_videos = []  # 用于智能缓存
             
             logger.debug(f"  找到 {len(video_containers)} 个视频容器")
             
-            for container in video_containers:
-                # 🚨 关键修复：严格验证视频归属
-                if not _is_video_belong_to_model(container, model_name, url, logger):
-                    continue
-                
+            # 🚨 关键修复：严格验证视频归属（整页批量过滤）
+            for container in ownership.filter(video_containers):
                 # 从容器内查找标题
-                title_elem = container.select_one('a.title, span.title, a.nf-video-hover-title, .videoTitle')
+                title_elem = _CONTAINER_TITLE_SELECTOR.select_one(container)
                 if not title_elem:
                     # 尝试其他可能的标题元素
                     title_elem = container.find('a', class_=lambda x: x and 'title' in x.lower()) or \
@@ -172,12 +240,12 @@ def fetch_with_selenium_porn(url: str, logger, max_pages: int = -1, config: dict
             
             # 选择器2: PORN特有的视频标题选择器（备选）
             if not page_titles:
-                for elem in soup.select('a.thumbnailTitle'):
+                for elem in _THUMBNAIL_TITLE_SELECTOR.select(soup):
                     title = elem.get_text(strip=True)
                     if title and len(title) > 3 and len(title) < 500:
                         # 🚨 关键修复：验证视频是否属于当前模特
                         parent_container = elem.find_parent('div', class_=['videoContainer', 'video', 'videoBrick'])
-                        if parent_container and not _is_video_belong_to_model(parent_container, model_name, url, logger):
+                        if parent_container and not ownership.matches(parent_container):
                             logger.debug(f"    跳过非当前模特的视频: {title[:50]}...")
                             continue
                         
@@ -238,8 +306,8 @@ def fetch_with_selenium_porn(url: str, logger, max_pages: int = -1, config: dict
                 # 更新智能缓存
                 if smart_cache and model_name:
                     videos_with_page = [(title, url, page_num) for title, url in page_videos]
-                    smart_cache.add_videos(model_name, videos_with_page)
-                    smart_cache.update_page_timestamp(model_name, page_num)
+                    # 内容哈希未变化时只刷新时间戳
+                    smart_cache.save_page(model_name, page_num, videos_with_page)
                 
                 if page_num == 1 or page_num == start_page:
                     sample = list(page_titles)[:5]
@@ -247,6 +315,11 @@ def fetch_with_selenium_porn(url: str, logger, max_pages: int = -1, config: dict
                         logger.info(f"    样本{i}: {title[:80]}{'...' if len(title) > 80 else ''}")
                 
                 consecutive_empty_pages = 0
+                
+                if early_stop.observe_page(page_titles):
+                    logger.info(f"  PORN - Selenium 第 {page_num} 页内容均已缓存，提前停止翻页")
+                    early_stop.merge_cached(all_titles, title_to_url)
+                    break
             else:
                 logger.warning(f"  PORN - Selenium 第 {page_num} 页未找到视频标题")
                 consecutive_empty_pages += 1
@@ -317,15 +390,174 @@ def fetch_with_selenium_porn(url: str, logger, max_pages: int = -1, config: dict
         
     except Exception as e:
         logger.error(f"  PORN - Selenium 抓取失败: {e}")
+        if browser_pool:
+            browser_pool.discard()
         raise
     finally:
-        if selenium:
+        if selenium and not browser_pool:
             selenium.close()
+        # 写入只在内存中刷新的页面时间戳（未变化的页面不逐页重写缓存文件）
+        if smart_cache and model_name:
+            smart_cache.flush(model_name)
     
     logger.info(f"  PORN - Selenium 总共提取到 {len(all_titles)} 个视频标题")
     return all_titles, title_to_url
 
 
+def extract_porn_listing_page(soup, url: str, config: dict, ownership, logger) -> Tuple[Set[str], List[Tuple[str, str]]]:
+    """
+    从列表页中提取属于目标模特的视频（requests 模式与异步抓取引擎共用）
+
+    Args:
+        soup: 列表页解析树
+        url: 模特主页URL（用于补全相对链接）
+        config: 配置字典
+        ownership: 归属判定器
+        logger: 日志记录器
+
+    Returns:
+        (页面标题集合, [(标题, 链接), ...])
+    """
+    clean_patterns = config.get('filename_clean_patterns', [])
+    # PORN特定的选择器
+    page_titles = set()
+    page_videos = []  # 用于智能缓存 [(title, url), ...]
+
+    # 选择器1: PORN特有的视频标题选择器
+    for elem in _THUMBNAIL_TITLE_SELECTOR.select(soup):
+        title = elem.get_text(strip=True)
+        if title and len(title) > 3:
+            # 🚨 关键修复：验证视频是否属于当前模特
+            parent_container = elem.find_parent('div', class_=['videoContainer', 'video', 'videoBrick'])
+            if parent_container and not ownership.matches(parent_container):
+                logger.debug(f"    跳过非当前模特的视频: {title[:50]}...")
+                continue
+
+            # 对在线标题应用清理流程
+            cleaned_title = clean_porn_title(title, clean_patterns)
+            page_titles.add(cleaned_title)
+            # 尝试提取链接 - 先从当前元素，改失败再向上查找
+            video_url = elem.get('href')
+            if not video_url:
+                # 如果当前元素没有href，尝试查找父上a标签
+                parent_a = elem.find_parent('a')
+                if parent_a:
+                    video_url = parent_a.get('href')
+
+            if video_url:
+                if not video_url.startswith('http'):
+                    video_url = urljoin(url, video_url)
+                page_videos.append((cleaned_title, video_url))
+            else:
+                # 即使没有链接，也要樸保标题存在
+                logger.debug(f"    注意: 找到了标题『{cleaned_title[:50]}...』但没有链接")
+
+    # 选择器2: 通用标题选择器（仅当第一个选择器没找到结果时）
+    if not page_titles:
+        for elem in soup.select('.title, .video-title, h3.title'):
+            title = elem.get_text(strip=True)
+            if title and len(title) > 3:
+                # 🚨 关键修复：验证视频是否属于当前模特
+                parent_container = elem.find_parent('div', class_=['videoContainer', 'video', 'videoBrick'])
+                if parent_container and not ownership.matches(parent_container):
+                    logger.debug(f"    跳过非当前模特的视频: {title[:50]}...")
+                    continue
+
+                # 额外的安全检查：确保标题和链接在同一视频容器内
+                parent_video_link = elem.find_parent('a', href=True)
+                if parent_video_link:
+                    video_url = parent_video_link.get('href')
+                    if video_url and not video_url.startswith('http'):
+                        video_url = urljoin(url, video_url)
+
+                    # 验证链接是否指向视频页面（而不是其他内容）
+                    if '/view_video.php?' not in video_url and '/video/' not in video_url:
+                        logger.debug(f"    跳过非视频链接: {video_url[:100]}...")
+                        continue
+
+                cleaned_title = clean_porn_title(title, clean_patterns)
+                page_titles.add(cleaned_title)
+                # 尝试找到父链接
+                link_elem = elem.find_parent('a')
+                if link_elem:
+                    video_url = link_elem.get('href')
+                    if video_url:
+                        if not video_url.startswith('http'):
+                            video_url = urljoin(url, video_url)
+                        page_videos.append((cleaned_title, video_url))
+                else:
+                    logger.debug(f"    注意: 找到了标题『{cleaned_title[:50]}...』但未找到链接父元素")
+    
+    return page_titles, page_videos
+
+
+def porn_has_next_page(soup, page_num: int, logger) -> bool:
+    """判断列表页是否还有下一页（requests 模式与异步抓取引擎共用）"""
+    # 检查是否有下一页
+    has_next = False
+
+    # PORN特定的分页检查
+    next_buttons = soup.select('a.next, a[rel="next"], li.next a, .pagination_next, .orangeButton')
+    if next_buttons:
+        for button in next_buttons:
+            text = button.get_text(strip=True).lower()
+            href = button.get('href', '')
+            # 更严格的下一页检测
+            if text in ['next', '>', '下一页', '→', 'next page'] or ('page=' in href and not 'javascript' in href.lower()):
+                # 检查是否是最后一页
+                if 'page=' in href:
+                    # 提取page参数值
+                    try:
+                        page_param = href.split('page=')[-1].split('&')[0]
+                        if page_param.isdigit():
+                            # 下一个页码应该大于当前页
+                            next_page_num = int(page_param)
+                            if next_page_num <= page_num:
+                                logger.debug(f"  PORN - 忽略无效下一页链接: {href}")
+                                continue
+                            # 🚨 紧急修复：防止无限循环 - 限制最大页数
+                            if next_page_num > 100:  # 安全限制
+                                logger.warning(f"  PORN - 检测到异常大的页码 {next_page_num}，可能存在分页循环，停止抓取")
+                                has_next = False
+                                break
+                    except:
+                        pass
+                # 检查按钮是否可见或可用（禁用状态检查）
+                style = button.get('style', '')
+                disabled = button.get('disabled')
+                class_attr = button.get('class', [])
+                if 'display: none' in style or 'visibility: hidden' in style or disabled or 'disabled' in str(class_attr):
+                    logger.debug(f"  PORN - 忽略已禁用的下一页按钮")
+                    continue
+                logger.debug(f"  PORN - 找到下一页按钮: {href}")
+                has_next = True
+                break
+
+    # 尝试通用分页检查（当上面没检测到时）
+    if not has_next:
+        pagination = soup.select_one('.pagination, .pages, .pageNumbers, .pagination.pagination-themed, nav.pagination')
+        if pagination:
+            # 查找所有页码链接
+            page_links = pagination.select('a')
+            page_numbers = []
+            for link in page_links:
+                text = link.get_text(strip=True)
+                if text.isdigit():
+                    page_numbers.append(int(text))
+
+            if page_numbers:
+                max_page = max(page_numbers)
+                # 🚨 紧急修复：添加安全检查
+                if max_page > 100:  # 异常大的页数
+                    logger.warning(f"  PORN - 检测到异常页数 {max_page}，可能存在分页错误，停止抓取")
+                    has_next = False
+                elif page_num < max_page:
+                    logger.debug(f"  PORN - 通用分页检测: 当前页={page_num}, 最大页={max_page}")
+                    has_next = True
+    
+    return has_next
+
+
 def fetch_with_requests_only_porn(url: str, logger, max_pages: int = -1, config: dict = None,
                                      smart_cache=None, model_name: str = None) -> Tuple[Set[str], Dict[str, str]]:
     """使用 requests 抓取 PORN 视频（支持增量更新）"""
@@ -365,6 +597,12 @@ def fetch_with_requests_only_porn(url: str, logger, max_pages: int = -1, config:
             all_titles.update(cached_titles)
             logger.info(f"  PORN - 增量模式，已加载 {len(cached_titles)} 个缓存标题")
     
+    # 最新优先排序下，遇到全部已缓存的页面即可提前停止
+    early_stop = IncrementalStopTracker(smart_cache, model_name, config)
+    # 归属判定器：目标slug等只计算一次
+    ownership = ModelOwnershipMatcher(model_name, url, logger)
+    page_scheduler = get_host_scheduler(config)
+    
     page_num = start_page
     consecutive_empty_pages = 0
     
@@ -389,89 +627,21 @@ def fetch_with_requests_only_porn(url: str, logger, max_pages: int = -1, config:
             page_url = page_url.replace(' ', '%20')
             logger.info(f"  PORN - 抓取第 {page_num} 页: {page_url}")
             
-            # 随机延时
-            time.sleep(random.uniform(1.5, 3.0))
+            # 按站点限速（所有工作线程共享，间隔由 delay_between_pages 决定）
+            page_scheduler.wait(page_url)
             
             try:
-                resp = requests.get(page_url, headers=headers, timeout=15, proxies=proxies, verify=False)
+                resp = http_get(page_url, headers=headers, timeout=15, proxies=proxies, verify=False)
                 resp.raise_for_status()
                 
                 # 检查编码
                 if resp.encoding.lower() != 'utf-8':
                     resp.encoding = 'utf-8'
                 
-                soup = BeautifulSoup(resp.text, 'html.parser')
+                soup = make_soup(resp.text, config)
                 
-                # PORN特定的选择器
-                page_titles = set()
-                page_videos = []  # 用于智能缓存 [(title, url), ...]
-                
-                # 选择器1: PORN特有的视频标题选择器
-                for elem in soup.select('a.thumbnailTitle'):
-                    title = elem.get_text(strip=True)
-                    if title and len(title) > 3:
-                        # 🚨 关键修复：验证视频是否属于当前模特
-                        parent_container = elem.find_parent('div', class_=['videoContainer', 'video', 'videoBrick'])
-                        if parent_container and not _is_video_belong_to_model(parent_container, model_name, url, logger):
-                            logger.debug(f"    跳过非当前模特的视频: {title[:50]}...")
-                            continue
-                        
-                        # 对在线标题应用清理流程
-                        cleaned_title = clean_porn_title(title, config.get('filename_clean_patterns', []))
-                        page_titles.add(cleaned_title)
-                        # 尝试提取链接 - 先从当前元素，改失败再向上查找
-                        video_url = elem.get('href')
-                        if not video_url:
-                            # 如果当前元素没有href，尝试查找父上a标签
-                            parent_a = elem.find_parent('a')
-                            if parent_a:
-                                video_url = parent_a.get('href')
-                        
-                        if video_url:
-                            if not video_url.startswith('http'):
-                                video_url = urljoin(url, video_url)
-                            title_to_url[cleaned_title] = video_url
-                            page_videos.append((cleaned_title, video_url))
-                        else:
-                            # 即使没有链接，也要樸保标题存在
-                            logger.debug(f"    注意: 找到了标题『{cleaned_title[:50]}...』但没有链接")
-                
-                # 选择器2: 通用标题选择器（仅当第一个选择器没找到结果时）
-                if not page_titles:
-                    for elem in soup.select('.title, .video-title, h3.title'):
-                        title = elem.get_text(strip=True)
-                        if title and len(title) > 3:
-                            # 🚨 关键修复：验证视频是否属于当前模特
-                            parent_container = elem.find_parent('div', class_=['videoContainer', 'video', 'videoBrick'])
-                            if parent_container and not _is_video_belong_to_model(parent_container, model_name, url, logger):
-                                logger.debug(f"    跳过非当前模特的视频: {title[:50]}...")
-                                continue
-                            
-                            # 额外的安全检查：确保标题和链接在同一视频容器内
-                            parent_video_link = elem.find_parent('a', href=True)
-                            if parent_video_link:
-                                video_url = parent_video_link.get('href')
-                                if video_url and not video_url.startswith('http'):
-                                    video_url = urljoin(url, video_url)
-                                
-                                # 验证链接是否指向视频页面（而不是其他内容）
-                                if '/view_video.php?' not in video_url and '/video/' not in video_url:
-                                    logger.debug(f"    跳过非视频链接: {video_url[:100]}...")
-                                    continue
-                            
-                            cleaned_title = clean_porn_title(title, config.get('filename_clean_patterns', []))
-                            page_titles.add(cleaned_title)
-                            # 尝试找到父链接
-                            link_elem = elem.find_parent('a')
-                            if link_elem:
-                                video_url = link_elem.get('href')
-                                if video_url:
-                                    if not video_url.startswith('http'):
-                                        video_url = urljoin(url, video_url)
-                                    title_to_url[cleaned_title] = video_url
-                                    page_videos.append((cleaned_title, video_url))
-                            else:
-                                logger.debug(f"    注意: 找到了标题『{cleaned_title[:50]}...』但未找到链接父元素")
+                page_titles, page_videos = extract_porn_listing_page(soup, url, config, ownership, logger)
+                title_to_url.update(page_videos)
                 
                 if page_titles:
                     prev_count = len(all_titles)
@@ -483,8 +653,8 @@ def fetch_with_requests_only_porn(url: str, logger, max_pages: int = -1, config:
                     # 更新智能缓存
                     if smart_cache and model_name:
                         videos_with_page = [(title, url, page_num) for title, url in page_videos]
-                        smart_cache.add_videos(model_name, videos_with_page)
-                        smart_cache.update_page_timestamp(model_name, page_num)
+                        # 内容哈希未变化时只刷新时间戳
+                        smart_cache.save_page(model_name, page_num, videos_with_page)
                     
                     # 显示样本
                     if page_num == 1 or page_num == start_page:
@@ -493,6 +663,11 @@ def fetch_with_requests_only_porn(url: str, logger, max_pages: int = -1, config:
                             logger.info(f"    样本{i}: {title[:80]}{'...' if len(title) > 80 else ''}")
                     
                     consecutive_empty_pages = 0
+                    
+                    if early_stop.observe_page(page_titles):
+                        logger.info(f"  PORN - 第 {page_num} 页内容均已缓存，提前停止翻页")
+                        early_stop.merge_cached(all_titles, title_to_url)
+                        break
                 else:
                     logger.warning(f"  PORN - 第 {page_num} 页未找到视频标题")
                     consecutive_empty_pages += 1
@@ -502,66 +677,7 @@ def fetch_with_requests_only_porn(url: str, logger, max_pages: int = -1, config:
                         break
                 
                 # 检查是否有下一页
-                has_next = False
-                
-                # PORN特定的分页检查
-                next_buttons = soup.select('a.next, a[rel="next"], li.next a, .pagination_next, .orangeButton')
-                if next_buttons:
-                    for button in next_buttons:
-                        text = button.get_text(strip=True).lower()
-                        href = button.get('href', '')
-                        # 更严格的下一页检测
-                        if text in ['next', '>', '下一页', '→', 'next page'] or ('page=' in href and not 'javascript' in href.lower()):
-                            # 检查是否是最后一页
-                            if 'page=' in href:
-                                # 提取page参数值
-                                try:
-                                    page_param = href.split('page=')[-1].split('&')[0]
-                                    if page_param.isdigit():
-                                        # 下一个页码应该大于当前页
-                                        next_page_num = int(page_param)
-                                        if next_page_num <= page_num:
-                                            logger.debug(f"  PORN - 忽略无效下一页链接: {href}")
-                                            continue
-                                        # 🚨 紧急修复：防止无限循环 - 限制最大页数
-                                        if next_page_num > 100:  # 安全限制
-                                            logger.warning(f"  PORN - 检测到异常大的页码 {next_page_num}，可能存在分页循环，停止抓取")
-                                            has_next = False
-                                            break
-                                except:
-                                    pass
-                            # 检查按钮是否可见或可用（禁用状态检查）
-                            style = button.get('style', '')
-                            disabled = button.get('disabled')
-                            class_attr = button.get('class', [])
-                            if 'display: none' in style or 'visibility: hidden' in style or disabled or 'disabled' in str(class_attr):
-                                logger.debug(f"  PORN - 忽略已禁用的下一页按钮")
-                                continue
-                            logger.debug(f"  PORN - 找到下一页按钮: {href}")
-                            has_next = True
-                            break
-                
-                # 尝试通用分页检查（当上面没检测到时）
-                if not has_next:
-                    pagination = soup.select_one('.pagination, .pages, .pageNumbers, .pagination.pagination-themed, nav.pagination')
-                    if pagination:
-                        # 查找所有页码链接
-                        page_links = pagination.select('a')
-                        page_numbers = []
-                        for link in page_links:
-                            text = link.get_text(strip=True)
-                            if text.isdigit():
-                                page_numbers.append(int(text))
-                        
-                        if page_numbers:
-                            max_page = max(page_numbers)
-                            # 🚨 紧急修复：添加安全检查
-                            if max_page > 100:  # 异常大的页数
-                                logger.warning(f"  PORN - 检测到异常页数 {max_page}，可能存在分页错误，停止抓取")
-                                has_next = False
-                            elif page_num < max_page:
-                                logger.debug(f"  PORN - 通用分页检测: 当前页={page_num}, 最大页={max_page}")
-                                has_next = True
+                has_next = porn_has_next_page(soup, page_num, logger)
                 
                 if not has_next:
                     logger.info("  PORN - 没有下一页，停止抓取")
@@ -584,99 +700,118 @@ def fetch_with_requests_only_porn(url: str, logger, max_pages: int = -1, config:
     except Exception as e:
         logger.error(f"  PORN - Requests抓取失败: {e}")
     
+    # 写入只在内存中刷新的页面时间戳（未变化的页面不逐页重写缓存文件）
+    if smart_cache and model_name:
+        smart_cache.flush(model_name)
+    
     logger.info(f"  PORN - 总共提取到 {len(all_titles)} 个视频标题")
     return all_titles, title_to_url
 
-def _is_video_belong_to_model(video_container, model_name: str, model_url: str, logger) -> bool:
-    """验证视频是否属于指定模特（更严格：防止把推荐/热门视频算进来）"""
+_COMPACT_TABLE = str.maketrans('', '', ' _-')
 
-    def _norm(s: str) -> str:
-        return (s or "").lower().strip()
 
-    def _norm_compact(s: str) -> str:
-        return _norm(s).replace(' ', '').replace('_', '').replace('-', '')
+def _norm(s: str) -> str:
+    return (s or "").lower().strip()
 
-    def _extract_model_slug(u: str) -> str:
-        try:
-            m = re.search(r"/model/([^/?#]+)/?", u or "")
-            if not m:
-                return ""
-            return _norm(m.group(1)).replace('%20', '-')
-        except Exception:
-            return ""
 
-    try:
-        model_url = model_url or ""
-        target_slug_from_url = _extract_model_slug(model_url)
-        target_slug_from_name = _norm(model_name).replace(' ', '-')
-        target_compact = _norm_compact(model_name)
+def _norm_compact(s: str) -> str:
+    return _norm(s).translate(_COMPACT_TABLE)
 
+
+class ModelOwnershipMatcher:
+    """
+    视频归属判定器（每次模特抓取构建一次）
+
+    目标 slug、紧凑名在构建时计算一次，链接判定结果按 href 缓存
+    （同一页的容器通常指向同一个模特链接），避免每个视频容器重复做正则和字符串归一化。
+    """
+
+    _MODEL_SLUG_RE = re.compile(r"/model/([^/?#]+)/?")
+    _INDICATOR_SELECTOR = compile_selector(
+        '.username, .uploader, .channelName, .modelName, '
+        '.userInfo .usernameWrap, [data-user-name], [data-channel-name]'
+    )
+
+    def __init__(self, model_name: str, model_url: str, logger=None):
+        self.logger = logger
+        self.model_url = model_url or ""
         # 在模特专属页：必须看到“归属证据”才接受
-        if '/model/' in model_url:
-            # 证据1：容器内出现指向该模特的链接
-            model_links = []
-            for a in video_container.find_all('a', href=True):
-                href = a.get('href', '')
-                if href and '/model/' in href:
-                    model_links.append(href)
+        self.strict = '/model/' in self.model_url
 
-            if model_links:
-                def _match_slug(link: str) -> bool:
-                    link_l = _norm(link)
-                    # 既匹配URL里的slug，也匹配由名字推导的slug
-                    if target_slug_from_url and target_slug_from_url in link_l:
-                        return True
-                    if target_slug_from_name and target_slug_from_name in link_l:
-                        return True
-                    # 再做一次紧凑匹配（容错大小写/分隔符）
-                    return target_compact and target_compact in _norm_compact(link_l)
-
-                if any(_match_slug(l) for l in model_links):
-                    return True
-
-                # 有模特链接但不匹配 -> 明确不属于
-                return False
+        m = self._MODEL_SLUG_RE.search(self.model_url)
+        self.slug_from_url = _norm(m.group(1)).replace('%20', '-') if m else ""
+        self.slug_from_name = _norm(model_name).replace(' ', '-')
+        self.compact = _norm_compact(model_name)
+        self.target_slug = self.slug_from_url or self.slug_from_name
 
-            # 证据2：容器内显示了上传者/模特名（文本）并与目标匹配
-            model_indicators = video_container.select(
-                '.username, .uploader, .channelName, .modelName, '
-                '.userInfo .usernameWrap, [data-user-name], [data-channel-name]'
-            )
+        self._link_verdicts: Dict[str, bool] = {}
+
+    def _link_matches(self, link: str) -> bool:
+        """模特链接是否指向目标模特（结果按链接缓存）"""
+        verdict = self._link_verdicts.get(link)
+        if verdict is None:
+            link_l = _norm(link)
+            if self.strict:
+                # 既匹配URL里的slug，也匹配由名字推导的slug，再做一次紧凑匹配（容错大小写/分隔符）
+                verdict = bool(
+                    (self.slug_from_url and self.slug_from_url in link_l)
+                    or (self.slug_from_name and self.slug_from_name in link_l)
+                    or (self.compact and self.compact in link_l.translate(_COMPACT_TABLE))
+                )
+            else:
+                verdict = bool(self.target_slug) and self.target_slug in link_l
+            self._link_verdicts[link] = verdict
+        return verdict
 
-            found_models = []
-            for indicator in model_indicators:
-                t = indicator.get_text(strip=True)
-                if t and len(t) > 1:
-                    found_models.append(_norm(t))
+    def _indicator_matches(self, text: str) -> bool:
+        compact = _norm_compact(text)
+        return self.compact in compact or compact in self.compact
+
+    def matches(self, video_container) -> bool:
+        """验证视频是否属于目标模特（更严格：防止把推荐/热门视频算进来）"""
+        try:
+            model_links = [
+                a['href'] for a in video_container.find_all('a', href=True)
+                if '/model/' in a['href']
+            ]
+
+            if not self.strict:
+                # 非模特页：保持较保守策略（只要出现模特链接且匹配则接受）
+                if model_links and self.target_slug:
+                    verdicts = [self._link_matches(link) for link in model_links]
+                    # 目标链接存在且没有其他模特链接时接受
+                    return all(verdicts)
+                return False
+
+            # 证据1：容器内出现指向该模特的链接；有模特链接但不匹配 -> 明确不属于
+            if model_links:
+                return any(self._link_matches(link) for link in model_links)
 
+            # 证据2：容器内显示了上传者/模特名（文本）并与目标匹配
+            found_models = [
+                t for t in (indicator.get_text(strip=True) for indicator in self._INDICATOR_SELECTOR.select(video_container))
+                if t and len(t) > 1
+            ]
             if found_models:
                 # 有指示文本时：必须能匹配目标，否则拒绝
-                if any(target_compact in _norm_compact(t) or _norm_compact(t) in target_compact for t in found_models):
-                    return True
-                return False
+                return any(self._indicator_matches(t) for t in found_models)
 
             # 关键修复：没有任何归属证据时，拒绝（这类通常是推荐/热门/广告模块）
             return False
 
-        # 非模特页：保持较保守策略（只要出现模特链接且匹配则接受）
-        video_links = video_container.find_all('a', href=True)
-        model_links = [l.get('href', '') for l in video_links if l.get('href') and '/model/' in l.get('href', '')]
+        except Exception as e:
+            if self.logger:
+                self.logger.debug(f"    ⚠️ 模特验证异常: {e}，保守拒绝")
+            return False
 
-        if model_links:
-            target_model_slug = target_slug_from_url or target_slug_from_name
-            if target_model_slug:
-                has_target_link = any(target_model_slug in _norm(link) for link in model_links)
-                has_other_model_link = any('/model/' in _norm(link) and target_model_slug not in _norm(link) for link in model_links)
-                if has_target_link and not has_other_model_link:
-                    return True
-                if has_other_model_link:
-                    return False
+    def filter(self, containers) -> List:
+        """批量过滤视频容器，只保留属于目标模特的容器（保持原顺序）"""
+        return [container for container in containers if self.matches(container)]
 
-        return False
 
-    except Exception as e:
-        logger.debug(f"    ⚠️ 模特验证异常: {e}，保守拒绝")
-        return False
+def _is_video_belong_to_model(video_container, model_name: str, model_url: str, logger) -> bool:
+    """验证视频是否属于指定模特（单次调用的兼容接口，批量判定请复用 ModelOwnershipMatcher）"""
+    return ModelOwnershipMatcher(model_name, model_url, logger).matches(video_container)
 
 
 def clean_porn_title(title: str, patterns: List[str]) -> str:
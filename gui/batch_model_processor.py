@@ -5,7 +5,7 @@
 
 import os
 import json
-import pandas as pd
+import importlib
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import logging
@@ -14,6 +14,22 @@ import re
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
+
+class _LazyModule:
+    """首次访问属性时才导入的模块代理（pandas 导入耗时较长，仅在真正读写表格时加载）"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+pd = _LazyModule('pandas')
+
 class BatchModelProcessor:
     """批量模特数据处理器"""
     
@@ -159,7 +175,7 @@ class BatchModelProcessor:
             self.logger.error(f"读取CSV文件失败: {e}")
             return False, {"error": f"读取CSV文件失败: {e}"}
     
-    def _process_dataframe(self, df: pd.DataFrame, source_type: str) -> Tuple[bool, Dict[str, Any]]:
+    def _process_dataframe(self, df: 'pd.DataFrame', source_type: str) -> Tuple[bool, Dict[str, Any]]:
         """
         处理DataFrame数据
         
@@ -447,7 +463,7 @@ class BatchModelProcessor:
         total_result['all_valid_models'].update(chunk_result['valid_models'])
         total_result['all_errors'].extend(chunk_result['errors'])
     
-    def get_import_template(self, format_type: str = 'excel') -> pd.DataFrame:
+    def get_import_template(self, format_type: str = 'excel') -> 'pd.DataFrame':
         """
         获取导入模板
         
@@ -19,6 +19,7 @@ use_selenium: true            # 是否使用Selenium浏览器进行网页抓取
 delay_between_pages:           # 页面间延迟设置，避免请求过于频繁被封
   min: 2.0                     # 最小延迟时间（秒）
   max: 3.5                     # 最大延迟时间（秒）
+  burst: 1                     # 同一站点允许的突发请求数（所有线程共享限速）
 retry_on_fail: 2               # 请求失败时的重试次数
 max_pages: -1                  # 最大翻页数（-1表示无限制翻页）
 
@@ -124,6 +124,9 @@ class ModelManagerGUI:
         
         # 🚨 关键修复：提前定义QueueHandler类
         self._setup_queue_handler()
+        
+        # 继续上次未完成的下载队列
+        self.root.after(1500, self._offer_resume_downloads)
     
     def _setup_queue_handler(self):
         """设置队列日志处理器"""
@@ -833,6 +836,14 @@ class ModelManagerGUI:
         ttk.Button(button_frame, text="取消下载", command=self.cancel_download, width=12).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="清空日志", command=self.clear_download_log, width=12).pack(side=tk.LEFT, padx=5)
         
+        # 带宽限速（所有下载共用，留空则按配置与时段自动限速）
+        ttk.Label(button_frame, text="限速(MB/s):").pack(side=tk.LEFT, padx=(20, 3))
+        self.bandwidth_limit_var = tk.StringVar(value="")
+        ttk.Entry(button_frame, textvariable=self.bandwidth_limit_var, width=6).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="应用", command=self.apply_bandwidth_limit, width=6).pack(side=tk.LEFT, padx=3)
+        self.bandwidth_status_var = tk.StringVar(value="")
+        ttk.Label(button_frame, textvariable=self.bandwidth_status_var, foreground="gray").pack(side=tk.LEFT, padx=5)
+        
         # 中间部 - 进度显示
         progress_frame = ttk.LabelFrame(main_frame, text="下载进度", padding="10")
         progress_frame.pack(fill=tk.X, pady=(0, 10))
@@ -1127,6 +1138,23 @@ class ModelManagerGUI:
     
     # ==================== 下载控制方法 ====================
     
+    def apply_bandwidth_limit(self):
+        """应用下载限速（0 表示不限，留空恢复配置中的限速与时段）"""
+        from core.modules.common.bandwidth_limiter import get_bandwidth_limiter
+        
+        value = self.bandwidth_limit_var.get().strip()
+        limiter = get_bandwidth_limiter(self.load_config())
+        try:
+            if value:
+                limiter.set_override(float(value))
+            else:
+                limiter.clear_override()
+        except ValueError:
+            messagebox.showerror("错误", f"无效的限速值: {value}")
+            return
+        self.bandwidth_status_var.set(limiter.describe())
+        self.log_download_message(f"下载限速: {limiter.describe()}")
+    
     def browse_download_dir(self):
         """浏览下载目录"""
         dir_path = filedialog.askdirectory(title="选择下载目录")
@@ -1394,6 +1422,10 @@ class ModelManagerGUI:
         except Exception as e:
             self.add_log(f"保存配置文件失败: {e}")
             raise
+        
+        # 正在进行的下载立即使用新的限速配置（界面上手动设置的限速仍然优先）
+        from core.modules.common.bandwidth_limiter import configure_bandwidth_limiter
+        configure_bandwidth_limiter(config)
     
     def load_models(self):
         """加载模特数据，优先使用数据库"""
@@ -2699,10 +2731,11 @@ class ModelManagerGUI:
                 config["log_dir"] = log_dir_var.get().strip()
                 config["video_extensions"] = [ext.strip() for ext in video_exts_var.get().split(",") if ext.strip()]
                 config["max_pages"] = int(max_pages_var.get())
-                config["delay_between_pages"] = {
+                # 只更新间隔，保留 burst / hosts 等按站点限速设置
+                config.setdefault("delay_between_pages", {}).update({
                     "min": float(delay_min_var.get()),
                     "max": float(delay_max_var.get())
-                }
+                })
                 config["retry_on_fail"] = int(retry_var.get())
                 
                 # 保存多线程配置
@@ -2914,11 +2947,7 @@ class ModelManagerGUI:
                     if hasattr(result, 'missing_with_urls') and result.missing_with_urls:
                         for title, url in result.missing_with_urls:
                             # 添加额外信息：如模特的模块类型
-                            model_info = self.models.get(result.model_name, {})
-                            if isinstance(model_info, dict):
-                                model_module = model_info.get("module", "未知")
-                            else:
-                                model_module = "PORN" if "javdb" not in str(model_info).lower() else "JAVDB"
+                            model_module = self._get_model_module(result.model_name)
                             
                             self.result_tree.insert(
                                 "", tk.END,
@@ -3302,6 +3331,8 @@ class ModelManagerGUI:
         try:
             # 导入下载模块
             from core.modules.porn.downloader import PornDownloader
+            from core.modules.common.download_queue import get_download_queue
+            from core.modules.common.download_feedback import record_download_success
             import threading
             import logging
             
@@ -3310,8 +3341,7 @@ class ModelManagerGUI:
             self.download_cancelled = False
             
             # 重置下载统计
-            self.downloaded_count_var.set("0")
-            self.total_count_var.set(str(len(download_items)))
+            self.download_count_var_tab.set(f"0 / {len(download_items)}")
             self.download_progress_var_tab.set(0)
             self.download_percentage_var_tab.set("0%")
             self.download_speed_var_tab.set("0 KB/s")
@@ -3361,7 +3391,7 @@ class ModelManagerGUI:
                                 # 更新总大小显示
                                 total_size_mb = self._format_bytes(total_bytes)
                                 downloaded_mb = self._format_bytes(downloaded_bytes)
-                                self.total_size_var.set(f"{downloaded_mb}/{total_size_mb}")
+                                self.download_size_var_tab.set(f"{downloaded_mb}/{total_size_mb}")
                                 
                         elif d['status'] == 'finished':
                             downloaded_mb = self._format_bytes(d.get('total_bytes', 0))
@@ -3370,31 +3400,41 @@ class ModelManagerGUI:
                     # 创建下载器
                     downloader = PornDownloader(config, progress_callback=progress_hook)
                     
+                    # 写入持久化下载队列（关闭程序或崩溃后，下次启动时可继续未完成的视频）
+                    download_queue = get_download_queue(config)
+                    queued = {}
+                    if download_queue is not None:
+                        ids = download_queue.enqueue_many(
+                            [(url, title, self._get_result_folder(model) or '', {'model': model})
+                             for model, title, url in download_items],
+                            kind='video',
+                        )
+                        queued = {url: download_queue.get(item_id) for (_, _, url), item_id in zip(download_items, ids)}
+                    
                     for i, (model, title, url) in enumerate(download_items, 1):
                         if self.download_cancelled:
                             self.add_download_log("下载已取消")
                             break
-                            
+                        
+                        queue_item = queued.get(url)
                         try:
                             # 更新当前文件信息
                             self.current_file_var.set(f"({i}/{total_count}) {title[:50]}...")
                             self.add_download_log(f"开始下载 ({i}/{total_count}): {title[:50]}...")
                             
-                            # 确定保存目录（模特目录）
-                            save_dir = None
-                            # 查找模特的本地目录
-                            for result_key, result_value in getattr(self, 'current_results', {}).items():
-                                if hasattr(result_value, 'model_name') and result_value.model_name == model:
-                                    if hasattr(result_value, 'local_folder_full') and result_value.local_folder_full:
-                                        save_dir = result_value.local_folder_full
-                                    break
+                            # 确定保存目录（模特目录；从队列继续时查重结果可能尚未加载，使用入队时记录的目录）
+                            save_dir = self._get_result_folder(model)
+                            if save_dir is None and queue_item is not None and queue_item.save_path:
+                                save_dir = queue_item.save_path
                             
                             # 执行下载
+                            if queue_item is not None:
+                                download_queue.mark_started(queue_item.id)
                             result = downloader.download_video(url, save_dir)
                             
                             if result['success']:
                                 downloaded_count += 1
-                                self.downloaded_count_var.set(str(downloaded_count))
+                                self.download_count_var_tab.set(f"{downloaded_count} / {total_count}")
                                 
                                 # 更新整体进度
                                 overall_percentage = (downloaded_count / total_count) * 100
@@ -3404,16 +3444,29 @@ class ModelManagerGUI:
                                 file_path = result.get('file_path', 'N/A')
                                 self.add_download_log(f"✅ 下载成功: {title[:50]}...")
                                 self.add_download_log(f"   保存路径: {file_path}")
+                                if queue_item is not None:
+                                    download_queue.mark_completed(queue_item.id, result.get('file_path') or '',
+                                                                  result.get('file_size'))
+                                
+                                # 回写查重状态（结果列表与下次查重立即反映新文件）
+                                record_download_success(config, model, url, result.get('file_path'),
+                                                        save_dir=result.get('save_path') or save_dir,
+                                                        title=self._strip_module_tag(model, title))
+                                self.root.after(0, self._refresh_comparison_after_download, model, url)
                             else:
                                 error_msg = result.get('message', result.get('error', 'Unknown error'))
                                 self.add_download_log(f"❌ 下载失败: {title[:50]}... - {error_msg}")
+                                if queue_item is not None:
+                                    download_queue.mark_failed(queue_item.id, str(error_msg))
                             
                         except Exception as e:
                             self.add_download_log(f"❌ 下载异常: {title[:50]}... - {str(e)}")
+                            if queue_item is not None:
+                                download_queue.mark_failed(queue_item.id, str(e))
                     
                     if not self.download_cancelled:
                         self.add_download_log("🎉 下载任务完成！")
-                        self.download_percentage_var.set("100%")
+                        self.download_percentage_var_tab.set("100%")
                     else:
                         self.add_download_log("⏹️ 下载已停止")
                     
@@ -3423,7 +3476,7 @@ class ModelManagerGUI:
                     self.is_downloading = False
                     self.download_cancelled = False
                     self.current_file_var.set("下载完成")
-                    self.download_speed_var.set("0 KB/s")
+                    self.download_speed_var_tab.set("0 KB/s")
             
             # 启动下载线程
             download_thread = threading.Thread(target=download_worker, daemon=True)
@@ -3569,6 +3622,7 @@ class ModelManagerGUI:
         try:
             # 导入批量下载函数
             from core.modules.porn.downloader import batch_download_models
+            from core.modules.common.download_queue import get_download_queue
             import threading
             
             # 初始化下载状态
@@ -3576,17 +3630,16 @@ class ModelManagerGUI:
             self.download_cancelled = False
             
             # 重置下载统计
-            self.downloaded_count_var.set("0")
             # 估计总数
             estimated_total = len(models_info) * (max_videos_per_model if max_videos_per_model > 0 else 20)
-            self.total_count_var.set(f"~{estimated_total}")
-            self.download_progress_var.set(0)
-            self.download_percentage_var.set("0%")
-            self.download_speed_var.set("0 KB/s")
+            self.download_count_var_tab.set(f"0 / ~{estimated_total}")
+            self.download_progress_var_tab.set(0)
+            self.download_percentage_var_tab.set("0%")
+            self.download_speed_var_tab.set("0 KB/s")
             self.current_file_var.set("准备完整下载...")
             
             # 清空下载日志
-            self.download_log_text.delete('1.0', tk.END)
+            self.download_log_text_tab.delete('1.0', tk.END)
             self.add_download_log(f"开始完整目录下载任务，共 {len(models_info)} 个模特")
             
             def download_worker():
@@ -3595,11 +3648,13 @@ class ModelManagerGUI:
                     # 获取配置
                     config = self.load_config()
                     
-                    # 进度统计
+                    # 进度统计（多个模特并发下载，按文件汇总，进度回调来自多个线程）
                     stats = {
                         'downloaded': 0,
                         'total_size': 0
                     }
+                    active_files = {}
+                    progress_lock = threading.Lock()
 
                     def log_callback(msg):
                         self.add_download_log(msg)
@@ -3609,43 +3664,94 @@ class ModelManagerGUI:
                     def progress_hook(d):
                         if not self.is_downloading or self.download_cancelled:
                             return
-                            
+                        
+                        # 同一文件的回调以 (模特, 文件名) 区分（finished 回调不带 tmpfilename）
+                        file_key = (d.get('_model', ''), d.get('filename', ''))
+                        
                         if d['status'] == 'downloading':
-                            # 计算下载速度
-                            speed_bytes = d.get('speed', 0)
-                            if speed_bytes:
-                                speed_str = self._format_bytes(speed_bytes) + "/s"
-                                self.download_speed_var.set(speed_str)
+                            with progress_lock:
+                                active_files[file_key] = (
+                                    d.get('downloaded_bytes', 0) or 0,
+                                    d.get('total_bytes') or d.get('total_bytes_estimate', 0) or 0,
+                                    d.get('speed', 0) or 0,
+                                )
+                                downloaded_bytes = sum(f[0] for f in active_files.values())
+                                total_bytes = sum(f[1] for f in active_files.values())
+                                speed_bytes = sum(f[2] for f in active_files.values())
                             
-                            # 计算当前文件进度
-                            total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
-                            downloaded_bytes = d.get('downloaded_bytes', 0)
+                            # 所有进行中文件的合计速度
+                            self.download_speed_var_tab.set(self._format_bytes(speed_bytes) + "/s")
                             
+                            # 进行中文件的合计进度（总文件数不确定）
                             if total_bytes > 0:
                                 percentage = (downloaded_bytes / total_bytes) * 100
-                                self.download_percentage_var.set(f"{percentage:.1f}%")
-                                self.download_progress_var.set(percentage) # 这里显示单个文件的进度，因为总数不确定
+                                self.download_percentage_var_tab.set(f"{percentage:.1f}%")
+                                self.download_progress_var_tab.set(percentage)
                                 
                                 # 更新大小显示
                                 total_size_mb = self._format_bytes(total_bytes)
                                 downloaded_mb = self._format_bytes(downloaded_bytes)
-                                self.total_size_var.set(f"{downloaded_mb}/{total_size_mb}")
+                                self.download_size_var_tab.set(f"{downloaded_mb}/{total_size_mb}")
                                 
                         elif d['status'] == 'finished':
-                            stats['downloaded'] += 1
-                            self.downloaded_count_var.set(str(stats['downloaded']))
+                            with progress_lock:
+                                active_files.pop(file_key, None)
+                                stats['downloaded'] += 1
+                                stats['total_size'] += d.get('total_bytes', 0) or 0
+                                downloaded_count = stats['downloaded']
+                            self.download_count_var_tab.set(f"{downloaded_count} / ~{estimated_total}")
                             downloaded_mb = self._format_bytes(d.get('total_bytes', 0))
-                            self.add_download_log(f"文件下载完成: {d.get('filename', 'unknown')} ({downloaded_mb})")
+                            model_tag = f"[{d['_model']}] " if d.get('_model') else ""
+                            self.add_download_log(f"文件下载完成: {model_tag}{d.get('filename', 'unknown')} ({downloaded_mb})")
+                        
+                        elif d['status'] == 'error':
+                            with progress_lock:
+                                active_files.pop(file_key, None)
 
+                    # 按模特写入持久化下载队列（中断后下次启动可继续；已下载的视频由目录索引跳过）
+                    download_queue = get_download_queue(config)
+                    queued = {}
+                    if download_queue is not None:
+                        ids = download_queue.enqueue_many(
+                            [(url, name, save_dir or '', {'model': name, 'max_videos': max_videos_per_model})
+                             for name, url, save_dir in models_info],
+                            kind='model',
+                        )
+                        queued = dict(zip((name for name, _, _ in models_info), ids))
+                        for item_id in ids:
+                            download_queue.mark_started(item_id)
+                    
                     # 执行批量下载
-                    result = batch_download_models(
-                        models_info=models_info,
-                        base_save_dir=None,
-                        config=config,
-                        max_videos_per_model=max_videos_per_model if max_videos_per_model > 0 else None,
-                        log_callback=log_callback,
-                        progress_callback=progress_hook
-                    )
+                    try:
+                        result = batch_download_models(
+                            models_info=models_info,
+                            base_save_dir=None,
+                            config=config,
+                            max_videos_per_model=max_videos_per_model if max_videos_per_model > 0 else None,
+                            log_callback=log_callback,
+                            progress_callback=progress_hook
+                        )
+                    except Exception as e:
+                        for item_id in queued.values():
+                            download_queue.mark_failed(item_id, str(e))
+                        raise
+                    
+                    # 没有失败视频的模特记为完成，其余按失败计入尝试次数（下次继续时重新下载缺少的视频）
+                    for model_result in result['model_results']:
+                        item_id = queued.get(model_result.get('model_name'))
+                        if item_id is None:
+                            continue
+                        if 'download_details' in model_result and not model_result.get('errors'):
+                            download_queue.mark_completed(item_id, model_result.get('save_dir', ''))
+                        else:
+                            download_queue.mark_failed(item_id, model_result.get('message', ''))
+                    
+                    # 查重状态已由下载流程回写，这里从结果列表中移除下载成功的视频
+                    for model_result in result['model_results']:
+                        for detail in model_result.get('download_details', []):
+                            if detail.get('status') == 'success':
+                                self.root.after(0, self._refresh_comparison_after_download,
+                                                model_result['model_name'], detail['url'])
                     
                     self.add_download_log("=" * 60)
                     self.add_download_log("🎉 批量下载完成！")
@@ -3661,9 +3767,9 @@ class ModelManagerGUI:
                 finally:
                     self.is_downloading = False
                     self.current_file_var.set("下载完成")
-                    self.download_speed_var.set("0 KB/s")
-                    self.download_progress_var.set(100)
-                    self.download_percentage_var.set("100%")
+                    self.download_speed_var_tab.set("0 KB/s")
+                    self.download_progress_var_tab.set(100)
+                    self.download_percentage_var_tab.set("100%")
             
             # 启动下载线程
             threading.Thread(target=download_worker, daemon=True).start()
@@ -3673,6 +3779,106 @@ class ModelManagerGUI:
         except Exception as e:
             messagebox.showerror("错误", f"完整目录下载失败: {e}")
     
+    def _get_result_folder(self, model_name):
+        """查重结果中模特的本地目录（没有结果时返回 None，由下载器自动选择模特目录）"""
+        for result_value in getattr(self, 'current_results', {}).values():
+            if getattr(result_value, 'model_name', None) == model_name:
+                return getattr(result_value, 'local_folder_full', None) or None
+        return None
+    
+    def _offer_resume_downloads(self):
+        """启动时检查下载队列中未完成的视频与模特目录，询问是否继续下载"""
+        try:
+            from core.modules.common.download_queue import get_download_queue, queue_settings
+            
+            config = self.load_config()
+            download_queue = get_download_queue(config)
+            if download_queue is None or not queue_settings(config)['auto_resume']:
+                return
+            if getattr(self, 'is_downloading', False):
+                return
+            
+            download_queue.recover_interrupted('video')
+            download_queue.recover_interrupted('model')
+            videos = download_queue.unfinished('video')
+            models = download_queue.unfinished('model')
+            if not videos and not models:
+                return
+            
+            pending = []
+            if videos:
+                pending.append(f"{len(videos)} 个视频")
+            if models:
+                pending.append(f"{len(models)} 个模特目录")
+            if messagebox.askyesno("继续下载", f"下载队列中有上次未完成的 {'、'.join(pending)}，是否继续下载？"):
+                self.notebook.select(self.download_tab)
+                # 两类任务共用下载标签页，先继续视频；模特目录留在队列中，下次启动时再询问
+                if videos:
+                    self._download_videos(
+                        [(item.payload.get('model', ''), item.filename, item.url) for item in videos])
+                else:
+                    self._download_complete_directories(
+                        [(item.payload.get('model') or item.filename, item.url, item.save_path or None)
+                         for item in models],
+                        models[0].payload.get('max_videos', 0))
+            else:
+                # 不再提示；之后重新选择下载时会重新入队
+                for item in videos + models:
+                    download_queue.mark_cancelled(item.id)
+        except Exception as e:
+            self.logger.warning(f"检查未完成的下载队列失败: {e}")
+    
+    def _get_model_module(self, model_name: str) -> str:
+        """获取模特所属模块（结果列表标题前的 [模块] 标记）"""
+        model_info = self.models.get(model_name, {})
+        if isinstance(model_info, dict):
+            return model_info.get("module", "未知")
+        return "PORN" if "javdb" not in str(model_info).lower() else "JAVDB"
+    
+    def _strip_module_tag(self, model_name: str, title: str) -> str:
+        """去掉结果列表标题前的 [模块] 标记，得到原始视频标题"""
+        tag = f"[{self._get_model_module(model_name)}] "
+        return title[len(tag):] if title.startswith(tag) else title
+    
+    def _refresh_comparison_after_download(self, model_name, url):
+        """
+        下载完成后刷新对比结果（只移除已下载的视频，不重新运行对比）
+        
+        Args:
+            model_name: 模特名称
+            url: 已下载视频的URL
+        """
+        try:
+            result = getattr(self, 'current_results', {}).get(model_name)
+            if result is not None:
+                titles = {t for t, u in (result.missing_with_urls or []) if u == url}
+                if titles:
+                    result.missing_with_urls = [(t, u) for t, u in result.missing_with_urls if t not in titles]
+                    result.missing_titles = [t for t in (result.missing_titles or []) if t not in titles]
+                    result.missing_count = max(result.missing_count - len(titles), 0)
+                    result.local_count += len(titles)
+            
+            for item in self.result_tree.get_children():
+                values = self.result_tree.item(item, "values")
+                if len(values) >= 3 and values[0] == model_name and values[2] == url:
+                    self.result_tree.delete(item)
+            
+            # 更新统计信息
+            valid_links_count = 0
+            invalid_links_count = 0
+            for result in getattr(self, 'current_results', {}).values():
+                if result.success:
+                    result_valid_links = len(result.missing_with_urls or [])
+                    valid_links_count += result_valid_links
+                    invalid_links_count += max(result.missing_count - result_valid_links, 0)
+            self.stats_vars["missing"].set(f"发现缺失: {len(self.result_tree.get_children())}")
+            self.stats_vars["valid_links"].set(f"有效链接: {valid_links_count}")
+            self.stats_vars["invalid_links"].set(f"无效链接: {invalid_links_count}")
+            self._update_result_selection_status()
+            
+        except Exception as e:
+            self.add_log(f"❌ 刷新对比结果失败: {e}")
+    
     def download_selected_models_complete(self):
         """下载选中模特的完整目录"""
         try: